@@ -166,15 +166,21 @@ class PostgreSQLComprehensiveAnalyzer:
         if limit_choice.isdigit():
             limit = int(limit_choice)
         
-        where_clause = input("WHERE 조건을 추가하시겠습니까? (조건 입력 또는 Enter로 생략): ").strip()
-        if not where_clause:
-            where_clause = None
+        # 필터 조건 설정 (값은 쿼리 파라미터로 전달)
+        filter_input = input("필터 조건을 추가하시겠습니까? (컬럼=값, 여러 개는 쉼표로 구분, Enter로 생략): ").strip()
+        filters = {}
+        for condition in filter_input.split(','):
+            column, sep, value = condition.partition('=')
+            if sep and column.strip():
+                filters[column.strip()] = value.strip()
+            elif condition.strip():
+                print(f"⚠️  잘못된 필터 조건을 무시합니다: {condition.strip()}")
         
         try:
             if export_choice == '1':
-                self.data_exporter.export_table_to_csv(table_name, limit, where_clause)
+                self.data_exporter.export_table_to_csv(table_name, limit, filters or None)
             elif export_choice == '2':
-                self.data_exporter.export_table_to_json(table_name, limit, where_clause)
+                self.data_exporter.export_table_to_json(table_name, limit, filters or None)
             elif export_choice == '3':
                 # 공간 컬럼 찾기
                 spatial_info = self.table_analyzer.get_spatial_info(table_name)
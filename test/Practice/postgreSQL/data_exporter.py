@@ -5,13 +5,19 @@ PostgreSQL 데이터 내보내기 및 결과 저장 모듈
 """
 
 import json
-import csv
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
+from psycopg2 import sql
 from db_connection import PostgreSQLConnection
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 class PostgreSQLDataExporter:
     """PostgreSQL 데이터 내보내기 클래스"""
     
@@ -22,8 +28,7 @@ class PostgreSQLDataExporter:
     
     def _ensure_export_directory(self):
         """내보내기 디렉토리 생성"""
-        if not os.path.exists(self.export_dir):
-            os.makedirs(self.export_dir)
+        os.makedirs(self.export_dir, exist_ok=True)
     
     def connect(self):
         """데이터베이스 연결"""
@@ -33,59 +38,75 @@ class PostgreSQLDataExporter:
         """데이터베이스 연결 해제"""
         self.db.disconnect()
     
+    def _select_query(self, table_name: str, limit: Optional[int] = None,
+                      filters: Optional[Dict[str, Any]] = None) -> Tuple[sql.Composed, Optional[tuple]]:
+        """
+        내보내기용 SELECT 쿼리와 파라미터 구성
+        
+        테이블/컬럼명은 sql.Identifier로 인용하고, filters의 값(컬럼 = 값, AND 결합)은
+        SQL 문자열에 넣지 않고 %s 파라미터로 전달합니다.
+        """
+        query = sql.SQL("SELECT * FROM {}").format(sql.Identifier(table_name))
+        params = None
+        if filters:
+            query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(
+                sql.SQL("{} = %s").format(sql.Identifier(column)) for column in filters
+            )
+            params = tuple(filters.values())
+        if limit:
+            query += sql.SQL(" LIMIT {}").format(sql.Literal(int(limit)))
+        return query, params
+    
     def export_table_to_csv(self, table_name: str, limit: Optional[int] = None, 
-                           where_clause: Optional[str] = None) -> str:
-        """테이블 데이터를 CSV로 내보내기"""
+                           filters: Optional[Dict[str, Any]] = None) -> str:
+        """
+        테이블 데이터를 CSV로 내보내기 (COPY ... TO STDOUT 사용)
+        
+        filters: 컬럼명 → 값 (같은 값을 가진 행만 내보냄, 예: {'region': '강원'})
+        """
+        filepath = ""
         try:
             # 쿼리 구성
-            query = f'SELECT * FROM "{table_name}"'
-            if where_clause:
-                query += f" WHERE {where_clause}"
-            if limit:
-                query += f" LIMIT {limit}"
-            
-            # 데이터 조회
-            data = self.db.execute_query(query)
-            
-            if not data:
-                print("⚠️  내보낼 데이터가 없습니다.")
-                return ""
+            query, params = self._select_query(table_name, limit, filters)
             
             # 파일명 생성
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{table_name}_{timestamp}.csv"
             filepath = os.path.join(self.export_dir, filename)
             
-            # CSV 작성
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                if data:
-                    fieldnames = data[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(data)
+            # 서버의 CSV 인코더 결과를 파일로 바로 기록 (1 MiB 버퍼)
+            with open(filepath, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+                row_count = self.db.copy_query_to_file(query, csvfile, params=params)
+            
+            if row_count == 0:
+                os.remove(filepath)
+                print("⚠️  내보낼 데이터가 없습니다.")
+                return ""
             
             print(f"✅ CSV 내보내기 완료: {filepath}")
-            print(f"📊 내보낸 레코드 수: {len(data)}")
+            print(f"📊 내보낸 레코드 수: {row_count}")
             
             return filepath
             
         except Exception as e:
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)
             print(f"❌ CSV 내보내기 실패: {e}")
             return ""
     
     def export_table_to_json(self, table_name: str, limit: Optional[int] = None,
-                            where_clause: Optional[str] = None) -> str:
-        """테이블 데이터를 JSON으로 내보내기"""
+                            filters: Optional[Dict[str, Any]] = None) -> str:
+        """
+        테이블 데이터를 JSON으로 내보내기
+        
+        filters: 컬럼명 → 값 (같은 값을 가진 행만 내보냄, 예: {'region': '강원'})
+        """
         try:
             # 쿼리 구성
-            query = f'SELECT * FROM "{table_name}"'
-            if where_clause:
-                query += f" WHERE {where_clause}"
-            if limit:
-                query += f" LIMIT {limit}"
+            query, params = self._select_query(table_name, limit, filters)
             
             # 데이터 조회
-            data = self.db.execute_query(query)
+            data = self.db.execute_query(query, params)
             
             if not data:
                 print("⚠️  내보낼 데이터가 없습니다.")
@@ -176,13 +197,22 @@ class PostgreSQLDataExporter:
             json_filename = f"{table_name}_analysis_{timestamp}.json"
             json_filepath = os.path.join(self.export_dir, json_filename)
             
-            with open(json_filepath, 'w', encoding='utf-8') as f:
-                analysis_data['export_info'] = {
-                    'table_name': table_name,
-                    'analysis_date': datetime.now().isoformat(),
-                    'export_format': 'json'
-                }
-                json.dump(analysis_data, f, ensure_ascii=False, indent=2, default=str)
+            analysis_data['export_info'] = {
+                'table_name': table_name,
+                'analysis_date': datetime.now().isoformat(),
+                'export_format': 'json'
+            }
+            if ORJSON_AVAILABLE:
+                # orjson으로 한 번에 직렬화 (날짜/시간 등은 json 경로와 같게 str()로 변환)
+                with open(json_filepath, 'wb') as f:
+                    f.write(orjson.dumps(
+                        analysis_data, default=str,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                        | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                    ))
+            else:
+                with open(json_filepath, 'w', encoding='utf-8') as f:
+                    json.dump(analysis_data, f, ensure_ascii=False, indent=2, default=str)
             
             print(f"✅ 분석 보고서 저장 완료:")
             print(f"📄 텍스트: {txt_filepath}")
@@ -196,47 +226,59 @@ class PostgreSQLDataExporter:
     
     def export_spatial_data_to_geojson(self, table_name: str, geom_column: str, 
                                       limit: Optional[int] = None) -> str:
-        """공간 데이터를 GeoJSON으로 내보내기"""
+        """
+        공간 데이터를 GeoJSON으로 내보내기
+        
+        지오메트리/속성 JSON은 PostGIS에서 생성하고, 서버 측 커서로
+        피처를 스트리밍하며 파일에 바로 기록합니다. (피처 수와 무관한 메모리 사용)
+        """
+        filepath = ""
         try:
-            # GeoJSON 형식으로 쿼리
-            query = f"""
-            SELECT jsonb_build_object(
-                'type', 'FeatureCollection',
-                'features', jsonb_agg(
-                    jsonb_build_object(
-                        'type', 'Feature',
-                        'geometry', ST_AsGeoJSON({geom_column})::jsonb,
-                        'properties', to_jsonb(t.*) - '{geom_column}'
-                    )
-                )
-            ) as geojson
+            query = sql.SQL("""
+            SELECT 
+                ST_AsGeoJSON(t.{geom}) as geometry,
+                (to_jsonb(t.*) - %s)::text as properties
             FROM (
-                SELECT * FROM "{table_name}"
-                {f"LIMIT {limit}" if limit else ""}
+                SELECT * FROM {table}
+                {limit}
             ) t
-            WHERE {geom_column} IS NOT NULL
-            """
-            
-            result = self.db.execute_query(query)
-            
-            if not result or not result[0]['geojson']:
-                print("⚠️  내보낼 공간 데이터가 없습니다.")
-                return ""
+            WHERE t.{geom} IS NOT NULL
+            """).format(
+                geom=sql.Identifier(geom_column),
+                table=sql.Identifier(table_name),
+                limit=sql.SQL("LIMIT {}").format(sql.Literal(int(limit))) if limit else sql.SQL(""),
+            )
             
             # 파일명 생성
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{table_name}_{timestamp}.geojson"
             filepath = os.path.join(self.export_dir, filename)
             
-            # GeoJSON 작성
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(result[0]['geojson'], f, ensure_ascii=False, indent=2)
+            # GeoJSON 스트리밍 작성 (1 MiB 버퍼)
+            feature_count = 0
+            with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write('{"type": "FeatureCollection", "features": [')
+                for geometry, properties in self.db.stream_query(query, (geom_column,)):
+                    if feature_count:
+                        f.write(',')
+                    f.write(f'\n{{"type": "Feature", "geometry": {geometry}, '
+                            f'"properties": {properties}}}')
+                    feature_count += 1
+                f.write('\n]}\n')
+            
+            if feature_count == 0:
+                os.remove(filepath)
+                print("⚠️  내보낼 공간 데이터가 없습니다.")
+                return ""
             
             print(f"✅ GeoJSON 내보내기 완료: {filepath}")
+            print(f"📊 내보낸 피처 수: {feature_count}")
             
             return filepath
             
         except Exception as e:
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)
             print(f"❌ GeoJSON 내보내기 실패: {e}")
             return ""
     
@@ -12,6 +12,13 @@ from datetime import datetime
 class PostgreSQLDataQualityChecker:
     """PostgreSQL 데이터 품질 검사 클래스"""
     
+    # 등호 비교가 없어 COUNT(DISTINCT) 집계를 할 수 없는 타입 (중복 검사에서 제외)
+    NON_COMPARABLE_TYPES = ('json', 'xml', 'point', 'line', 'lseg', 'box', 'path', 'polygon', 'circle')
+    
+    # 컬럼별 집계를 한 문장에 넣을 최대 컬럼 수
+    # (넓은 테이블에서 대상 목록 한도 1664개를 넘지 않고, 정렬/해시 집계의 work_mem 사용량을 제한)
+    COLUMN_BATCH_SIZE = 50
+    
     def __init__(self):
         self.db = PostgreSQLConnection()
     
@@ -23,8 +30,38 @@ class PostgreSQLDataQualityChecker:
         """데이터베이스 연결 해제"""
         self.db.disconnect()
     
-    def check_null_values(self, table_name: str) -> Dict[str, Any]:
-        """NULL 값 검사"""
+    def _table_source(self, table_name: str, sample_percent: Optional[float] = None) -> str:
+        """FROM 절 대상 (sample_percent 지정 시 TABLESAMPLE SYSTEM 블록 샘플링)"""
+        source = f'"{table_name}"'
+        if sample_percent:
+            # REPEATABLE: 같은 검사 안의 여러 스캔이 동일한 블록 샘플을 사용
+            source += f" TABLESAMPLE SYSTEM ({float(sample_percent)}) REPEATABLE (0)"
+        return source
+    
+    def _aggregate_in_batches(self, source: str, exprs: List[str]) -> Dict[str, Any]:
+        """
+        컬럼별 집계식 목록을 COLUMN_BATCH_SIZE개씩 묶어 'SELECT ... FROM source'로 조회하고
+        결과 행을 하나로 합침 (조회에 실패한 묶음의 별칭은 결과에 없음)
+        """
+        row = {}
+        for start in range(0, len(exprs), self.COLUMN_BATCH_SIZE):
+            select_list = ",\n                ".join(exprs[start:start + self.COLUMN_BATCH_SIZE])
+            result = self.db.execute_query(f"""
+            SELECT 
+                {select_list}
+            FROM {source}
+            """)
+            if result:
+                row.update(result[0])
+        return row
+    
+    def check_null_values(self, table_name: str, sample_percent: Optional[float] = None) -> Dict[str, Any]:
+        """
+        NULL 값 검사
+        
+        컬럼의 NULL 개수를 COUNT(컬럼) 집계로 COLUMN_BATCH_SIZE개 컬럼마다 한 번의 테이블 스캔에서 계산합니다.
+        sample_percent를 지정하면 대용량 테이블을 블록 샘플링하여 대략적인 점수를 계산합니다.
+        """
         try:
             # 테이블의 모든 컬럼 정보 조회
             columns_query = """
@@ -38,35 +75,30 @@ class PostgreSQLDataQualityChecker:
             if not columns:
                 return {'error': 'Table not found or no columns'}
             
+            # 컬럼별 NULL 아닌 값 개수를 컬럼 묶음마다 한 쿼리로 조회 (전체 행 수는 첫 묶음에서)
+            count_exprs = [f'COUNT("{col["column_name"]}") as non_null_{i}' for i, col in enumerate(columns)]
+            count_exprs[0] = f'COUNT(*) as total_rows, {count_exprs[0]}'
+            row = self._aggregate_in_batches(self._table_source(table_name, sample_percent), count_exprs)
+            
             null_analysis = []
             
-            for col in columns:
-                col_name = col['column_name']
-                
-                # NULL 값 개수 조회
-                null_count_query = f"""
-                SELECT 
-                    COUNT(*) as total_rows,
-                    COUNT("{col_name}") as non_null_count,
-                    COUNT(*) - COUNT("{col_name}") as null_count,
-                    ROUND(
-                        (COUNT(*) - COUNT("{col_name}")) * 100.0 / NULLIF(COUNT(*), 0), 2
-                    ) as null_percentage
-                FROM "{table_name}"
-                """
+            if 'total_rows' in row:
+                total_rows = row['total_rows']
                 
-                result = self.db.execute_query(null_count_query)
-                
-                if result:
-                    row = result[0]
+                for i, col in enumerate(columns):
+                    if f'non_null_{i}' not in row:
+                        continue  # 조회에 실패한 묶음의 컬럼
+                    null_count = total_rows - row[f'non_null_{i}']
+                    null_percentage = round(null_count * 100.0 / total_rows, 2) if total_rows else 0.0
+                    
                     null_analysis.append({
-                        'column_name': col_name,
+                        'column_name': col['column_name'],
                         'data_type': col['data_type'],
                         'is_nullable': col['is_nullable'],
-                        'total_rows': row['total_rows'],
-                        'null_count': row['null_count'],
-                        'null_percentage': float(row['null_percentage'] or 0),
-                        'quality_score': 100 - float(row['null_percentage'] or 0)
+                        'total_rows': total_rows,
+                        'null_count': null_count,
+                        'null_percentage': null_percentage,
+                        'quality_score': 100 - null_percentage
                     })
             
             return {
@@ -84,41 +116,62 @@ class PostgreSQLDataQualityChecker:
             return {'error': f'NULL 값 검사 실패: {e}'}
     
     def check_duplicate_values(self, table_name: str, columns: Optional[List[str]] = None) -> Dict[str, Any]:
-        """중복 값 검사"""
+        """
+        중복 값 검사
+        
+        컬럼 값 개수/고유값 개수를 COLUMN_BATCH_SIZE개 컬럼마다 한 번의 테이블 스캔으로 집계하고,
+        최빈 중복값은 중복이 있는 컬럼에 대해서만 조회합니다.
+        테이블에 없는 컬럼과 비교할 수 없는 타입(NON_COMPARABLE_TYPES)의 컬럼은
+        검사하지 않고 결과의 'skipped_columns'에 사유와 함께 기록합니다.
+        """
         try:
+            # 테이블의 컬럼 정보 조회
+            columns_query = """
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_name = %s AND table_schema = 'public'
+            ORDER BY ordinal_position
+            """
+            column_results = self.db.execute_query(columns_query, (table_name,))
+            if not column_results:
+                return {'error': 'Table not found or no columns'}
+            
+            data_types = {col['column_name']: col['data_type'] for col in column_results}
             if not columns:
                 # 모든 컬럼에 대해 중복 검사
-                columns_query = """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_name = %s AND table_schema = 'public'
-                ORDER BY ordinal_position
-                """
-                column_results = self.db.execute_query(columns_query, (table_name,))
-                columns = [col['column_name'] for col in column_results]
+                columns = list(data_types)
+            
+            skipped_columns = []
+            checked_columns = []
+            for col_name in dict.fromkeys(columns):
+                if col_name not in data_types:
+                    skipped_columns.append({'column_name': col_name, 'reason': '테이블에 없는 컬럼'})
+                elif data_types[col_name] in self.NON_COMPARABLE_TYPES:
+                    skipped_columns.append({'column_name': col_name,
+                                            'reason': f'비교할 수 없는 타입 ({data_types[col_name]})'})
+                else:
+                    checked_columns.append(col_name)
+            columns = checked_columns
             
             duplicate_analysis = []
             
-            for col_name in columns:
-                # 중복 값 검사
-                dup_query = f"""
-                SELECT 
-                    COUNT(*) as total_rows,
-                    COUNT(DISTINCT "{col_name}") as unique_values,
-                    COUNT(*) - COUNT(DISTINCT "{col_name}") as duplicate_count,
-                    ROUND(
-                        (COUNT(*) - COUNT(DISTINCT "{col_name}")) * 100.0 / NULLIF(COUNT(*), 0), 2
-                    ) as duplicate_percentage
-                FROM "{table_name}"
-                WHERE "{col_name}" IS NOT NULL
-                """
-                
-                result = self.db.execute_query(dup_query)
+            # 컬럼 값 개수/고유값 개수를 COLUMN_BATCH_SIZE개 컬럼씩 한 쿼리로 조회해 합침
+            row = self._aggregate_in_batches(self._table_source(table_name), [
+                f'COUNT("{col_name}") as non_null_{i}, COUNT(DISTINCT "{col_name}") as unique_{i}'
+                for i, col_name in enumerate(columns)
+            ])
+            
+            for i, col_name in enumerate(columns):
+                if f'non_null_{i}' not in row:
+                    continue  # 조회에 실패한 묶음의 컬럼
+                total_rows = row[f'non_null_{i}']
+                unique_values = row[f'unique_{i}']
+                duplicate_count = total_rows - unique_values
+                duplicate_percentage = round(duplicate_count * 100.0 / total_rows, 2) if total_rows else 0.0
                 
-                if result:
-                    row = result[0]
-                    
-                    # 가장 빈번한 중복값 조회
+                # 가장 빈번한 중복값 조회 (중복이 없는 컬럼은 생략)
+                frequent_dups = []
+                if duplicate_count > 0:
                     frequent_query = f"""
                     SELECT "{col_name}" as value, COUNT(*) as frequency
                     FROM "{table_name}"
@@ -128,25 +181,26 @@ class PostgreSQLDataQualityChecker:
                     ORDER BY COUNT(*) DESC
                     LIMIT 5
                     """
-                    
                     frequent_dups = self.db.execute_query(frequent_query)
-                    
-                    duplicate_analysis.append({
-                        'column_name': col_name,
-                        'total_rows': row['total_rows'],
-                        'unique_values': row['unique_values'],
-                        'duplicate_count': row['duplicate_count'],
-                        'duplicate_percentage': float(row['duplicate_percentage'] or 0),
-                        'uniqueness_score': round(100 - float(row['duplicate_percentage'] or 0), 2),
-                        'most_frequent_duplicates': frequent_dups[:5] if frequent_dups else []
-                    })
+                
+                duplicate_analysis.append({
+                    'column_name': col_name,
+                    'total_rows': total_rows,
+                    'unique_values': unique_values,
+                    'duplicate_count': duplicate_count,
+                    'duplicate_percentage': duplicate_percentage,
+                    'uniqueness_score': round(100 - duplicate_percentage, 2),
+                    'most_frequent_duplicates': frequent_dups[:5] if frequent_dups else []
+                })
             
             return {
                 'table_name': table_name,
                 'analysis_type': 'duplicate_values',
                 'columns': duplicate_analysis,
+                'skipped_columns': skipped_columns,
                 'summary': {
                     'total_columns_checked': len(duplicate_analysis),
+                    'columns_skipped': len(skipped_columns),
                     'columns_with_duplicates': len([c for c in duplicate_analysis if c['duplicate_count'] > 0]),
                     'avg_uniqueness_score': round(sum(c['uniqueness_score'] for c in duplicate_analysis) / len(duplicate_analysis), 2) if duplicate_analysis else 0
                 }
@@ -155,8 +209,14 @@ class PostgreSQLDataQualityChecker:
         except Exception as e:
             return {'error': f'중복 값 검사 실패: {e}'}
     
-    def check_data_consistency(self, table_name: str) -> Dict[str, Any]:
-        """데이터 일관성 검사"""
+    def check_data_consistency(self, table_name: str, sample_percent: Optional[float] = None) -> Dict[str, Any]:
+        """
+        데이터 일관성 검사
+        
+        숫자 컬럼의 기본 통계를 한 번의 스캔으로, IQR 이상치 개수를
+        FILTER 집계로 한 번 더 스캔하여 계산합니다. 한 문장에는 COLUMN_BATCH_SIZE개
+        컬럼까지만 넣으므로 스캔 횟수는 묶음마다 2회입니다.
+        """
         try:
             consistency_checks = []
             
@@ -170,62 +230,86 @@ class PostgreSQLDataQualityChecker:
             
             numeric_columns = self.db.execute_query(numeric_columns_query, (table_name,))
             
-            for col in numeric_columns:
-                col_name = col['column_name']
+            if not numeric_columns:
+                return {
+                    'table_name': table_name,
+                    'analysis_type': 'data_consistency',
+                    'numeric_columns': [],
+                    'summary': {
+                        'total_numeric_columns': 0,
+                        'columns_with_outliers': 0,
+                        'avg_consistency_score': 0
+                    }
+                }
+            
+            source = self._table_source(table_name, sample_percent)
+            
+            # 1차 스캔: 숫자 컬럼 기본 통계 (컬럼 묶음마다 한 쿼리)
+            stat_exprs = []
+            for i, col in enumerate(numeric_columns):
+                c = f'"{col["column_name"]}"'
+                stat_exprs.append(f"""
+                    COUNT({c}) as non_null_count_{i},
+                    MIN({c}) as min_value_{i},
+                    MAX({c}) as max_value_{i},
+                    AVG({c}) as avg_value_{i},
+                    STDDEV({c}) as std_dev_{i},
+                    PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY {c}) as q1_{i},
+                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {c}) as median_{i},
+                    PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY {c}) as q3_{i}""")
+            stat = self._aggregate_in_batches(source, stat_exprs)
+            if not stat:
+                raise ValueError('통계 조회 결과가 없습니다.')
+            
+            # 2차 스캔: IQR 범위 밖 값 개수를 컬럼별 FILTER 집계로 조회
+            bounds = {}
+            outlier_exprs = []
+            for i, col in enumerate(numeric_columns):
+                if f'q1_{i}' not in stat:
+                    continue  # 조회에 실패한 묶음의 컬럼
+                q1, q3 = stat[f'q1_{i}'], stat[f'q3_{i}']
+                if not stat[f'non_null_count_{i}'] or q1 is None or q3 is None:
+                    continue
+                iqr = float(q3) - float(q1)
+                lower_bound = float(q1) - 1.5 * iqr
+                upper_bound = float(q3) + 1.5 * iqr
+                bounds[i] = (lower_bound, upper_bound)
                 
-                # 기본 통계 조회
-                stats_query = f"""
-                SELECT 
-                    COUNT(*) as total_count,
-                    COUNT("{col_name}") as non_null_count,
-                    MIN("{col_name}") as min_value,
-                    MAX("{col_name}") as max_value,
-                    AVG("{col_name}") as avg_value,
-                    STDDEV("{col_name}") as std_dev,
-                    PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY "{col_name}") as q1,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY "{col_name}") as median,
-                    PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY "{col_name}") as q3
-                FROM "{table_name}"
-                WHERE "{col_name}" IS NOT NULL
-                """
+                c = f'"{col["column_name"]}"'
+                outlier_exprs.append(
+                    f"COUNT(*) FILTER (WHERE {c} < {lower_bound} OR {c} > {upper_bound}) as outlier_count_{i}"
+                )
+            
+            outliers = self._aggregate_in_batches(source, outlier_exprs)
+            
+            def as_float(value, digits=None):
+                if value is None:
+                    return None
+                return round(float(value), digits) if digits is not None else float(value)
+            
+            for i, col in enumerate(numeric_columns):
+                if i not in bounds:
+                    continue
                 
-                stats = self.db.execute_query(stats_query)
+                non_null_count = stat[f'non_null_count_{i}']
+                outlier_count = outliers.get(f'outlier_count_{i}', 0)
+                outlier_percentage = round(outlier_count * 100.0 / non_null_count, 2)
                 
-                if stats and stats[0]['non_null_count'] > 0:
-                    stat = stats[0]
-                    
-                    # IQR을 이용한 이상치 검사
-                    if stat['q1'] is not None and stat['q3'] is not None:
-                        iqr = float(stat['q3']) - float(stat['q1'])
-                        lower_bound = float(stat['q1']) - 1.5 * iqr
-                        upper_bound = float(stat['q3']) + 1.5 * iqr
-                        
-                        outlier_query = f"""
-                        SELECT COUNT(*) as outlier_count
-                        FROM "{table_name}"
-                        WHERE "{col_name}" IS NOT NULL
-                            AND ("{col_name}" < {lower_bound} OR "{col_name}" > {upper_bound})
-                        """
-                        
-                        outlier_result = self.db.execute_query(outlier_query)
-                        outlier_count = outlier_result[0]['outlier_count'] if outlier_result else 0
-                        outlier_percentage = round(outlier_count * 100.0 / stat['non_null_count'], 2)
-                        
-                        consistency_checks.append({
-                            'column_name': col_name,
-                            'data_type': col['data_type'],
-                            'total_values': stat['non_null_count'],
-                            'min_value': float(stat['min_value']) if stat['min_value'] is not None else None,
-                            'max_value': float(stat['max_value']) if stat['max_value'] is not None else None,
-                            'avg_value': round(float(stat['avg_value']), 2) if stat['avg_value'] is not None else None,
-                            'std_dev': round(float(stat['std_dev']), 2) if stat['std_dev'] is not None else None,
-                            'q1': float(stat['q1']) if stat['q1'] is not None else None,
-                            'median': float(stat['median']) if stat['median'] is not None else None,
-                            'q3': float(stat['q3']) if stat['q3'] is not None else None,
-                            'outlier_count': outlier_count,
-                            'outlier_percentage': outlier_percentage,
-                            'consistency_score': max(0, round(100 - outlier_percentage, 2))
-                        })
+                consistency_checks.append({
+                    'column_name': col['column_name'],
+                    'data_type': col['data_type'],
+                    'total_values': non_null_count,
+                    'min_value': as_float(stat[f'min_value_{i}']),
+                    'max_value': as_float(stat[f'max_value_{i}']),
+                    'avg_value': as_float(stat[f'avg_value_{i}'], 2),
+                    'std_dev': as_float(stat[f'std_dev_{i}'], 2),
+                    'q1': as_float(stat[f'q1_{i}']),
+                    'median': as_float(stat[f'median_{i}']),
+                    'q3': as_float(stat[f'q3_{i}']),
+                    'outlier_count': outlier_count,
+                    'outlier_percentage': outlier_percentage,
+                    'consistency_score': max(0, round(100 - outlier_percentage, 2))
+                })
             
             return {
                 'table_name': table_name,
@@ -315,8 +399,16 @@ class PostgreSQLDataQualityChecker:
         except Exception as e:
             return {'error': f'참조 무결성 검사 실패: {e}'}
     
-    def comprehensive_quality_check(self, table_name: str) -> Dict[str, Any]:
-        """종합 데이터 품질 검사"""
+    def comprehensive_quality_check(self, table_name: str,
+                                    sample_percent: Optional[float] = None) -> Dict[str, Any]:
+        """
+        종합 데이터 품질 검사
+        
+        Args:
+            table_name: 검사할 테이블명
+            sample_percent: NULL/일관성 검사에 사용할 TABLESAMPLE SYSTEM 비율 (%)
+                            대용량 테이블에서 대략적인 점수만 필요할 때 사용
+        """
         try:
             print(f"\n🔍 테이블 '{table_name}' 데이터 품질 종합 검사 시작...")
             
@@ -328,7 +420,7 @@ class PostgreSQLDataQualityChecker:
             
             # 1. NULL 값 검사
             print("   📋 NULL 값 검사 중...")
-            null_check = self.check_null_values(table_name)
+            null_check = self.check_null_values(table_name, sample_percent)
             results['checks']['null_values'] = null_check
             
             # 2. 중복 값 검사
@@ -338,7 +430,7 @@ class PostgreSQLDataQualityChecker:
             
             # 3. 데이터 일관성 검사
             print("   📊 데이터 일관성 검사 중...")
-            consistency_check = self.check_data_consistency(table_name)
+            consistency_check = self.check_data_consistency(table_name, sample_percent)
             results['checks']['data_consistency'] = consistency_check
             
             # 4. 참조 무결성 검사
@@ -413,6 +505,9 @@ class PostgreSQLDataQualityChecker:
             print(f"\n🔄 중복 값 검사:")
             print(f"   • 검사 컬럼 수: {dup_summary.get('total_columns_checked', 0)}")
             print(f"   • 중복 포함 컬럼: {dup_summary.get('columns_with_duplicates', 0)}")
+            if dup_summary.get('columns_skipped'):
+                skipped = ", ".join(col['column_name'] for col in checks['duplicate_values']['skipped_columns'])
+                print(f"   • 검사 제외 컬럼: {dup_summary['columns_skipped']} ({skipped})")
             print(f"   • 평균 고유성 점수: {dup_summary.get('avg_uniqueness_score', 0)}/100")
         
         # 데이터 일관성 검사 결과
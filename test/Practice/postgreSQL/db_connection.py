@@ -4,19 +4,51 @@ PostgreSQL Database Connection Module
 데이터베이스 연결 및 기본 작업을 위한 모듈
 """
 
+import io
+import numpy as np
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from psycopg2 import sql
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import os
+import atexit
+import weakref
+import itertools
+import threading
 from contextlib import contextmanager
 
+# COPY BINARY 형식 시그니처 (이후 플래그 4바이트, 헤더 확장 길이 4바이트)
+_PGCOPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+
+# 접속 정보별 공유 커넥션 풀 (프로세스 내에서 백엔드 재사용)
+_POOLS: Dict[Tuple, psycopg2.pool.ThreadedConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _close_pools():
+    """프로세스 종료 시 모든 풀 연결 종료"""
+    for pool in _POOLS.values():
+        pool.closeall()
+    _POOLS.clear()
+
+
+atexit.register(_close_pools)
+
+# 연결(세션)별로 PREPARE 된 문장 이름 (풀 연결이 재사용되어도 중복 PREPARE 방지)
+_PREPARED = weakref.WeakKeyDictionary()
+
+# 서버 측 커서 이름 생성용 카운터
+_STREAM_CURSOR_IDS = itertools.count(1)
+
+
 class PostgreSQLConnection:
     """PostgreSQL 데이터베이스 연결 클래스"""
     
     def __init__(self, host: str = "123.212.210.230", port: int = 5432, 
-                 user: str = "postgres", database: str = "gis_db", password: str = None):
+                 user: str = "postgres", database: str = "gis_db", password: str = None,
+                 use_pool: bool = False, max_connections: int = 4):
         """
         PostgreSQL 연결 초기화
         
@@ -26,6 +58,8 @@ class PostgreSQLConnection:
             user: 사용자명
             database: 데이터베이스명
             password: 비밀번호 (환경변수 또는 입력으로 받음)
+            use_pool: 공유 ThreadedConnectionPool에서 연결을 빌려 쓸지 여부
+            max_connections: 풀 최대 연결 수 (풀을 처음 만들 때만 적용)
         """
         self.host = host
         self.port = port
@@ -33,24 +67,51 @@ class PostgreSQLConnection:
         self.database = database
         self.password = password or os.getenv('POSTGRES_PASSWORD')
         self.connection = None
+        self._checkout_autocommit = None  # 풀에서 빌릴 때의 autocommit (반환 시 복원)
+        self.use_pool = use_pool
+        self.max_connections = max_connections
         
         # 로깅 설정
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def _pool_key(self) -> Tuple:
+        return (self.host, self.port, self.user, self.database)
+    
     def connect(self) -> bool:
         """데이터베이스에 연결"""
         try:
-            if not self.password:
+            pool = _POOLS.get(self._pool_key) if self.use_pool else None
+            
+            if pool is None and not self.password:
                 self.password = input("PostgreSQL 비밀번호를 입력하세요: ")
             
-            self.connection = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
+            if self.use_pool:
+                if pool is None:
+                    # 여러 스레드가 동시에 처음 연결해도 풀은 하나만 생성
+                    with _POOLS_LOCK:
+                        pool = _POOLS.get(self._pool_key)
+                        if pool is None:
+                            pool = psycopg2.pool.ThreadedConnectionPool(
+                                1, self.max_connections,
+                                host=self.host,
+                                port=self.port,
+                                user=self.user,
+                                password=self.password,
+                                database=self.database
+                            )
+                            _POOLS[self._pool_key] = pool
+                self.connection = pool.getconn()
+                self._checkout_autocommit = self.connection.autocommit
+            else:
+                self.connection = psycopg2.connect(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database
+                )
             self.logger.info(f"데이터베이스에 성공적으로 연결되었습니다: {self.database}")
             return True
             
@@ -58,16 +119,60 @@ class PostgreSQLConnection:
             self.logger.error(f"데이터베이스 연결 실패: {e}")
             return False
     
+    def try_connect_pooled(self) -> bool:
+        """
+        공유 풀에 남은 연결이 있을 때만 빌림 (풀 생성/비밀번호 입력 없음)
+        
+        풀이 아직 없거나 모든 연결이 사용 중이면 오류를 기록하지 않고 False를 반환합니다.
+        여분의 연결이 있을 때만 작업을 나눠 병렬로 처리하는 호출자용입니다.
+        """
+        pool = _POOLS.get(self._pool_key) if self.use_pool else None
+        if pool is None:
+            return False
+        try:
+            self.connection = pool.getconn()
+            self._checkout_autocommit = self.connection.autocommit
+        except psycopg2.pool.PoolError:
+            return False  # 풀 소진: 정상 상황이므로 기록하지 않음
+        except psycopg2.Error as e:
+            self.logger.warning(f"풀 연결 생성 실패: {e}")
+            return False
+        return True
+
     def disconnect(self):
-        """데이터베이스 연결 종료"""
+        """데이터베이스 연결 종료 (풀 사용 시 풀에 반환)"""
         if self.connection:
-            self.connection.close()
-            self.logger.info("데이터베이스 연결이 종료되었습니다.")
+            pool = _POOLS.get(self._pool_key) if self.use_pool else None
+            if pool is not None:
+                # 빌린 쪽에서 바꾼 세션 설정이 다음 사용자에게 새지 않도록 원래 값으로 복원
+                close = False
+                try:
+                    if self.connection.autocommit != self._checkout_autocommit:
+                        self.connection.rollback()
+                        self.connection.autocommit = self._checkout_autocommit
+                except psycopg2.Error as e:
+                    self.logger.warning(f"autocommit 복원 실패, 연결을 폐기합니다: {e}")
+                    close = True
+                pool.putconn(self.connection, close=close)
+                self.logger.info("데이터베이스 연결을 풀에 반환했습니다.")
+            else:
+                self.connection.close()
+                self.logger.info("데이터베이스 연결이 종료되었습니다.")
+            self.connection = None
     
     @contextmanager
-    def get_cursor(self, cursor_factory=None):
-        """커서 컨텍스트 매니저"""
-        cursor = self.connection.cursor(cursor_factory=cursor_factory)
+    def get_cursor(self, cursor_factory=None, name: Optional[str] = None):
+        """
+        커서 컨텍스트 매니저
+        
+        name을 지정하면 서버 측(named) 커서를 생성합니다.
+        autocommit 연결에서는 WITH HOLD 커서로 선언합니다.
+        """
+        if name:
+            cursor = self.connection.cursor(name=name, cursor_factory=cursor_factory,
+                                            withhold=self.connection.autocommit)
+        else:
+            cursor = self.connection.cursor(cursor_factory=cursor_factory)
         try:
             yield cursor
         except Exception as e:
@@ -91,6 +196,88 @@ class PostgreSQLConnection:
             self.logger.error(f"쿼리 실행 실패: {e}")
             return []
     
+    def stream_query(self, query: str, params: tuple = None, itersize: int = 10000,
+                     cursor_factory=None) -> Iterator:
+        """
+        서버 측 커서로 SELECT 결과를 스트리밍
+        
+        전체 결과를 메모리에 올리지 않고 itersize 행씩 가져오며 한 행씩 반환합니다.
+        """
+        cursor_name = f"stream_cursor_{next(_STREAM_CURSOR_IDS)}"
+        with self.get_cursor(cursor_factory=cursor_factory, name=cursor_name) as cursor:
+            cursor.itersize = itersize
+            cursor.execute(query, params)
+            for row in cursor:
+                yield row
+    
+    def copy_query_to_file(self, query: str, file, options: str = "CSV HEADER", params=None) -> int:
+        """
+        COPY (query) TO STDOUT 결과를 파일 객체에 직접 기록
+        
+        행 단위 fetch/직렬화 없이 PostgreSQL의 COPY 인코더를 사용합니다.
+        query는 문자열 또는 sql.Composable이며, params가 있으면 %s 자리표시자에 바인딩합니다.
+        
+        Returns:
+            복사된 행 수
+        """
+        with self.get_cursor() as cursor:
+            if params is not None:
+                query = cursor.mogrify(query, params).decode()
+            elif isinstance(query, sql.Composable):
+                query = query.as_string(cursor)
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH {options}", file)
+            return cursor.rowcount
+    
+    def copy_query_to_array(self, query: str, columns: List[Tuple[str, str]],
+                            params=None) -> np.ndarray:
+        """
+        COPY (query) TO STDOUT (FORMAT BINARY) 결과를 NumPy 구조화 배열로 변환
+        
+        행마다 Python 객체를 만들지 않고 바이너리 튜플을 np.frombuffer로 바로 해석합니다.
+        
+        Args:
+            query: SELECT 쿼리 문자열 또는 sql.Composable (params가 있으면 %s 자리표시자 사용)
+            columns: 결과 컬럼 순서대로 (이름, NumPy 타입) 목록
+                     예: [('x', 'f8'), ('y', 'f8'), ('elevation', 'f4')]
+                     int2/int4/int8/float4/float8 같은 고정 길이 타입만 지원하며 NULL은 허용하지 않음
+        
+        Returns:
+            columns 필드를 가진 구조화 배열 (행 수 = 결과 행 수)
+        """
+        buffer = io.BytesIO()
+        with self.get_cursor() as cursor:
+            if params is not None:
+                query = cursor.mogrify(query, params).decode()
+            elif isinstance(query, sql.Composable):
+                query = query.as_string(cursor)
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT BINARY)", buffer)
+        data = buffer.getbuffer()
+        
+        if bytes(data[:len(_PGCOPY_SIGNATURE)]) != _PGCOPY_SIGNATURE:
+            raise ValueError("COPY BINARY 헤더가 올바르지 않습니다.")
+        body_start = len(_PGCOPY_SIGNATURE) + 8 + int.from_bytes(
+            data[len(_PGCOPY_SIGNATURE) + 4:len(_PGCOPY_SIGNATURE) + 8], 'big')
+        body_end = len(data) - 2  # 종료 표시 (int16 -1)
+        
+        # 튜플: 필드 수(int16) + 필드마다 길이(int32)와 빅엔디언 값
+        fields = [('field_count', '>i2')]
+        for name, dtype in columns:
+            fields += [(f'{name}_length', '>i4'), (name, np.dtype(dtype).newbyteorder('>'))]
+        row_dtype = np.dtype(fields)
+        
+        if (body_end - body_start) % row_dtype.itemsize:
+            raise ValueError("COPY BINARY 결과가 지정한 고정 길이 컬럼과 맞지 않습니다.")
+        rows = np.frombuffer(data, dtype=row_dtype,
+                             count=(body_end - body_start) // row_dtype.itemsize,
+                             offset=body_start)
+        
+        result = np.empty(len(rows), dtype=[(name, dtype) for name, dtype in columns])
+        for name, dtype in columns:
+            if np.any(rows[f'{name}_length'] != np.dtype(dtype).itemsize):
+                raise ValueError(f"'{name}' 컬럼에 NULL 또는 다른 길이의 값이 있습니다.")
+            result[name] = rows[name]
+        return result
+    
     def execute_command(self, command: str, params: tuple = None) -> bool:
         """INSERT, UPDATE, DELETE 명령 실행"""
         try:
@@ -103,6 +290,39 @@ class PostgreSQLConnection:
             self.logger.error(f"명령 실행 실패: {e}")
             return False
     
+    def prepare_statement(self, name: str, query: str) -> bool:
+        """현재 세션에 PREPARE 문장 등록 (이미 등록된 경우 생략)"""
+        prepared = _PREPARED.setdefault(self.connection, set())
+        if name in prepared:
+            return True
+        
+        if self.execute_command(f"PREPARE {name} AS {query}"):
+            prepared.add(name)
+            return True
+        return False
+    
+    def prepare_statements(self, statements: Dict[str, str]) -> bool:
+        """
+        여러 PREPARE 문장을 한 번의 왕복으로 등록 (이미 등록된 문장은 생략)
+        
+        세미콜론으로 이어 붙여 한 번에 전송하므로 서버가 문장들을 연달아 처리하고,
+        문장 수만큼 응답을 기다리지 않습니다. 하나라도 실패하면 아무것도 등록되지 않습니다.
+        """
+        prepared = _PREPARED.setdefault(self.connection, set())
+        pending = {name: query for name, query in statements.items() if name not in prepared}
+        if not pending:
+            return True
+        
+        batch = ";\n".join(f"PREPARE {name} AS {query}" for name, query in pending.items())
+        if self.execute_command(batch):
+            prepared.update(pending)
+            return True
+        return False
+    
+    def is_prepared(self, name: str) -> bool:
+        """현재 세션에 PREPARE 문장이 등록되어 있는지 확인"""
+        return name in _PREPARED.get(self.connection, ())
+    
     def get_table_list(self) -> List[str]:
         """데이터베이스의 모든 테이블 목록 조회"""
         query = """
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+화재 확산 스텝 커널 모듈
+AdvancedCAModel의 셀 단위 확산 규칙을 JIT 컴파일된 커널로 실행
+"""
+
+import numpy as np
+from typing import Dict, Any
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba가 없으면 순수 Python 함수로 그대로 사용"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+# 상태 정의 (AdvancedCAModel과 동일)
+EMPTY = 0
+TREE = 1
+BURNING = 2
+BURNED = 3
+WET = 4
+
+# 대각선 이웃의 확산 확률 감쇠 (AdvancedCAModel.get_spread_probability와 동일)
+DIAGONAL_FACTOR = 0.7
+
+# 열 효과 (AdvancedCAModel과 동일)
+# - 확산 확률에 1 + 출발 셀 열 * HEAT_SPREAD_FACTOR 배
+# - 스텝마다 가우시안 확산(sigma=HEAT_DIFFUSION_SIGMA, reflect 경계) 후 HEAT_COOLING 배
+HEAT_SPREAD_FACTOR = 0.1
+HEAT_DIFFUSION_SIGMA = 0.5
+HEAT_COOLING = 0.9
+
+# 확률 양자화 스케일: 확률 p → uint16 임계값 round(p * 65536), 16비트 난수와 비교
+# (8비트로는 ignition_prob 0.001 같은 작은 확률이 0이 되어 자연 발화가 사라짐)
+PROB_SCALE = 1 << 16
+PROB_MAX = PROB_SCALE - 1
+
+
+# 타일 한 변의 셀 수 (state/next_state/연료 코드 타일이 L2 캐시에 머물도록)
+TILE_SIZE = 64
+
+# KernelFireModel.stats_buf의 열 구성 (스텝당 한 행, np.int32)
+STATS_COLUMNS = ('burning_cells', 'burned_cells', 'fire_perimeter', 'ignited_cells')
+
+
+@njit(inline='always')
+def _update_cell(state, next_state, fuel_codes, burn_timer, heat, next_heat,
+                 spread_lut, heat_output_lut, burn_time_lut, rand,
+                 ignition_prob, ignition_threshold, extinguish_threshold, i, j):
+    """
+    셀 하나에 화재 확산 규칙 적용
+
+    - TREE: 연소 중인 이웃마다 spread_lut[연료] * (1 + 이웃 열 * 0.1) (대각선은 0.7배)
+            확률로 확산 시도, 확산되지 않으면 ignition_prob로 자연 발화
+            (이웃 확산으로 착화한 셀의 열은 heat_output_lut[연료])
+    - BURNING: 연소 시간 경과 또는 자연 소화 시 BURNED (열 0)
+    - 그 외 상태는 유지
+
+    셀마다 uint16 난수 하나만 사용한다. 한 셀은 TREE와 BURNING 중
+    하나의 규칙만 적용받고, TREE 셀의 착화 구간은 [0, 확산 확률)이 이웃 확산,
+    그 뒤 (1 - 확산 확률) * ignition_prob 길이가 자연 발화이기 때문이다.
+    """
+    height, width = state.shape
+    cell = state[i, j]
+    r = rand[i, j]
+    next_heat[i, j] = heat[i, j]
+
+    if cell == TREE:
+        # 연소 중인 이웃이 모두 확산에 실패할 확률 (열 효과 포함)
+        fuel = fuel_codes[i, j]
+        p_fuel = spread_lut[fuel]
+        survive = 1.0
+        for ni in range(max(i - 1, 0), min(i + 2, height)):
+            for nj in range(max(j - 1, 0), min(j + 2, width)):
+                if state[ni, nj] != BURNING:
+                    continue
+                p = p_fuel * (1.0 + heat[ni, nj] * HEAT_SPREAD_FACTOR)
+                if ni != i and nj != j:
+                    p *= DIAGONAL_FACTOR
+                survive *= 1.0 - min(p, 1.0)
+
+        if survive == 1.0:
+            # 연소 중인 이웃 없음: 자연 발화만 (대부분의 셀, 정수 비교)
+            if r < ignition_threshold:
+                next_state[i, j] = BURNING
+            else:
+                next_state[i, j] = TREE
+        else:
+            spread_threshold = (1.0 - survive) * PROB_SCALE
+            if r < spread_threshold:
+                next_state[i, j] = BURNING
+                next_heat[i, j] = heat_output_lut[fuel]
+            elif r < spread_threshold + survive * ignition_prob * PROB_SCALE:
+                next_state[i, j] = BURNING
+            else:
+                next_state[i, j] = TREE
+
+    elif cell == BURNING:
+        burn_timer[i, j] += 1
+        if (burn_timer[i, j] >= burn_time_lut[fuel_codes[i, j]]
+                or r < extinguish_threshold):
+            next_state[i, j] = BURNED
+            next_heat[i, j] = 0.0
+        else:
+            next_state[i, j] = BURNING
+
+    else:
+        next_state[i, j] = cell
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _step_kernel(state, next_state, fuel_codes, burn_timer, heat, next_heat,
+                 spread_lut, heat_output_lut, burn_time_lut, rand,
+                 ignition_prob, ignition_threshold, extinguish_threshold, tile_size):
+    """
+    한 스텝의 화재 확산 규칙을 tile_size x tile_size 블록 단위로 적용
+
+    state/heat는 스텝 동안 읽기 전용이고 next_state/next_heat만 기록하므로
+    타일끼리 독립적이며, 타일 단위로 병렬 처리한다.
+    """
+    height, width = state.shape
+    tiles_y = (height + tile_size - 1) // tile_size
+    tiles_x = (width + tile_size - 1) // tile_size
+
+    for tile in prange(tiles_y * tiles_x):
+        ti = (tile // tiles_x) * tile_size
+        tj = (tile % tiles_x) * tile_size
+        for i in range(ti, min(ti + tile_size, height)):
+            for j in range(tj, min(tj + tile_size, width)):
+                _update_cell(state, next_state, fuel_codes, burn_timer, heat, next_heat,
+                             spread_lut, heat_output_lut, burn_time_lut, rand,
+                             ignition_prob, ignition_threshold, extinguish_threshold, i, j)
+
+
+@njit(inline='always')
+def _reflect_index(k, n):
+    """scipy.ndimage 'reflect' 경계 인덱스 (d c b a | a b c d | d c b a)"""
+    while k < 0 or k >= n:
+        if k < 0:
+            k = -k - 1
+        else:
+            k = 2 * n - k - 1
+    return k
+
+
+@njit(parallel=True, cache=True)
+def _diffuse_heat(src, tmp, dst, weights, cooling):
+    """
+    열 확산 및 냉각: dst = gaussian_filter(src) * cooling
+
+    weights는 1차원 가우시안 가중치(길이 2r+1)이며, 행 방향 → 열 방향 순으로
+    분리 적용한다. (ndimage.gaussian_filter(mode='reflect')와 동일)
+    """
+    height, width = src.shape
+    radius = len(weights) // 2
+    for i in prange(height):
+        for j in range(width):
+            acc = 0.0
+            for k in range(-radius, radius + 1):
+                acc += weights[k + radius] * src[_reflect_index(i + k, height), j]
+            tmp[i, j] = acc
+    for i in prange(height):
+        for j in range(width):
+            acc = 0.0
+            for k in range(-radius, radius + 1):
+                acc += weights[k + radius] * tmp[i, _reflect_index(j + k, width)]
+            dst[i, j] = acc * cooling
+
+
+def gaussian_weights(sigma: float, truncate: float = 4.0) -> np.ndarray:
+    """ndimage.gaussian_filter와 같은 1차원 가우시안 가중치 (반경 int(truncate * sigma + 0.5))"""
+    radius = int(truncate * sigma + 0.5)
+    x = np.arange(-radius, radius + 1, dtype=np.float64)
+    weights = np.exp(-0.5 / (sigma * sigma) * x * x)
+    return weights / weights.sum()
+
+
+def quantize_probability(prob) -> np.ndarray:
+    """확률(스칼라/배열)을 uint16 비교 임계값으로 양자화"""
+    return np.clip(np.round(np.asarray(prob, dtype=np.float64) * PROB_SCALE),
+                   0, PROB_MAX).astype(np.uint16)
+
+
+@njit(cache=True)
+def _fire_perimeter(state):
+    """
+    화재 경계 셀 수 계산
+
+    연소 중인 셀 중 격자 경계에 있거나 상하좌우 이웃 중 하나라도
+    연소 중이 아닌 셀의 수 (ndimage.binary_erosion 기반 계산과 동일)
+    """
+    height, width = state.shape
+    perimeter = 0
+    for i in range(height):
+        for j in range(width):
+            if state[i, j] != BURNING:
+                continue
+            if (i == 0 or j == 0 or i == height - 1 or j == width - 1
+                    or state[i - 1, j] != BURNING or state[i + 1, j] != BURNING
+                    or state[i, j - 1] != BURNING or state[i, j + 1] != BURNING):
+                perimeter += 1
+    return perimeter
+
+
+class KernelFireModel:
+    """
+    JIT 커널 기반 경량 화재 모델
+
+    초기화가 끝난 AdvancedCAModel의 격자, 연료맵, 파라미터를 넘겨받아
+    step()을 _step_kernel로 실행한다. 모델에 정수 연료 코드 격자(fuel_codes)와
+    코드별 연료 이름(fuel_code_names)이 있으면 문자열 연료맵 대신 이를 사용한다.
+    상태 격자는 np.uint8 이중 버퍼로 미리 할당하고 스텝마다 교체한다.
+    tile_size는 커널의 블록 크기이다.
+    연료별 확산 확률/열 출력/연소 시간은 연료 코드 LUT로 커널에 전달하고,
+    자연 발화/소화 확률은 uint16 임계값으로 양자화한다.
+
+    열 분포는 np.float64 격자(heat)로 유지한다. 초기값은 모델의 heat_map
+    (add_ignition_point의 intensity 포함)이며, 확산 확률의 열 효과와
+    스텝마다의 가우시안 확산/냉각을 AdvancedCAModel과 같은 규칙으로 적용한다.
+
+    advance(i)는 스텝 통계를 dict 대신 미리 할당한 stats_buf의 i번째 행
+    (STATS_COLUMNS 순서)에 기록한다. step()은 AdvancedCAModel과 같은
+    dict 통계가 필요한 호출부를 위한 호환 메서드이다.
+
+    지형/기상 효과(terrain_model, weather_model)와 습윤 셀(WET) 회복은 반영하지 않는다.
+    통합 파이프라인은 이들을 설정하지 않으며 소화 활동도 적용하지 않기 때문이다.
+    """
+
+    def __init__(self, ca_model, tile_size: int = TILE_SIZE, max_steps: int = 100):
+        self.ca_model = ca_model
+        self.tile_size = max(int(tile_size), 1)
+        self.params = ca_model.params
+        self.rng = ca_model.rng
+        self.grid_shape = tuple(ca_model.grid_shape)
+        self.step_count = ca_model.step_count
+        self.history = []
+
+        # 연료 코드 LUT (마지막 코드는 알 수 없는 연료 → 기본 파라미터)
+        self.fuel_names = list(ca_model.fuel_properties.keys())
+        self.default_fuel_code = len(self.fuel_names)
+        self._lut_params = None
+        self._update_luts()
+        code_names = getattr(ca_model, 'fuel_code_names', None)
+        if getattr(ca_model, 'fuel_codes', None) is not None and code_names is not None:
+            self.fuel_codes = self._remap_fuel_codes(ca_model.fuel_codes, code_names)
+        else:
+            self.fuel_codes = self._encode_fuel_map(ca_model.fuel_map)
+
+        # 셀 상태는 모두 np.uint8 배열(SoA)로 보관: 상태 이중 버퍼, 연소 경과 스텝
+        self.grid = ca_model.grid.astype(np.uint8)
+        self._next_grid = np.empty_like(self.grid)
+        self.burn_timer = np.minimum(ca_model.burn_timer, np.iinfo(np.uint8).max).astype(np.uint8)
+
+        # 열 분포: 현재/다음 스텝 버퍼와 확산 중간 버퍼
+        self.heat = np.array(ca_model.heat_map, dtype=np.float64)
+        self._next_heat = np.empty_like(self.heat)
+        self._heat_tmp = np.empty_like(self.heat)
+        self.heat_weights = gaussian_weights(HEAT_DIFFUSION_SIGMA)
+
+        # 스텝별 통계 버퍼 (부족하면 advance()에서 두 배로 확장)
+        self.stats_buf = np.zeros((max(int(max_steps), 1), len(STATS_COLUMNS)), dtype=np.int32)
+        self._counts = np.bincount(self.grid.ravel(), minlength=5)
+
+    def _update_luts(self):
+        """
+        파라미터로부터 양자화 LUT 생성
+
+        params가 바뀐 경우에만 다시 계산한다.
+        """
+        fuel_properties = self.ca_model.fuel_properties
+        lut_params = (self.params['base_spread_prob'], self.params['ignition_prob'],
+                      self.params['extinguish_prob'], self.params['fuel_consumption_time'])
+        if lut_params == self._lut_params:
+            return
+
+        # 마지막 항목은 알 수 없는 연료 (AdvancedCAModel의 기본값과 동일)
+        self.spread_lut = np.array(
+            [props['spread_prob'] for props in fuel_properties.values()]
+            + [self.params['base_spread_prob']], dtype=np.float64)
+        self.heat_output_lut = np.array(
+            [props['heat_output'] for props in fuel_properties.values()] + [1.0],
+            dtype=np.float64)
+        self.ignition_prob = float(self.params['ignition_prob'])
+        self.ignition_threshold = int(quantize_probability(self.ignition_prob))
+        self.extinguish_threshold = int(quantize_probability(self.params['extinguish_prob']))
+        self.burn_time_lut = np.array(
+            [props['burn_time'] for props in fuel_properties.values()]
+            + [self.params['fuel_consumption_time']], dtype=np.uint8)
+        self._lut_params = lut_params
+
+    def _encode_fuel_map(self, fuel_map) -> np.ndarray:
+        """문자열 연료맵을 LUT 인덱스(np.uint8) 격자로 변환"""
+        fuel_codes = np.full(self.grid_shape, self.default_fuel_code, dtype=np.uint8)
+        if fuel_map is None:
+            return fuel_codes
+
+        for code, fuel_name in enumerate(self.fuel_names):
+            fuel_codes[fuel_map == fuel_name] = code
+        return fuel_codes
+
+    def _remap_fuel_codes(self, fuel_codes, code_names) -> np.ndarray:
+        """
+        외부 연료 코드 격자를 LUT 인덱스(np.uint8) 격자로 변환
+
+        code_names[k]는 코드 k의 연료 이름이다. 코드 수만큼의 작은 변환표를
+        만들고 격자 전체는 한 번의 인덱싱으로 바꾸므로 문자열 비교가 없다.
+        """
+        name_to_index = {name: code for code, name in enumerate(self.fuel_names)}
+        remap = np.array([name_to_index.get(str(name), self.default_fuel_code)
+                          for name in code_names], dtype=np.uint8)
+        return remap[np.asarray(fuel_codes)].reshape(self.grid_shape)
+
+    def advance(self, i: int = None) -> np.ndarray:
+        """
+        시뮬레이션 한 스텝 실행 후 통계를 stats_buf[i]에 기록
+
+        i를 생략하면 이번 스텝 번호(step_count - 1)를 사용한다.
+        반환값은 stats_buf의 해당 행(view)이다.
+        """
+        self._update_luts()
+        rand = self.rng.integers(0, PROB_SCALE, size=self.grid_shape, dtype=np.uint16)
+
+        _step_kernel(self.grid, self._next_grid, self.fuel_codes, self.burn_timer,
+                     self.heat, self._next_heat, self.spread_lut, self.heat_output_lut,
+                     self.burn_time_lut, rand, self.ignition_prob, self.ignition_threshold,
+                     self.extinguish_threshold, self.tile_size)
+        _diffuse_heat(self._next_heat, self._heat_tmp, self.heat, self.heat_weights, HEAT_COOLING)
+
+        self.grid, self._next_grid = self._next_grid, self.grid
+        self.step_count += 1
+
+        if i is None:
+            i = self.step_count - 1
+        if i >= len(self.stats_buf):
+            grown = np.zeros((max(i + 1, 2 * len(self.stats_buf)), len(STATS_COLUMNS)),
+                             dtype=np.int32)
+            grown[:len(self.stats_buf)] = self.stats_buf
+            self.stats_buf = grown
+
+        # 커널에서 TREE는 BURNING으로만 바뀌므로 감소한 TREE 수가 새 착화 셀 수
+        previous_trees = self._counts[TREE]
+        self._counts = np.bincount(self.grid.ravel(), minlength=5)
+        row = self.stats_buf[i]
+        row[0] = self._counts[BURNING]
+        row[1] = self._counts[BURNED]
+        row[2] = self._calculate_fire_perimeter()
+        row[3] = previous_trees - self._counts[TREE]
+        return row
+
+    def step(self) -> Dict[str, Any]:
+        """시뮬레이션 한 스텝 실행 (AdvancedCAModel.step과 같은 dict 통계 반환)"""
+        self.advance()
+        stats = self.calculate_statistics()
+        self.history.append(stats)
+        return stats
+
+    def calculate_statistics(self) -> Dict[str, Any]:
+        """현재 상태 통계 계산 (AdvancedCAModel.calculate_statistics와 같은 키)"""
+        counts = np.bincount(self.grid.ravel(), minlength=5)
+        total_cells = self.grid.size
+
+        return {
+            'step': self.step_count,
+            'empty_cells': int(counts[EMPTY]),
+            'tree_cells': int(counts[TREE]),
+            'burning_cells': int(counts[BURNING]),
+            'burned_cells': int(counts[BURNED]),
+            'wet_cells': int(counts[WET]),
+            'total_heat': float(self.heat.sum()),
+            'max_heat': float(self.heat.max()),
+            'fire_perimeter': self._calculate_fire_perimeter(),
+            'burn_ratio': float(counts[BURNED] / total_cells)
+        }
+
+    def _calculate_fire_perimeter(self) -> int:
+        """화재 경계선 길이 계산"""
+        return int(_fire_perimeter(self.grid))
+
+    def is_simulation_complete(self) -> bool:
+        """시뮬레이션 완료 여부 확인 (advance()가 갱신한 상태별 셀 수 사용, 격자 재검사 없음)"""
+        return self._counts[BURNING] == 0
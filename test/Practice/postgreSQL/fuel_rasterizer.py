@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+연료 폴리곤 래스터화 모듈
+폴리곤 경계 선분을 스캔라인 방식으로 격자에 채우는 JIT 컴파일 함수 제공
+"""
+
+import numpy as np
+
+from fire_step_kernel import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def scanline_fill(edges, poly_offsets, poly_values, poly_y_bounds, nrows, ncols, x0, y0, dx, dy):
+    """
+    폴리곤 선분 목록을 격자에 스캔라인 방식으로 채움
+
+    Args:
+        edges: (선분 수, 4) float64 배열 [x1, y1, x2, y2], 폴리곤 순서로 정렬
+        poly_offsets: 폴리곤별 선분 시작 위치 (길이 = 폴리곤 수 + 1)
+        poly_values: 폴리곤별 채울 값 (np.int32)
+        poly_y_bounds: (폴리곤 수, 2) 폴리곤별 [ymin, ymax] (polygon_y_bounds로 계산)
+        nrows, ncols: 출력 격자 크기
+        x0, y0: 격자 왼쪽 위 좌표 (min_x, max_y, Y축 반전)
+        dx, dy: 셀 너비/높이
+
+    Returns:
+        (nrows, ncols) np.int32 격자, 어느 폴리곤에도 속하지 않는 셀은 -1
+
+    셀 중심을 지나는 수평선과 선분의 교점을 폴리곤마다 정렬하고,
+    교점 쌍 사이(짝홀 규칙, 구멍 포함)의 셀을 채운다. 폴리곤이 겹치면
+    나중 폴리곤의 값이 남는다. 행끼리 독립적이므로 행 단위로 병렬 처리한다.
+    Y 범위가 스캔라인을 포함하지 않는 폴리곤은 선분을 보지 않고 건너뛴다.
+    """
+    grid = np.full((nrows, ncols), -1, dtype=np.int32)
+    n_polys = len(poly_values)
+
+    max_edges = 0
+    for p in range(n_polys):
+        max_edges = max(max_edges, poly_offsets[p + 1] - poly_offsets[p])
+
+    for i in prange(nrows):
+        y = y0 - (i + 0.5) * dy
+        crossings = np.empty(max_edges, dtype=np.float64)
+
+        for p in range(n_polys):
+            if y < poly_y_bounds[p, 0] or y >= poly_y_bounds[p, 1]:
+                continue
+
+            n_cross = 0
+            for e in range(poly_offsets[p], poly_offsets[p + 1]):
+                y1 = edges[e, 1]
+                y2 = edges[e, 3]
+                if (y1 <= y < y2) or (y2 <= y < y1):
+                    x1 = edges[e, 0]
+                    crossings[n_cross] = x1 + (y - y1) * (edges[e, 2] - x1) / (y2 - y1)
+                    n_cross += 1
+
+            if n_cross < 2:
+                continue
+
+            row_crossings = np.sort(crossings[:n_cross])
+            for k in range(0, n_cross - 1, 2):
+                # 중심 x가 [xa, xb) 안에 있는 셀
+                j_start = max(int(np.ceil((row_crossings[k] - x0) / dx - 0.5)), 0)
+                j_end = min(int(np.ceil((row_crossings[k + 1] - x0) / dx - 0.5)), ncols)
+                for j in range(j_start, j_end):
+                    grid[i, j] = poly_values[p]
+
+    return grid
+
+
+def polygon_y_bounds(edges, poly_offsets):
+    """폴리곤별 [ymin, ymax] 계산 (scanline_fill의 경계 상자 선필터용)"""
+    starts = poly_offsets[:-1]
+    y_min = np.minimum.reduceat(np.minimum(edges[:, 1], edges[:, 3]), starts)
+    y_max = np.maximum.reduceat(np.maximum(edges[:, 1], edges[:, 3]), starts)
+    return np.column_stack((y_min, y_max))
@@ -4,37 +4,46 @@ PostgreSQL과 화재 모델 연동 사용 예제
 실제 연동 방법과 사용 패턴을 보여주는 예제 코드
 """
 
+import argparse
+import io
+import re
+import sys
+import threading
 import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from model_integration import PostgreSQLModelIntegrator
 from pathlib import Path
+from typing import Optional, Callable, TextIO
 
-def example_basic_integration():
+def example_basic_integration(integrator: Optional[PostgreSQLModelIntegrator] = None,
+                              out: Optional[TextIO] = None):
     """기본 연동 예제"""
-    print("=== 기본 PostgreSQL ↔ 화재 모델 연동 ===")
+    print("=== 기본 PostgreSQL ↔ 화재 모델 연동 ===", file=out)
     
-    integrator = PostgreSQLModelIntegrator()
+    integrator = integrator or PostgreSQLModelIntegrator()
     
     if not integrator.connect():
-        print("❌ 데이터베이스 연결 실패!")
+        print("❌ 데이터베이스 연결 실패!", file=out)
         return
     
     try:
         # 1. 공간 테이블 확인
-        print("\n1. 공간 테이블 조회:")
+        print("\n1. 공간 테이블 조회:", file=out)
         spatial_tables = integrator.get_spatial_tables()
         
         for table in spatial_tables[:3]:  # 처음 3개만 표시
-            print(f"   📊 {table['table_name']}: {table['geometry_type']} (SRID: {table['srid']})")
+            print(f"   📊 {table['table_name']}: {table['geometry_type']} (SRID: {table['srid']})", file=out)
         
         if not spatial_tables:
-            print("   ⚠️  공간 테이블이 없습니다.")
+            print("   ⚠️  공간 테이블이 없습니다.", file=out)
             return
         
         # 2. 첫 번째 테이블로 연료 데이터 추출 테스트
         test_table = spatial_tables[0]['table_name']
         geom_column = spatial_tables[0]['geom_column']
         
-        print(f"\n2. '{test_table}' 테이블에서 연료 데이터 추출:")
+        print(f"\n2. '{test_table}' 테이블에서 연료 데이터 추출:", file=out)
         
         fuel_grid = integrator.extract_fuel_data_from_postgis(
             test_table, 
@@ -42,13 +51,13 @@ def example_basic_integration():
             grid_size=(10, 10)  # 작은 테스트 격자
         )
         
-        print(f"   연료 격자 크기: {fuel_grid.shape}")
-        print(f"   연료 타입: {np.unique(fuel_grid)}")
-        print(f"   샘플 격자:")
-        print(f"   {fuel_grid[:3, :3]}")
+        print(f"   연료 격자 크기: {fuel_grid.shape}", file=out)
+        print(f"   연료 타입: {np.unique(fuel_grid)}", file=out)
+        print(f"   샘플 격자:", file=out)
+        print(f"   {fuel_grid[:3, :3]}", file=out)
         
         # 3. 화재 시뮬레이션 모델 생성 (model 디렉토리가 있는 경우)
-        print(f"\n3. 화재 시뮬레이션 모델 생성:")
+        print(f"\n3. 화재 시뮬레이션 모델 생성:", file=out)
         
         fire_model = integrator.create_fire_simulation_from_postgis(
             test_table,
@@ -61,26 +70,27 @@ def example_basic_integration():
         )
         
         if fire_model:
-            print("   ✅ 화재 모델 생성 성공!")
+            print("   ✅ 화재 모델 생성 성공!", file=out)
             
             # 간단한 시뮬레이션 실행
-            print("\n4. 시뮬레이션 실행 (10 스텝):")
+            print("\n4. 시뮬레이션 실행 (10 스텝):", file=out)
             for step in range(10):
                 stats = fire_model.step()
                 if step % 3 == 0:
                     print(f"      Step {step}: 연소중 {stats.get('burning_cells', 0)}, "
-                          f"연소완료 {stats.get('burned_cells', 0)}")
+                          f"연소완료 {stats.get('burned_cells', 0)}", file=out)
         
-        print("\n✅ 기본 연동 테스트 완료!")
+        print("\n✅ 기본 연동 테스트 완료!", file=out)
         
     finally:
         integrator.disconnect()
 
-def example_data_export_for_model():
+def example_data_export_for_model(integrator: Optional[PostgreSQLModelIntegrator] = None,
+                                  out: Optional[TextIO] = None):
     """모델 입력용 데이터 내보내기 예제"""
-    print("\n=== 모델 입력용 데이터 내보내기 ===")
+    print("\n=== 모델 입력용 데이터 내보내기 ===", file=out)
     
-    integrator = PostgreSQLModelIntegrator()
+    integrator = integrator or PostgreSQLModelIntegrator()
     
     if not integrator.connect():
         return
@@ -94,12 +104,12 @@ def example_data_export_for_model():
         if spatial_tables:
             table_name = spatial_tables[0]['table_name']
             
-            print(f"📁 '{table_name}' 테이블 데이터 내보내기:")
+            print(f"📁 '{table_name}' 테이블 데이터 내보내기:", file=out)
             
             # CSV로 내보내기
             csv_file = exporter.export_table_to_csv(table_name, limit=100)
             if csv_file:
-                print(f"   ✅ CSV 파일: {csv_file}")
+                print(f"   ✅ CSV 파일: {csv_file}", file=out)
             
             # GeoJSON으로 내보내기 (공간 데이터)
             geom_column = spatial_tables[0]['geom_column']
@@ -107,50 +117,58 @@ def example_data_export_for_model():
                 table_name, geom_column, limit=50
             )
             if geojson_file:
-                print(f"   ✅ GeoJSON 파일: {geojson_file}")
+                print(f"   ✅ GeoJSON 파일: {geojson_file}", file=out)
         
     finally:
         integrator.disconnect()
 
-def example_custom_fuel_mapping():
+# 사용자 정의 연료 매핑 규칙 (우선순위 순서, 예: 한국 산림청 임상도 분류)
+CUSTOM_FUEL_RULES = [
+    (re.compile(r'PINE|소나무'), 'TL2'),    # 소나무림
+    (re.compile(r'OAK|참나무'), 'TU2'),     # 참나무림
+    (re.compile(r'MIXED|혼효'), 'TU3'),     # 혼효림
+    (re.compile(r'BAMBOO|대나무'), 'GR1'),  # 대나무(초지류)
+]
+
+def map_fuel_array(raw_fuel_values) -> np.ndarray:
+    """
+    실제 데이터의 연료 값 배열을 Anderson13 연료 모델로 한 번에 매핑
+    
+    - 값이 없으면 'NB1' (비연소성)
+    - CUSTOM_FUEL_RULES 중 먼저 일치하는 규칙의 연료 모델
+    - 일치하는 규칙이 없으면 'TL1' (기본 침엽수)
+    
+    PostgreSQL에서 가져온 컬럼 전체를 한 번에 넘기면
+    셀마다 Python 함수를 호출하지 않고 벡터 연산으로 처리됩니다.
+    """
+    values = pd.Series(raw_fuel_values, dtype=object)
+    missing = values.isna()
+    fuel_str = values.where(~missing, '').astype(str).str.upper()
+    
+    conditions = [fuel_str.str.contains(pattern).to_numpy() for pattern, _ in CUSTOM_FUEL_RULES]
+    choices = [fuel for _, fuel in CUSTOM_FUEL_RULES]
+    
+    mapped = np.select(conditions, choices, default='TL1')
+    mapped[missing.to_numpy()] = 'NB1'
+    return mapped
+
+def example_custom_fuel_mapping(out: Optional[TextIO] = None):
     """사용자 정의 연료 매핑 예제"""
-    print("\n=== 사용자 정의 연료 매핑 ===")
-    
-    # 연료 매핑 함수 예제
-    def custom_fuel_mapper(raw_fuel_value):
-        """
-        실제 데이터의 연료 값을 Anderson13 연료 모델로 매핑하는 사용자 정의 함수
-        """
-        if raw_fuel_value is None:
-            return 'NB1'  # 비연소성
-        
-        fuel_str = str(raw_fuel_value).upper()
-        
-        # 예: 한국 산림청 임상도 분류
-        if 'PINE' in fuel_str or '소나무' in fuel_str:
-            return 'TL2'  # 소나무림
-        elif 'OAK' in fuel_str or '참나무' in fuel_str:
-            return 'TU2'  # 참나무림
-        elif 'MIXED' in fuel_str or '혼효' in fuel_str:
-            return 'TU3'  # 혼효림
-        elif 'BAMBOO' in fuel_str or '대나무' in fuel_str:
-            return 'GR1'  # 대나무(초지류)
-        else:
-            return 'TL1'  # 기본 침엽수
+    print("\n=== 사용자 정의 연료 매핑 ===", file=out)
     
-    # 사용자 정의 매핑을 적용한 연료 추출
-    print("   사용자 정의 연료 매핑 규칙:")
+    # 사용자 정의 매핑을 적용한 연료 추출 (전체 배열을 한 번에 매핑)
+    print("   사용자 정의 연료 매핑 규칙:", file=out)
     test_values = ['PINE_FOREST', '소나무림', 'OAK_FOREST', 'MIXED_FOREST', None, 'UNKNOWN']
     
-    for value in test_values:
-        mapped = custom_fuel_mapper(value)
-        print(f"      '{value}' → '{mapped}'")
+    for value, mapped in zip(test_values, map_fuel_array(test_values)):
+        print(f"      '{value}' → '{mapped}'", file=out)
 
-def example_simulation_with_real_data():
+def example_simulation_with_real_data(integrator: Optional[PostgreSQLModelIntegrator] = None,
+                                      out: Optional[TextIO] = None):
     """실제 데이터를 이용한 시뮬레이션 예제"""
-    print("\n=== 실제 데이터 기반 화재 시뮬레이션 ===")
+    print("\n=== 실제 데이터 기반 화재 시뮬레이션 ===", file=out)
     
-    integrator = PostgreSQLModelIntegrator()
+    integrator = integrator or PostgreSQLModelIntegrator()
     
     if not integrator.connect():
         return
@@ -160,17 +178,18 @@ def example_simulation_with_real_data():
         spatial_tables = integrator.get_spatial_tables()
         
         if not spatial_tables:
-            print("   ⚠️  공간 테이블이 없어 예제를 실행할 수 없습니다.")
+            print("   ⚠️  공간 테이블이 없어 예제를 실행할 수 없습니다.", file=out)
             return
         
         # 첫 번째 테이블로 시뮬레이션
         table_name = spatial_tables[0]['table_name']
-        print(f"   데이터 소스: {table_name}")
+        geom_column = spatial_tables[0]['geom_column']
+        print(f"   데이터 소스: {table_name}", file=out)
         
         # 시뮬레이션 설정
         config = {
             'grid_size': (50, 50),
-            'ignition_points': [(25, 25), (15, 35)],  # 다중 점화점
+            'ignition_points': [(25, 25), (15, 35)],  # 기본 다중 점화점
             'simulation_config': {
                 'tree_density': 0.75,
                 'base_spread_prob': 0.18,
@@ -180,39 +199,55 @@ def example_simulation_with_real_data():
             'steps': 30
         }
         
-        print(f"   격자 크기: {config['grid_size']}")
-        print(f"   점화점: {config['ignition_points']}")
-        print(f"   시뮬레이션 스텝: {config['steps']}")
+        # 실제 피처 분포(군집 중심)에서 점화점 선택, 실패 시 기본 점화점 사용
+        auto_points = integrator.find_ignition_points(
+            table_name, geom_column, grid_size=config['grid_size'], n_points=2
+        )
+        if auto_points:
+            config['ignition_points'] = auto_points
+        
+        print(f"   격자 크기: {config['grid_size']}", file=out)
+        print(f"   점화점: {config['ignition_points']}", file=out)
+        print(f"   시뮬레이션 스텝: {config['steps']}", file=out)
         
         # 시뮬레이션 실행
         result = integrator.run_integrated_simulation(
             table_name, 
-            steps=config['steps']
+            steps=config['steps'],
+            grid_size=config['grid_size'],
+            ignition_points=config['ignition_points'],
+            simulation_config=config['simulation_config']
         )
         
         if result['success']:
             final_stats = result['results']['final_stats']
-            print(f"\n📊 시뮬레이션 결과:")
-            print(f"   총 스텝: {len(result['results']['steps'])}")
-            print(f"   최종 연소 셀: {final_stats['burned_cells']}")
-            print(f"   연소율: {final_stats['burn_ratio']:.1%}")
-            print(f"   화재 둘레: {final_stats['fire_perimeter']}")
+            print(f"\n📊 시뮬레이션 결과:", file=out)
+            print(f"   총 스텝: {len(result['results']['steps'])}", file=out)
+            print(f"   최종 연소 셀: {final_stats['burned_cells']}", file=out)
+            print(f"   연소율: {final_stats['burn_ratio']:.1%}", file=out)
+            print(f"   화재 둘레: {final_stats['fire_perimeter']}", file=out)
             
-            # 연소 패턴 분석
-            burned_over_time = [stat['burned_cells'] for stat in result['results']['statistics']]
-            if len(burned_over_time) > 1:
-                max_spread_rate = max(burned_over_time[i] - burned_over_time[i-1] 
-                                    for i in range(1, len(burned_over_time)))
-                print(f"   최대 확산 속도: {max_spread_rate} 셀/스텝")
+            # 연소 패턴 분석 (stats_array 열: 연소중, 연소완료, 화재 둘레, 신규 착화)
+            stats_array = result['results']['stats_array']
+            burned_over_time = stats_array[:, 1]
+            if burned_over_time.size > 1:
+                max_spread_rate = int(np.diff(burned_over_time).max())
+                print(f"   최대 확산 속도: {max_spread_rate} 셀/스텝", file=out)
+                print(f"   최대 신규 착화: {int(stats_array[:, 3].max())} 셀/스텝", file=out)
+                
+                # 스텝별 연소율 추이 (시각화용)
+                burn_ratio_over_time = result['results']['burn_ratio']
+                print(f"   연소율 추이: {burn_ratio_over_time[0]:.1%} → {burn_ratio_over_time[-1]:.1%}", file=out)
         
     finally:
         integrator.disconnect()
 
-def example_data_preprocessing():
+def example_data_preprocessing(integrator: Optional[PostgreSQLModelIntegrator] = None,
+                               out: Optional[TextIO] = None):
     """데이터 전처리 예제"""
-    print("\n=== 데이터 전처리 및 품질 확인 ===")
+    print("\n=== 데이터 전처리 및 품질 확인 ===", file=out)
     
-    integrator = PostgreSQLModelIntegrator()
+    integrator = integrator or PostgreSQLModelIntegrator()
     
     if not integrator.connect():
         return
@@ -228,22 +263,25 @@ def example_data_preprocessing():
         
         if spatial_tables:
             table_name = spatial_tables[0]['table_name']
-            print(f"📊 '{table_name}' 테이블 품질 분석:")
+            print(f"📊 '{table_name}' 테이블 품질 분석:", file=out)
             
             # 기본 품질 체크
             quality_results = quality_checker.comprehensive_quality_check(table_name)
             
             # 안전한 결과 출력
-            if 'null_analysis' in quality_results:
-                print(f"   NULL 값 품질: {quality_results['null_analysis'].get('quality_score', 0):.1f}/100")
+            checks = quality_results.get('checks', {})
+            null_summary = checks.get('null_values', {}).get('summary')
+            if null_summary:
+                print(f"   NULL 값 품질: {null_summary.get('avg_quality_score', 0):.1f}/100", file=out)
             
-            if 'consistency_analysis' in quality_results:
-                print(f"   데이터 일관성: {quality_results['consistency_analysis'].get('quality_score', 0):.1f}/100")
+            consistency_summary = checks.get('data_consistency', {}).get('summary')
+            if consistency_summary:
+                print(f"   데이터 일관성: {consistency_summary.get('avg_consistency_score', 0):.1f}/100", file=out)
             
-            if 'overall_quality' in quality_results:
-                print(f"   전체 품질 등급: {quality_results['overall_quality'].get('grade', '알 수 없음')}")
+            if 'quality_grade' in quality_results:
+                print(f"   전체 품질 등급: {quality_results['quality_grade']}", file=out)
             else:
-                print(f"   품질 분석 완료: {len(quality_results)} 개 항목 검사됨")
+                print(f"   품질 분석 완료: {len(checks)} 개 항목 검사됨", file=out)
             
             # 공간 데이터 특화 체크
             analyzer = integrator.analyzer
@@ -255,18 +293,18 @@ def example_data_preprocessing():
                 
                 if extent:
                     ext = extent[0]
-                    print(f"\n🌍 공간 데이터 정보:")
+                    print(f"\n🌍 공간 데이터 정보:", file=out)
                     print(f"   공간 범위: X({ext['min_x']:.2f}~{ext['max_x']:.2f}), "
-                          f"Y({ext['min_y']:.2f}~{ext['max_y']:.2f})")
-                    print(f"   총 피처 수: {ext['geom_count']:,}")
-                    print(f"   유효 지오메트리: {ext['valid_geom_count']:,}")
+                          f"Y({ext['min_y']:.2f}~{ext['max_y']:.2f})", file=out)
+                    print(f"   총 피처 수: {ext['geom_count']:,}", file=out)
+                    print(f"   유효 지오메트리: {ext['valid_geom_count']:,}", file=out)
                     
                     # 공간 데이터 품질 평가
                     validity_ratio = ext['valid_geom_count'] / ext['geom_count'] if ext['geom_count'] > 0 else 0
-                    print(f"   지오메트리 유효율: {validity_ratio:.1%}")
+                    print(f"   지오메트리 유효율: {validity_ratio:.1%}", file=out)
         
     except ImportError:
-        print("   ⚠️  품질 검사 모듈을 사용할 수 없습니다.")
+        print("   ⚠️  품질 검사 모듈을 사용할 수 없습니다.", file=out)
     
     finally:
         integrator.disconnect()
@@ -307,13 +345,75 @@ def show_integration_capabilities():
     print("   • 기상 조건 변화에 따른 확산 예측")
     print("   • 방화선 효과 검증")
 
-def main():
-    """메인 함수 - 모든 예제 실행"""
-    print("🔥 PostgreSQL과 화재 모델 연동 예제 모음")
+# 동시 실행 시 예제별 출력이 섞이지 않도록 보호
+_PRINT_LOCK = threading.Lock()
+
+def _run_captured(example: Callable[..., None], target: TextIO):
+    """예제 출력을 자체 버퍼(out)에 모았다가 끝난 뒤 target에 한 번에 기록"""
+    out = io.StringIO()
+    try:
+        example(out=out)
+    except Exception as e:
+        print(f"❌ '{example.__name__}' 실행 실패: {e}", file=out)
     
+    with _PRINT_LOCK:
+        target.write(out.getvalue())
+        target.flush()
+
+def run_all_examples_concurrently(integrator: PostgreSQLModelIntegrator, max_workers: int = 4):
+    """
+    DB를 사용하는 예제들을 스레드 풀에서 동시에 실행
+    
+    각 예제는 자체 통합기를 만들어 공유 커넥션 풀에서 별도 연결(백엔드)을
+    빌려 쓰므로, 한 예제의 DB 대기 시간 동안 다른 예제가 진행됩니다.
+    예제 출력은 예제마다 전달한 버퍼(out)에 모아 끝난 순서대로 표준 출력에 기록하며,
+    sys.stdout은 바꾸지 않습니다. (통합기 내부의 진행 메시지는 표준 출력에 바로 출력됨)
+    """
+    # 풀을 먼저 생성 (비밀번호 입력이 작업 스레드에서 일어나지 않도록)
+    if not integrator.connect():
+        print("❌ 데이터베이스 연결 실패!")
+        return
+    integrator.disconnect()
+    
+    examples = [
+        example_basic_integration,
+        example_data_export_for_model,
+        example_simulation_with_real_data,
+        example_data_preprocessing,
+    ]
+    
+    print(f"\n⚡ {len(examples)}개 예제 동시 실행 (작업자 {max_workers}개)")
+    
+    target = sys.stdout
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda example: _run_captured(example, target), examples))
+    
+    print("\n✅ 전체 예제 실행 완료!")
+
+# 명령줄 이름 → 예제 함수 (모두 통합기 하나를 인자로 받음)
+EXAMPLES = {
+    'basic': example_basic_integration,
+    'export': example_data_export_for_model,
+    'fuel-mapping': lambda integrator: example_custom_fuel_mapping(),
+    'simulation': example_simulation_with_real_data,
+    'preprocessing': example_data_preprocessing,
+}
+
+def interactive_menu(integrator: PostgreSQLModelIntegrator):
+    """사용자 선택 메뉴"""
     show_integration_capabilities()
     
-    # 사용자 선택 메뉴
+    menu_examples = {
+        '1': EXAMPLES['basic'],
+        '2': EXAMPLES['export'],
+        '3': EXAMPLES['fuel-mapping'],
+        '4': EXAMPLES['simulation'],
+        '5': EXAMPLES['preprocessing'],
+        # 전체 통합 인터페이스 실행
+        '6': lambda integrator: integrator.interactive_menu(),
+        '7': run_all_examples_concurrently,
+    }
+    
     while True:
         print("\n" + "-"*50)
         print("📚 실행할 예제를 선택하세요:")
@@ -323,29 +423,52 @@ def main():
         print("4. 실제 데이터 시뮬레이션")
         print("5. 데이터 전처리 및 품질 확인")
         print("6. 전체 연동 인터페이스 실행")
+        print("7. DB 예제 전체 동시 실행")
         print("0. 종료")
         
-        choice = input("\n선택 (0-6): ").strip()
+        choice = input("\n선택 (0-7): ").strip()
         
         if choice == '0':
             print("👋 종료합니다.")
             break
-        elif choice == '1':
-            example_basic_integration()
-        elif choice == '2':
-            example_data_export_for_model()
-        elif choice == '3':
-            example_custom_fuel_mapping()
-        elif choice == '4':
-            example_simulation_with_real_data()
-        elif choice == '5':
-            example_data_preprocessing()
-        elif choice == '6':
-            # 전체 통합 인터페이스 실행
-            integrator = PostgreSQLModelIntegrator()
-            integrator.interactive_menu()
+        elif choice in menu_examples:
+            menu_examples[choice](integrator)
         else:
             print("❌ 잘못된 선택입니다.")
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """명령줄 인자 파싱"""
+    parser = argparse.ArgumentParser(
+        description="PostgreSQL과 화재 모델 연동 예제 모음",
+        epilog="예: python -m cProfile -o out.prof integration_examples.py basic -n 20"
+    )
+    parser.add_argument('cmd', nargs='?', default='menu',
+                        choices=list(EXAMPLES) + ['all', 'menu'],
+                        help="실행할 예제 (all: DB 예제 전체 동시 실행, menu: 대화형 메뉴)")
+    parser.add_argument('-n', '--repeat', type=int, default=1,
+                        help="예제 반복 실행 횟수 (기본값: 1)")
+    parser.add_argument('-j', '--workers', type=int, default=4,
+                        help="all 실행 시 작업자 수 (기본값: 4)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 함수 - 명령줄에서 선택한 예제 실행"""
+    args = parse_args(argv)
+    
+    print("🔥 PostgreSQL과 화재 모델 연동 예제 모음")
+    
+    # 모든 예제가 하나의 통합기(풀 연결)를 재사용
+    integrator = PostgreSQLModelIntegrator()
+    
+    if args.cmd == 'menu':
+        interactive_menu(integrator)
+        return
+    
+    for _ in range(max(args.repeat, 1)):
+        if args.cmd == 'all':
+            run_all_examples_concurrently(integrator, max_workers=args.workers)
+        else:
+            EXAMPLES[args.cmd](integrator)
+
 if __name__ == "__main__":
     main()
@@ -11,11 +11,35 @@ import os
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 import json
+import time
+import base64
+from datetime import datetime
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2 import sql
 
 # 현재 디렉토리에서 모듈 임포트
 from db_connection import PostgreSQLConnection
 from table_analyzer import PostgreSQLTableAnalyzer
 from data_exporter import PostgreSQLDataExporter
+from fire_step_kernel import KernelFireModel, NUMBA_AVAILABLE, TILE_SIZE, STATS_COLUMNS
+from fuel_rasterizer import scanline_fill, polygon_y_bounds
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# method='shapely'는 Shapely 2.0 이상의 벡터화 API(from_wkb, points, STRtree.query(predicate=...))를 사용
+# (1.8 이하에는 이 이름들이 shapely 최상위에 없어 ImportError로 사용 불가 처리)
+try:
+    from shapely import STRtree, from_wkb, points
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
 
 # model 디렉토리 추가
 model_path = Path(__file__).parent.parent / "model"
@@ -113,25 +137,185 @@ class PostgreSQLModelIntegrator:
     ═══════════════════════════════════════════════════════════════════
     """
     
-    def __init__(self):
-        self.db = PostgreSQLConnection()
+    # 공간 테이블 목록 조회 쿼리 (세션마다 한 번 PREPARE)
+    SPATIAL_TABLES_QUERY = """
+        SELECT 
+            f_table_name as table_name,
+            f_geometry_column as geom_column,
+            type as geometry_type,
+            srid,
+            coord_dimension as dimensions
+        FROM geometry_columns
+        ORDER BY f_table_name
+        """
+    
+    # 연료 관련 컬럼 후보 조회 쿼리 ($1: 테이블명)
+    FUEL_COLUMNS_QUERY = """
+        SELECT column_name, data_type
+        FROM information_schema.columns 
+        WHERE table_name = $1
+        AND (column_name ILIKE '%fuel%' OR 
+             column_name ILIKE '%forest%' OR 
+             column_name ILIKE '%vegetation%' OR
+             column_name ILIKE '%storunst%' OR
+             column_name ILIKE '%frtp%' OR
+             column_name ILIKE '%임상%' OR
+             column_name ILIKE '%수종%' OR
+             column_name ILIKE '%tree%' OR
+             column_name ILIKE '%wood%' OR
+             column_name ILIKE '%landcover%')
+        """
+    
+    # 고도 관련 컬럼 후보 조회 쿼리 ($1: 테이블명)
+    ELEVATION_COLUMNS_QUERY = """
+        SELECT column_name
+        FROM information_schema.columns 
+        WHERE table_name = $1
+        AND (column_name ILIKE '%elevation%' OR 
+             column_name ILIKE '%height%' OR 
+             column_name ILIKE '%dem%' OR
+             column_name ILIKE '%altitude%')
+        """
+    
+    # 테이블의 전체 컬럼명 조회 쿼리 ($1: 테이블명, 식별자 검증용)
+    TABLE_COLUMNS_QUERY = """
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = $1
+        """
+    
+    # 기하 컬럼의 GIST 인덱스 존재 여부 조회 쿼리 ($1: 테이블명, $2: 컬럼명)
+    GIST_INDEX_QUERY = """
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_am am ON am.oid = c.relam
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = to_regclass(quote_ident($1))
+          AND a.attname = $2
+          AND am.amname = 'gist'
+        LIMIT 1
+        """
+    
+    # 세션마다 PREPARE 하는 문장 (이름 → 쿼리)
+    PREPARED_QUERIES = {
+        'spatial_tables_q': SPATIAL_TABLES_QUERY,
+        'fuel_columns_q': FUEL_COLUMNS_QUERY,
+        'elevation_columns_q': ELEVATION_COLUMNS_QUERY,
+        'table_columns_q': TABLE_COLUMNS_QUERY,
+        'gist_index_q': GIST_INDEX_QUERY,
+    }
+    
+    # 한국 산림청 분류 → Anderson13 연료 모델 (그 외 값은 'TL1')
+    FUEL_MAPPING = {
+        # 침엽수림
+        '1': 'TL1',  # 침엽수 - 낮은 밀도
+        '2': 'TL2',  # 침엽수 - 중간 밀도
+        '3': 'TL3',  # 침엽수 - 높은 밀도
+        
+        # 활엽수림
+        '4': 'TU1',  # 활엽수 - 낮은 밀도
+        '5': 'TU2',  # 활엽수 - 중간 밀도
+        '6': 'TU3',  # 활엽수 - 높은 밀도
+        
+        # 혼효림
+        '7': 'TU4',  # 혼효림
+        '8': 'TU5',  # 혼효림 - 높은 밀도
+        
+        # 기타
+        '0': 'NB1',  # 비연소성
+        '9': 'GR1',  # 초지
+    }
+    
+    # 연료 코드(np.uint8) → Anderson13 연료 모델 (AdvancedCAModel.fuel_properties의 연료)
+    CODE_TO_FUEL = np.array(['NB1', 'TL1', 'TL2', 'TL3', 'TU1', 'TU2', 'TU3',
+                             'TU4', 'TU5', 'GS1', 'GR1', 'SH1'], dtype='<U4')
+    DEFAULT_FUEL_CODE = 1  # 'TL1'
+    
+    # 스캔라인 래스터화 전 폴리곤 단순화 허용 오차 (셀 크기 대비 비율)
+    SIMPLIFY_CELL_FRACTION = 0.1
+    
+    # 공간 테이블 목록 캐시 유효 시간 (초)
+    SPATIAL_TABLES_TTL = 300
+    
+    # 셀 중심점-폴리곤 조인을 동시에 실행할 최대 스레드(연결) 수
+    FUEL_QUERY_WORKERS = 3
+    
+    # 공간 범위 디스크 캐시 (실행 간 재사용, 테이블 버전으로 유효성 확인)
+    EXTENT_CACHE_FILE = os.path.join("exports", ".extent_cache.json")
+    
+    def __init__(self, create_missing_indexes: bool = False):
+        # True이면 추출 대상 기하 컬럼에 GIST 인덱스가 없을 때 생성
+        self.create_missing_indexes = create_missing_indexes
+        self._spatial_tables_cache = None  # (조회 시각, 결과)
+        self._srid_cache = {}  # (테이블명, 기하 컬럼) → SRID
+        self._column_cache = {}  # (용도, 테이블명) → (조회 시각, 카탈로그 조회 결과)
+        self._extent_cache = self._load_extent_cache()  # '테이블.컬럼' → {'version', 'extent'}
+        self._extent_cache_lock = threading.Lock()
+        
+        # 공유 커넥션 풀 사용: 예제/메뉴를 반복 실행해도 백엔드 프로세스 재사용
+        self.db = PostgreSQLConnection(use_pool=True)
         self.analyzer = PostgreSQLTableAnalyzer()
         self.exporter = PostgreSQLDataExporter()
         
     def connect(self):
-        """데이터베이스 연결"""
+        """데이터베이스 연결 (풀에서 연결 획득)"""
         if not self.db.connect():
             return False
         
+        # 읽기 전용 조회 위주이므로 암묵적 BEGIN/COMMIT 왕복 생략
+        self.db.connection.autocommit = True
+        
+        # 새 백엔드 세션이면 카탈로그/계획 캐시 예열
+        if not self.db.is_prepared('spatial_tables_q'):
+            self._warm_session_caches()
+        
         # 각 모듈에 연결 공유
         self.analyzer.db = self.db
         self.exporter.db = self.db
         return True
     
     def disconnect(self):
-        """데이터베이스 연결 해제"""
+        """데이터베이스 연결 해제 (풀에 반환)"""
         self.db.disconnect()
     
+    def _warm_session_caches(self):
+        """
+        세션 예열 프롤로그 (백엔드당 한 번)
+        
+        PostgreSQL의 카탈로그/릴레이션/계획 캐시는 백엔드마다 비어 있는 상태로
+        시작하므로, 연결 직후 사용할 문장을 모두 (한 번의 왕복으로) PREPARE 하고 공간 테이블을
+        한 번씩 계획에 포함시켜 이후 첫 조회가 캐시를 채우는 비용을 내지 않게 합니다.
+        """
+        self.db.prepare_statements(self.PREPARED_QUERIES)
+        
+        # 검색 경로에서 보이는 공간 테이블만 대상으로 함
+        table_names = sorted({table['table_name'] for table in self.get_spatial_tables()})
+        if not table_names:
+            return
+        visible_tables = self.db.execute_query(
+            "SELECT relname FROM pg_class WHERE relname = ANY(%s) AND pg_table_is_visible(oid)",
+            (table_names,)
+        )
+        if not visible_tables:
+            return
+        
+        # WHERE false: 계획 단계에서 릴레이션/통계 캐시만 채우고 스캔은 하지 않음
+        touch_query = sql.SQL(" UNION ALL ").join(
+            sql.SQL("(SELECT 1 FROM {} WHERE false)").format(sql.Identifier(row['relname']))
+            for row in visible_tables
+        )
+        self.db.execute_query(touch_query)
+    
+    def _execute_prepared(self, name: str, params: tuple = ()) -> List[Dict]:
+        """PREPARED_QUERIES의 문장을 EXECUTE (현재 세션에 없으면 먼저 PREPARE)"""
+        if not self.db.prepare_statement(name, self.PREPARED_QUERIES[name]):
+            return []
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            return self.db.execute_query(f"EXECUTE {name} ({placeholders})", params)
+        return self.db.execute_query(f"EXECUTE {name}")
+    
     def get_spatial_tables(self) -> List[Dict]:
         """
         공간 데이터 테이블 목록 조회
@@ -165,23 +349,27 @@ class PostgreSQLModelIntegrator:
         - 화재 시뮬레이션용 산림 구획 선택
         - 지형 분석용 고도 포인트 확인
         - 위험 지역 분석용 경계 폴리곤 활용
+        
+        결과는 SPATIAL_TABLES_TTL 동안 인스턴스에 캐시되어
+        메뉴/예제 반복 실행 시 DB 왕복을 생략합니다.
         """
-        query = """
-        SELECT 
-            f_table_name as table_name,
-            f_geometry_column as geom_column,
-            type as geometry_type,
-            srid,
-            coord_dimension as dimensions
-        FROM geometry_columns
-        ORDER BY f_table_name
-        """
-        return self.db.execute_query(query)
+        if self._spatial_tables_cache is not None:
+            cached_at, cached_tables = self._spatial_tables_cache
+            if time.monotonic() - cached_at < self.SPATIAL_TABLES_TTL:
+                return list(cached_tables)
+        
+        spatial_tables = self._execute_prepared('spatial_tables_q')
+        
+        if spatial_tables:
+            self._spatial_tables_cache = (time.monotonic(), spatial_tables)
+        return list(spatial_tables)
     
     def extract_fuel_data_from_postgis(self, table_name: str, 
                                       geom_column: str = 'geom',
                                       fuel_column: str = None,
-                                      grid_size: Tuple[int, int] = (100, 100)) -> np.ndarray:
+                                      grid_size: Tuple[int, int] = (100, 100),
+                                      method: str = 'postgis',
+                                      as_codes: bool = False) -> np.ndarray:
         """
         PostGIS 테이블에서 연료 데이터 추출
         
@@ -215,28 +403,30 @@ class PostgreSQLModelIntegrator:
             geom_column: 기하 컬럼명
             fuel_column: 연료 타입 컬럼명
             grid_size: 출력 격자 크기
+            method: 'postgis' (서버에서 셀 중심점-폴리곤 조인),
+                    'scanline' (폴리곤 선분을 가져와 로컬에서 스캔라인 래스터화),
+                    'shapely' (폴리곤을 가져와 shapely STRtree로 셀 중심점 일괄 판정) 또는
+                    'raster' (PostGIS 래스터로 서버에서 래스터화해 격자 하나로 수신)
+            as_codes: True이면 연료 코드 격자(np.uint8, CODE_TO_FUEL 인덱스) 반환
             
         Returns:
-            연료 타입 격자 배열
+            연료 타입 격자 배열 (as_codes=True이면 연료 코드 격자)
         """
-        print(f"🔥 '{table_name}' 테이블에서 연료 데이터 추출 중...")
+        if method not in ('postgis', 'scanline', 'shapely', 'raster'):
+            raise ValueError(f"지원하지 않는 추출 방식입니다: {method}")
+        if method == 'shapely' and not SHAPELY_AVAILABLE:
+            raise ValueError("method='shapely'에는 shapely 2.0 이상이 필요합니다.")
         
-        # 테이블의 공간 범위 계산
-        extent_query = f"""
-        SELECT 
-            ST_XMin(ST_Extent({geom_column})) as min_x,
-            ST_YMin(ST_Extent({geom_column})) as min_y,
-            ST_XMax(ST_Extent({geom_column})) as max_x,
-            ST_YMax(ST_Extent({geom_column})) as max_y
-        FROM "{table_name}"
-        WHERE {geom_column} IS NOT NULL
-        """
+        self._validate_identifiers(table_name, geom_column,
+                                   *([fuel_column] if fuel_column is not None else []))
         
-        extent_result = self.db.execute_query(extent_query)
-        if not extent_result:
+        print(f"🔥 '{table_name}' 테이블에서 연료 데이터 추출 중...")
+        
+        # 테이블의 공간 범위 계산 (테이블이 바뀌지 않았으면 캐시 사용)
+        extent = self._get_extent(table_name, geom_column)
+        if extent is None:
             raise ValueError(f"테이블 '{table_name}'에서 공간 범위를 계산할 수 없습니다.")
         
-        extent = extent_result[0]
         min_x, min_y = extent['min_x'], extent['min_y']
         max_x, max_y = extent['max_x'], extent['max_y']
         
@@ -251,80 +441,530 @@ class PostgreSQLModelIntegrator:
         # 연료 매핑을 위한 컬럼 확인
         if fuel_column is None:
             # 가능한 연료 관련 컬럼 찾기
-            columns_query = f"""
-            SELECT column_name, data_type
-            FROM information_schema.columns 
-            WHERE table_name = '{table_name}'
-            AND (column_name ILIKE '%fuel%' OR 
-                 column_name ILIKE '%forest%' OR 
-                 column_name ILIKE '%vegetation%' OR
-                 column_name ILIKE '%storunst%' OR
-                 column_name ILIKE '%frtp%' OR
-                 column_name ILIKE '%임상%' OR
-                 column_name ILIKE '%수종%' OR
-                 column_name ILIKE '%tree%' OR
-                 column_name ILIKE '%wood%' OR
-                 column_name ILIKE '%landcover%')
-            """
-            fuel_columns = self.db.execute_query(columns_query)
+            fuel_column = self._find_fuel_column(table_name)
             
-            if fuel_columns:
-                fuel_column = fuel_columns[0]['column_name']
+            if fuel_column:
                 print(f"   연료 컬럼 자동 선택: {fuel_column}")
             else:
                 print("   ⚠️  연료 컬럼을 찾을 수 없어 기본 연료 타입을 사용합니다.")
-                fuel_column = None
         
-        # 격자 기반 연료 데이터 추출
-        fuel_grid = np.full(grid_size, 'TL1', dtype='<U10')  # 기본값: TL1
+        # 격자 기반 연료 데이터 추출 (연료 코드로 보관, 문자열은 반환 시에만 생성)
+        fuel_grid = np.full(grid_size, self.DEFAULT_FUEL_CODE, dtype=np.uint8)  # 기본값: TL1
+        
+        if not fuel_column:
+            print(f"   ✅ 연료 데이터 추출 완료")
+            return fuel_grid if as_codes else self.CODE_TO_FUEL[fuel_grid]
+        
+        grid = (min_x, max_y, cell_width, cell_height)
+        if method == 'scanline':
+            cell_indices, fuel_values = self._fuel_cells_scanline(
+                table_name, geom_column, fuel_column, grid_size, grid)
+        elif method == 'shapely':
+            cell_indices, fuel_values = self._fuel_cells_shapely(
+                table_name, geom_column, fuel_column, grid_size, grid)
+        elif method == 'raster':
+            cell_indices, fuel_values = self._fuel_cells_raster(
+                table_name, geom_column, fuel_column, grid_size, grid)
+        else:
+            self._check_spatial_index(table_name, geom_column)
+            cell_indices, fuel_values = self._fuel_cells_postgis(
+                table_name, geom_column, fuel_column, grid_size, grid)
+        
+        matched_cells = len(cell_indices)
+        if matched_cells:
+            # 연료 값 배열 전체를 한 번에 매핑해 평탄화된 격자에 배치
+            # (서버에서 이미 코드로 매핑된 경우 np.uint8 배열을 그대로 사용)
+            if isinstance(fuel_values, np.ndarray) and fuel_values.dtype == np.uint8:
+                fuel_grid.reshape(-1)[cell_indices] = fuel_values
+            else:
+                fuel_grid.reshape(-1)[cell_indices] = self._fuel_to_codes(self._map_fuel_types(fuel_values))
         
-        # 각 격자 셀에 대해 공간 쿼리 실행
-        batch_size = 20  # 배치 처리로 성능 향상
+        print(f"   연료 정보가 있는 셀: {matched_cells}/{fuel_grid.size}")
+        print(f"   ✅ 연료 데이터 추출 완료")
+        return fuel_grid if as_codes else self.CODE_TO_FUEL[fuel_grid]
+    
+    def _fuel_to_codes(self, fuel_names: np.ndarray) -> np.ndarray:
+        """연료 모델 이름 배열을 연료 코드(np.uint8) 배열로 변환 (알 수 없는 연료는 TL1)"""
+        order = np.argsort(self.CODE_TO_FUEL)
+        positions = np.searchsorted(self.CODE_TO_FUEL, fuel_names, sorter=order)
+        codes = order[np.minimum(positions, len(order) - 1)]
+        known = self.CODE_TO_FUEL[codes] == fuel_names
+        if not known.all():
+            print(f"   ⚠️  알 수 없는 연료 모델을 TL1로 처리합니다: {sorted({str(name) for name in np.asarray(fuel_names)[~known]})}")
+            codes = np.where(known, codes, self.DEFAULT_FUEL_CODE)
+        return codes.astype(np.uint8)
+    
+    def _fuel_cells_postgis(self, table_name: str, geom_column: str, fuel_column: str,
+                            grid_size: Tuple[int, int], grid: Tuple[float, float, float, float]):
+        """
+        셀 중심점-폴리곤 조인으로 셀별 연료 값 조회
         
-        for i in range(0, grid_size[0], batch_size):
-            for j in range(0, grid_size[1], batch_size):
-                # 배치 영역 계산
-                batch_queries = []
-                coordinates = []
-                
-                for bi in range(i, min(i + batch_size, grid_size[0])):
-                    for bj in range(j, min(j + batch_size, grid_size[1])):
-                        # 셀 중심점 계산
-                        center_x = min_x + (bj + 0.5) * cell_width
-                        center_y = max_y - (bi + 0.5) * cell_height  # Y축 반전
-                        
-                        coordinates.append((bi, bj, center_x, center_y))
-                
-                # 배치 쿼리 실행
-                if coordinates:
-                    self._process_fuel_batch(table_name, geom_column, fuel_column, 
-                                           coordinates, fuel_grid)
+        폴리곤마다 경계 상자 안의 셀 중심점만 서버에서 생성해 ST_Contains로 판정하고,
+        셀마다 최빈 연료 타입을 집계한 뒤 (셀 인덱스, 연료) 배열 한 쌍으로 반환
+        (셀 단위 왕복 쿼리, 행 단위 결과 변환 없음). 폴리곤이 범위의 일부만 덮는
+        테이블에서도 빈 영역의 셀은 생성하지 않습니다.
         
-        print(f"   ✅ 연료 데이터 추출 완료")
-        return fuel_grid
-    
-    def _process_fuel_batch(self, table_name: str, geom_column: str, 
-                           fuel_column: Optional[str], coordinates: List[Tuple], 
-                           fuel_grid: np.ndarray):
-        """배치 단위로 연료 데이터 처리"""
-        for i, j, x, y in coordinates:
-            # 해당 지점의 연료 타입 조회
-            if fuel_column:
-                fuel_query = f"""
-                SELECT {fuel_column} as fuel_type
-                FROM "{table_name}"
-                WHERE ST_Contains({geom_column}, ST_SetSRID(ST_Point(%s, %s), 
-                    (SELECT srid FROM geometry_columns WHERE f_table_name = %s LIMIT 1)))
-                LIMIT 1
-                """
-                result = self.db.execute_query(fuel_query, (x, y, table_name))
-                
-                if result:
-                    fuel_type = result[0]['fuel_type']
-                    # 연료 타입 매핑
-                    mapped_fuel = self._map_fuel_type(fuel_type)
-                    fuel_grid[i, j] = mapped_fuel
-            # else: 기본값 유지 (TL1)
+        _map_fuel_type을 교체하지 않았으면 FUEL_MAPPING을 CASE 식으로 옮겨
+        서버에서 연료 코드(smallint)까지 계산하고, 연료 값 대신 np.uint8 코드 배열을 반환합니다.
+        
+        연결 풀을 사용하면 격자를 최대 FUEL_QUERY_WORKERS개의 행 띠로 나누고,
+        현재 연결과 풀에서 지금 빌릴 수 있는 연결로 띠를 스레드에서 동시에 실행합니다.
+        (_run_row_bands 참고)
+        """
+        min_x, max_y, cell_width, cell_height = grid
+        
+        # 테이블/컬럼 조합마다 한 번 PREPARE 하고 격자 파라미터만 바꿔 EXECUTE
+        # ($1: 열 수, $2: 행 수, $3/$4: min_x/max_y, $5/$6: 셀 너비/높이, $7: SRID)
+        fuel_mode = sql.SQL("mode() WITHIN GROUP (ORDER BY t.{})").format(sql.Identifier(fuel_column))
+        fuel_case = self._fuel_code_case_sql(fuel_mode)
+        # 셀 인덱스와 (서버에서 매핑한) 연료 코드는 빅엔디언 이진값을 이어 붙인 bytea로 받아
+        # 숫자 문자열 해석 없이 np.frombuffer로 읽음
+        if fuel_case is None:
+            fuel_expr = sql.SQL("{}::text").format(fuel_mode)
+            values_agg = sql.SQL("array_agg(fuel_value)")
+            values_dtype = object
+        else:
+            fuel_expr = fuel_case
+            values_agg = sql.SQL("string_agg(int2send(fuel_value), ''::bytea)")
+            values_dtype = np.uint8
+        fuel_query = sql.SQL("""
+        WITH cell_fuel AS (
+            SELECT gy * $1::int + gx AS cell_index, {fuel_expr} AS fuel_value
+            FROM {table} t
+            -- 폴리곤 경계 상자 안의 셀만 생성 (범위 밖 셀은 아예 만들지 않음)
+            CROSS JOIN LATERAL generate_series(
+                GREATEST(ceil(($4::float8 - ST_YMax(t.{geom})) / $6::float8 - 0.5)::int, 0),
+                LEAST(floor(($4::float8 - ST_YMin(t.{geom})) / $6::float8 - 0.5)::int, $2::int - 1)
+            ) AS gy
+            CROSS JOIN LATERAL generate_series(
+                GREATEST(ceil((ST_XMin(t.{geom}) - $3::float8) / $5::float8 - 0.5)::int, 0),
+                LEAST(floor((ST_XMax(t.{geom}) - $3::float8) / $5::float8 - 0.5)::int, $1::int - 1)
+            ) AS gx
+            WHERE t.{geom} && ST_MakeEnvelope(  -- 격자(띠) 범위 선필터 (인덱스)
+                      $3::float8, $4::float8 - $2::int * $6::float8,
+                      $3::float8 + $1::int * $5::float8, $4::float8, $7::int)
+              AND ST_Contains(t.{geom},
+                              ST_SetSRID(ST_Point($3::float8 + (gx + 0.5) * $5::float8,
+                                                  $4::float8 - (gy + 0.5) * $6::float8),  -- Y축 반전
+                                         $7::int))
+            GROUP BY 1
+        )
+        SELECT string_agg(int4send(cell_index), ''::bytea) AS cell_indices, {values_agg} AS fuel_values
+        FROM cell_fuel
+        """).format(fuel_expr=fuel_expr, values_agg=values_agg, table=sql.Identifier(table_name),
+                    geom=sql.Identifier(geom_column))
+        # 문장 이름(해시)과 PREPARE에 쓰도록 SQL 문자열로 변환
+        fuel_query = fuel_query.as_string(self.db.connection)
+        statement = "fuel_cells_" + hashlib.md5(fuel_query.encode('utf-8')).hexdigest()[:16]
+        srid = self._get_srid(table_name, geom_column)
+        n_rows, n_cols = grid_size
+        
+        def run_band(db, row_start, row_stop):
+            # 행 범위 [row_start, row_stop)를 하나의 격자로 보고 조회한 뒤 셀 인덱스를 전체 격자 기준으로 보정
+            empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=values_dtype))
+            if not db.prepare_statement(statement, fuel_query):
+                return empty
+            result = db.execute_query(
+                f"EXECUTE {statement} (%s, %s, %s, %s, %s, %s, %s)",
+                (n_cols, row_stop - row_start, float(min_x), float(max_y - row_start * cell_height),
+                 float(cell_width), float(cell_height), srid)
+            )
+            if not result or result[0]['cell_indices'] is None:
+                return empty
+            cell_indices = np.frombuffer(result[0]['cell_indices'], dtype='>i4').astype(np.intp)
+            if values_dtype is object:
+                fuel_values = np.asarray(result[0]['fuel_values'], dtype=object)
+            else:
+                fuel_values = np.frombuffer(result[0]['fuel_values'], dtype='>i2').astype(np.uint8)
+            return cell_indices + row_start * n_cols, fuel_values
+        
+        return self._run_row_bands(n_rows, run_band)
+    
+    def _run_row_bands(self, n_rows: int, run_band):
+        """
+        run_band(db, 행 시작, 행 끝)을 행 띠로 나눠 실행하고 (셀 인덱스, 값) 결과를 이어 붙임
+        
+        띠 수는 현재 연결 하나에 풀에서 지금 바로 빌린 연결 수를 더한 값입니다 (최대
+        FUEL_QUERY_WORKERS). 다른 스레드/예제가 풀을 모두 쓰고 있으면 기다리거나 오류를
+        남기지 않고 현재 연결 하나로 전체를 조회합니다.
+        """
+        borrowed = self._borrow_pooled_connections(min(self.FUEL_QUERY_WORKERS, n_rows) - 1)
+        if not borrowed:
+            return run_band(self.db, 0, n_rows)
+        
+        connections = [self.db] + borrowed
+        bounds = [int(b) for b in np.linspace(0, n_rows, len(connections) + 1)]
+        try:
+            # 띠마다 셀 범위가 겹치지 않으므로 결과는 이어 붙이기만 하면 됨
+            with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+                bands = list(executor.map(
+                    lambda band: run_band(connections[band], bounds[band], bounds[band + 1]),
+                    range(len(connections))))
+        finally:
+            for db in borrowed:
+                db.disconnect()
+        cell_indices = np.concatenate([indices for indices, _ in bands])
+        fuel_values = np.concatenate([values for _, values in bands])
+        return cell_indices, fuel_values
+    
+    def _borrow_pooled_connections(self, count: int) -> List[PostgreSQLConnection]:
+        """현재 연결과 같은 풀에서 최대 count개의 연결을 대기 없이 빌림 (남은 연결이 없으면 빈 목록)"""
+        borrowed = []
+        if not self.db.use_pool:
+            return borrowed
+        for _ in range(count):
+            db = PostgreSQLConnection(host=self.db.host, port=self.db.port, user=self.db.user,
+                                      database=self.db.database, password=self.db.password,
+                                      use_pool=True, max_connections=self.db.max_connections)
+            if not db.try_connect_pooled():
+                break
+            borrowed.append(db)
+        return borrowed
+    
+    def _fuel_code_case_sql(self, value_expr: sql.Composable) -> Optional[sql.Composed]:
+        """
+        FUEL_MAPPING을 연료 코드를 돌려주는 SQL CASE 식으로 변환
+        
+        _map_fuel_type이 사용자 함수로 교체된 경우 (하위 클래스 재정의 또는 인스턴스 속성 대입)
+        서버에서 같은 매핑을 재현할 수 없으므로 None 반환
+        """
+        if getattr(self._map_fuel_type, '__func__', None) is not PostgreSQLModelIntegrator._map_fuel_type:
+            return None
+        
+        keys = list(self.FUEL_MAPPING)
+        codes = self._fuel_to_codes(np.array([self.FUEL_MAPPING[key] for key in keys]))
+        whens = sql.SQL(" ").join(
+            sql.SQL("WHEN {} THEN {}").format(sql.Literal(str(key).upper()), sql.Literal(int(code)))
+            for key, code in zip(keys, codes)
+        )
+        return sql.SQL("(CASE upper(({})::text) {} ELSE {} END)::smallint").format(
+            value_expr, whens, sql.Literal(int(self._fuel_to_codes(np.array(['TL1']))[0])))
+    
+    def _fuel_cells_scanline(self, table_name: str, geom_column: str, fuel_column: str,
+                             grid_size: Tuple[int, int], grid: Tuple[float, float, float, float]):
+        """
+        폴리곤 선분을 한 번에 가져와 로컬에서 스캔라인 래스터화
+        
+        폴리곤 경계를 ST_DumpSegments(PostGIS 3.2+)로 선분 단위로 풀어 COPY BINARY로 받고,
+        연료 값은 정렬 순위(dense_rank)로 전달해 숫자 배열만 전송합니다.
+        경계는 셀 크기의 SIMPLIFY_CELL_FRACTION 이내 오차로 단순화해 선분 수를 줄입니다.
+        폴리곤이 겹치는 셀은 최빈값 대신 나중 폴리곤의 값을 사용합니다.
+        """
+        min_x, max_y, cell_width, cell_height = grid
+        
+        fuel_types = self._fuel_categories(table_name, geom_column, fuel_column)
+        if len(fuel_types) == 0:
+            return np.empty(0, dtype=np.intp), []
+        
+        segments = self.db.copy_query_to_array(
+            sql.SQL("""
+            WITH polys AS (
+                SELECT
+                    row_number() OVER () AS poly_id,
+                    dense_rank() OVER (ORDER BY {fuel}::text) - 1 AS fuel_rank,
+                    {geom} AS geom
+                FROM {table}
+                WHERE ST_Dimension({geom}) = 2
+            )
+            SELECT
+                p.poly_id::int4,
+                p.fuel_rank::int4,
+                ST_X(ST_StartPoint(d.geom))::float8,
+                ST_Y(ST_StartPoint(d.geom))::float8,
+                ST_X(ST_EndPoint(d.geom))::float8,
+                ST_Y(ST_EndPoint(d.geom))::float8
+            FROM polys p,
+                 ST_DumpSegments(ST_SimplifyPreserveTopology(ST_Force2D(p.geom), %(tolerance)s)) d
+            WHERE ST_Y(ST_StartPoint(d.geom)) <> ST_Y(ST_EndPoint(d.geom))  -- 수평 선분 제외
+            ORDER BY p.poly_id
+            """).format(fuel=sql.Identifier(fuel_column), geom=sql.Identifier(geom_column),
+                        table=sql.Identifier(table_name)),
+            [('poly_id', 'i4'), ('fuel_rank', 'i4'),
+             ('x1', 'f8'), ('y1', 'f8'), ('x2', 'f8'), ('y2', 'f8')],
+            params={'tolerance': float(min(cell_width, cell_height)) * self.SIMPLIFY_CELL_FRACTION}
+        )
+        if len(segments) == 0:
+            return np.empty(0, dtype=np.intp), []
+        
+        # 폴리곤별 선분 구간과 연료 순위
+        starts = np.flatnonzero(np.diff(segments['poly_id'])) + 1
+        poly_offsets = np.concatenate(([0], starts, [len(segments)])).astype(np.int64)
+        poly_values = segments['fuel_rank'][poly_offsets[:-1]].astype(np.int32)
+        edges = np.column_stack((segments['x1'], segments['y1'], segments['x2'], segments['y2']))
+        
+        rank_grid = scanline_fill(edges, poly_offsets, poly_values,
+                                  polygon_y_bounds(edges, poly_offsets),
+                                  grid_size[0], grid_size[1],
+                                  float(min_x), float(max_y), float(cell_width), float(cell_height))
+        
+        cell_indices = np.flatnonzero(rank_grid.ravel() >= 0)
+        return cell_indices, fuel_types[rank_grid.ravel()[cell_indices]]
+    
+    def _fuel_categories(self, table_name: str, geom_column: str, fuel_column: str) -> np.ndarray:
+        """연료 값 목록 (순위 → 값, dense_rank와 같은 정렬: NULL은 마지막)"""
+        categories = self.db.execute_query(sql.SQL("""
+            SELECT DISTINCT {fuel}::text AS fuel_type
+            FROM {table}
+            WHERE ST_Dimension({geom}) = 2
+            ORDER BY 1
+        """).format(fuel=sql.Identifier(fuel_column), table=sql.Identifier(table_name),
+                    geom=sql.Identifier(geom_column)))
+        return np.array([row['fuel_type'] for row in categories], dtype=object)
+    
+    def _fuel_cells_raster(self, table_name: str, geom_column: str, fuel_column: str,
+                           grid_size: Tuple[int, int], grid: Tuple[float, float, float, float]):
+        """
+        PostGIS 래스터로 서버에서 래스터화하고 격자 전체를 래스터 WKB 하나로 받음
+        
+        연료 격자와 같은 정렬의 빈 기준 래스터에 폴리곤마다 ST_AsRaster(셀 중심 포함 기준)로
+        연료 순위+1 값(16BUI, 0 = 값 없음)을 굽고 ST_Union(..., 'LAST')로 합칩니다.
+        폴리곤이 겹치는 셀은 최빈값 대신 나중 폴리곤의 값을 사용합니다. (postgis_raster 확장 필요)
+        """
+        min_x, max_y, cell_width, cell_height = grid
+        
+        fuel_types = self._fuel_categories(table_name, geom_column, fuel_column)
+        if len(fuel_types) == 0:
+            return np.empty(0, dtype=np.intp), []
+        
+        result = self.db.execute_query(
+            sql.SQL("""
+            WITH ref AS (
+                SELECT ST_AddBand(
+                    ST_MakeEmptyRaster(%(cols)s, %(rows)s, %(min_x)s, %(max_y)s,
+                                       %(cell_width)s, -%(cell_height)s, 0, 0, %(srid)s),
+                    '16BUI'::text, 0, 0
+                ) AS rast
+            ),
+            polys AS (
+                SELECT
+                    row_number() OVER () AS poly_id,
+                    dense_rank() OVER (ORDER BY {fuel}::text) AS fuel_value,
+                    {geom} AS geom
+                FROM {table}
+                WHERE ST_Dimension({geom}) = 2
+            ),
+            layers AS (
+                SELECT 0 AS poly_id, rast FROM ref
+                UNION ALL
+                SELECT p.poly_id, ST_AsRaster(ST_Force2D(p.geom), ref.rast, '16BUI', p.fuel_value, 0)
+                FROM polys p, ref
+            )
+            SELECT ST_AsBinary(ST_Union(rast, 'LAST' ORDER BY poly_id)) AS wkb
+            FROM layers
+            WHERE rast IS NOT NULL AND NOT ST_IsEmpty(rast)
+            """).format(fuel=sql.Identifier(fuel_column), geom=sql.Identifier(geom_column),
+                        table=sql.Identifier(table_name)),
+            {'cols': grid_size[1], 'rows': grid_size[0],
+             'min_x': float(min_x), 'max_y': float(max_y),
+             'cell_width': float(cell_width), 'cell_height': float(cell_height),
+             'srid': self._get_srid(table_name, geom_column)}
+        )
+        if not result or result[0]['wkb'] is None:
+            return np.empty(0, dtype=np.intp), []
+        
+        value_grid = self._decode_raster_band(bytes(result[0]['wkb']), grid_size)
+        cell_indices = np.flatnonzero(value_grid.ravel() > 0)
+        return cell_indices, fuel_types[value_grid.ravel()[cell_indices].astype(np.intp) - 1]
+    
+    @staticmethod
+    def _decode_raster_band(wkb: bytes, grid_size: Tuple[int, int]) -> np.ndarray:
+        """
+        16BUI 단일 밴드 래스터 WKB의 화소 값을 (행, 열) 배열로 해석
+        
+        WKB 구성: 헤더 61바이트 (엔디언 1, 버전 2, 밴드 수 2, 축척/원점/기울기 8×6, SRID 4,
+        너비 2, 높이 2) + 밴드 (플래그 1, NODATA 값 2, 화소 데이터)
+        """
+        byteorder = '<' if wkb[0] == 1 else '>'
+        width, height = np.frombuffer(wkb, dtype=byteorder + 'u2', count=2, offset=57)
+        if (height, width) != tuple(grid_size):
+            raise ValueError(f"래스터 크기 {(height, width)}가 격자 크기 {grid_size}와 다릅니다.")
+        return np.frombuffer(wkb, dtype=byteorder + 'u2', count=int(width) * int(height),
+                             offset=61 + 1 + 2).reshape(grid_size)
+    
+    def _fuel_cells_shapely(self, table_name: str, geom_column: str, fuel_column: str,
+                            grid_size: Tuple[int, int], grid: Tuple[float, float, float, float]):
+        """
+        폴리곤을 한 번에 가져와 shapely(GEOS) 벡터 연산으로 셀 중심점 포함 여부 판정
+        
+        폴리곤으로 STRtree를 만들고 모든 셀 중심점을 한 번의 query(predicate='within')로
+        (셀, 폴리곤) 쌍으로 찾습니다. 점마다 Python 호출이 없고 경계 상자 선필터는
+        트리가 처리합니다. 폴리곤이 겹치는 셀은 나중 폴리곤의 값을 사용합니다.
+        """
+        min_x, max_y, cell_width, cell_height = grid
+        rows = self.db.execute_query(sql.SQL("""
+            SELECT ST_AsBinary(ST_Force2D({geom})) as wkb, {fuel}::text as fuel_type
+            FROM {table}
+            WHERE ST_Dimension({geom}) = 2
+        """).format(geom=sql.Identifier(geom_column), fuel=sql.Identifier(fuel_column),
+                    table=sql.Identifier(table_name)))
+        if not rows:
+            return np.empty(0, dtype=np.intp), []
+        
+        polygons = from_wkb([bytes(row['wkb']) for row in rows])
+        fuel_types = np.array([row['fuel_type'] for row in rows], dtype=object)
+        
+        # 셀 중심점 (연료 격자와 같은 배치: Y축 반전)
+        xs = min_x + (np.arange(grid_size[1]) + 0.5) * cell_width
+        ys = max_y - (np.arange(grid_size[0]) + 0.5) * cell_height
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        centers = points(grid_x.ravel(), grid_y.ravel())
+        
+        cell_indices, poly_indices = STRtree(polygons).query(centers, predicate='within')
+        if len(cell_indices) == 0:
+            return np.empty(0, dtype=np.intp), []
+        
+        # 셀마다 가장 나중 폴리곤 선택
+        order = np.lexsort((poly_indices, cell_indices))
+        cell_indices, poly_indices = cell_indices[order], poly_indices[order]
+        last = np.append(cell_indices[1:] != cell_indices[:-1], True)
+        return cell_indices[last].astype(np.intp), fuel_types[poly_indices[last]]
+    
+    def _load_extent_cache(self) -> Dict[str, Dict]:
+        """디스크에 저장된 공간 범위 캐시 로드 (없거나 손상된 경우 빈 캐시)"""
+        try:
+            with open(self.EXTENT_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_extent_cache(self):
+        """
+        공간 범위 캐시를 디스크에 저장
+        
+        같은 디렉토리의 임시 파일에 쓴 뒤 os.replace로 교체하므로, 여러 스레드/프로세스가
+        동시에 저장해도 다른 쪽이 읽는 파일은 항상 온전한 JSON입니다.
+        """
+        cache_dir = os.path.dirname(self.EXTENT_CACHE_FILE)
+        tmp_path = None
+        try:
+            # 스냅샷부터 교체까지 잠금 안에서 처리해 오래된 스냅샷이 나중에 덮어쓰지 않도록 함
+            with self._extent_cache_lock:
+                os.makedirs(cache_dir or '.', exist_ok=True)
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_dir or '.',
+                                                 suffix='.tmp', delete=False) as f:
+                    tmp_path = f.name
+                    json.dump(self._extent_cache, f, ensure_ascii=False)
+                os.replace(tmp_path, self.EXTENT_CACHE_FILE)
+        except OSError as e:
+            print(f"   ⚠️  공간 범위 캐시 저장 실패: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _get_extent(self, table_name: str, geom_column: str) -> Optional[Dict[str, float]]:
+        """
+        테이블 공간 범위 조회 (min_x, min_y, max_x, max_y)
+        
+        ST_Extent는 테이블 전체를 스캔하므로 결과를 테이블 버전과 함께
+        EXTENT_CACHE_FILE에 저장하고, 버전이 같으면 다음 실행에서도 재사용합니다.
+        """
+        self._validate_identifiers(table_name, geom_column)
+        
+        cache_key = f"{table_name}.{geom_column}"
+        version = self.analyzer.get_table_version(table_name)
+        cached = self._extent_cache.get(cache_key)
+        if version is not None and cached and cached['version'] == list(version):
+            return cached['extent']
+        
+        extent_query = sql.SQL("""
+        SELECT 
+            ST_XMin(ST_Extent({geom})) as min_x,
+            ST_YMin(ST_Extent({geom})) as min_y,
+            ST_XMax(ST_Extent({geom})) as max_x,
+            ST_YMax(ST_Extent({geom})) as max_y
+        FROM {table}
+        WHERE {geom} IS NOT NULL
+        """).format(geom=sql.Identifier(geom_column), table=sql.Identifier(table_name))
+        extent_result = self.db.execute_query(extent_query)
+        if not extent_result or extent_result[0]['min_x'] is None:
+            return None
+        
+        extent = extent_result[0]
+        if version is not None:
+            with self._extent_cache_lock:
+                self._extent_cache[cache_key] = {'version': list(version), 'extent': extent}
+            self._save_extent_cache()
+        return extent
+    
+    def _cached_catalog(self, key: Tuple[str, str], lookup):
+        """
+        카탈로그 조회 결과 캐시 (SPATIAL_TABLES_TTL 동안 유지, 빈 결과도 캐시)
+        
+        key는 (용도, 테이블명), lookup()은 캐시할 값을 계산하는 함수입니다.
+        """
+        cached = self._column_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.SPATIAL_TABLES_TTL:
+            return cached[1]
+        
+        value = lookup()
+        self._column_cache[key] = (time.monotonic(), value)
+        return value
+    
+    def _first_column(self, query_name: str, table_name: str) -> Optional[str]:
+        """PREPARED_QUERIES의 컬럼 후보 조회 결과 중 첫 컬럼명"""
+        rows = self._execute_prepared(query_name, (table_name,))
+        return rows[0]['column_name'] if rows else None
+    
+    def _find_fuel_column(self, table_name: str) -> Optional[str]:
+        """연료 관련 컬럼명 탐색 (캐시 사용)"""
+        return self._cached_catalog(
+            ('fuel', table_name), lambda: self._first_column('fuel_columns_q', table_name))
+    
+    def _find_elevation_column(self, table_name: str) -> Optional[str]:
+        """고도 관련 컬럼명 탐색 (캐시 사용)"""
+        return self._cached_catalog(
+            ('elevation', table_name), lambda: self._first_column('elevation_columns_q', table_name))
+    
+    def _validate_identifiers(self, table_name: str, *columns: str):
+        """
+        SQL에 식별자로 넣을 테이블/컬럼명이 실제로 존재하는지 확인
+        
+        카탈로그에서 확인된 이름만 sql.Identifier로 쿼리에 삽입되도록 하며,
+        컬럼 목록은 테이블별로 SPATIAL_TABLES_TTL 동안 캐시합니다.
+        """
+        table_columns = self._cached_catalog(
+            ('columns', table_name),
+            lambda: frozenset(row['column_name']
+                              for row in self._execute_prepared('table_columns_q', (table_name,))))
+        if not table_columns:
+            raise ValueError(f"테이블 '{table_name}'을(를) 찾을 수 없습니다.")
+        for column in columns:
+            if column not in table_columns:
+                raise ValueError(f"테이블 '{table_name}'에 컬럼 '{column}'이(가) 없습니다.")
+    
+    def _get_srid(self, table_name: str, geom_column: str) -> int:
+        """기하 컬럼의 SRID 조회 (공간 테이블 목록에서 찾아 인스턴스에 캐시)"""
+        key = (table_name, geom_column)
+        if key not in self._srid_cache:
+            srid = next((table['srid'] for table in self.get_spatial_tables()
+                         if table['table_name'] == table_name
+                         and table['geom_column'] == geom_column), 0)
+            self._srid_cache[key] = int(srid or 0)
+        return self._srid_cache[key]
+    
+    def _check_spatial_index(self, table_name: str, geom_column: str):
+        """
+        기하 컬럼의 GIST 인덱스 확인
+        
+        인덱스가 없으면 공간 조인이 순차 스캔으로 처리되므로,
+        create_missing_indexes가 True이면 생성하고 아니면 경고만 출력합니다.
+        """
+        if self._execute_prepared('gist_index_q', (table_name, geom_column)):
+            return
+        
+        if self.create_missing_indexes and self.ensure_spatial_index(table_name, geom_column):
+            return
+        
+        print(f"   ⚠️  '{geom_column}' 컬럼에 GIST 인덱스가 없습니다. 추출이 느릴 수 있습니다.")
+        print(f'      CREATE INDEX ON "{table_name}" USING GIST ("{geom_column}");')
+    
+    def ensure_spatial_index(self, table_name: str, geom_column: str) -> bool:
+        """기하 컬럼에 GIST 인덱스 생성 (이미 있으면 생략)"""
+        index_name = f"ix_{table_name}_{geom_column}"[:63]
+        print(f"   🔧 GIST 인덱스 생성: {index_name}")
+        return self.db.execute_command(
+            sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} USING GIST ({})").format(
+                sql.Identifier(index_name), sql.Identifier(table_name), sql.Identifier(geom_column))
+        )
     
     def _map_fuel_type(self, fuel_value: Any) -> str:
         """
@@ -357,30 +997,21 @@ class PostgreSQLModelIntegrator:
         if fuel_value is None:
             return 'TL1'
         
-        fuel_str = str(fuel_value).upper()
-        
-        # 한국 산림청 분류를 Anderson13 모델로 매핑
-        fuel_mapping = {
-            # 침엽수림
-            '1': 'TL1',  # 침엽수 - 낮은 밀도
-            '2': 'TL2',  # 침엽수 - 중간 밀도
-            '3': 'TL3',  # 침엽수 - 높은 밀도
-            
-            # 활엽수림
-            '4': 'TU1',  # 활엽수 - 낮은 밀도
-            '5': 'TU2',  # 활엽수 - 중간 밀도
-            '6': 'TU3',  # 활엽수 - 높은 밀도
-            
-            # 혼효림
-            '7': 'TU4',  # 혼효림
-            '8': 'TU5',  # 혼효림 - 높은 밀도
-            
-            # 기타
-            '0': 'NB1',  # 비연소성
-            '9': 'GR1',  # 초지
-        }
+        return self.FUEL_MAPPING.get(str(fuel_value).upper(), 'TL1')
+    
+    def _map_fuel_types(self, fuel_values) -> np.ndarray:
+        """
+        연료 값 배열을 Anderson13 연료 모델 배열로 한 번에 매핑
         
-        return fuel_mapping.get(fuel_str, 'TL1')
+        서로 다른 값마다 _map_fuel_type을 한 번씩만 호출해 LUT를 만들고,
+        범주 코드(pd.factorize)로 전체 배열을 인덱싱합니다.
+        (_map_fuel_type을 사용자 함수로 교체해도 그대로 적용됨)
+        """
+        codes, uniques = pd.factorize(pd.Series(fuel_values, dtype=object))
+        # 마지막 항목은 결측값(코드 -1)용
+        lut = np.array([self._map_fuel_type(value) for value in uniques]
+                       + [self._map_fuel_type(None)], dtype='<U10')
+        return lut[codes]
     
     def extract_terrain_data(self, table_name: str, 
                            geom_column: str = 'geom',
@@ -412,34 +1043,134 @@ class PostgreSQLModelIntegrator:
         - 바람 패턴 모델링
         - 접근성 분석
         """
+        self._validate_identifiers(table_name, geom_column)
+        
         print(f"🏔️  '{table_name}' 테이블에서 지형 데이터 추출 중...")
         
         # 고도 데이터가 있는지 확인
-        elevation_query = f"""
-        SELECT column_name
-        FROM information_schema.columns 
-        WHERE table_name = '{table_name}'
-        AND (column_name ILIKE '%elevation%' OR 
-             column_name ILIKE '%height%' OR 
-             column_name ILIKE '%dem%' OR
-             column_name ILIKE '%altitude%')
-        """
-        elevation_columns = self.db.execute_query(elevation_query)
+        elevation_column = self._find_elevation_column(table_name)
         
-        if not elevation_columns:
+        if not elevation_column:
             print("   ⚠️  고도 컬럼을 찾을 수 없어 평평한 지형을 생성합니다.")
-            return np.full(grid_size, 100.0, dtype=np.float32)  # 기본 고도 100m
+            elevation_grid = np.full(grid_size, 100.0, dtype=np.float32)  # 기본 고도 100m
+            return elevation_grid
         
-        elevation_column = elevation_columns[0]['column_name']
         print(f"   고도 컬럼: {elevation_column}")
         
-        # 실제 구현에서는 연료 데이터와 유사한 방식으로 격자화
-        # 여기서는 간단한 예시
-        elevation_grid = np.random.uniform(50, 500, grid_size).astype(np.float32)
-        
+        extent = self._get_extent(table_name, geom_column)
+        if extent is None:
+            print("   ⚠️  공간 범위를 계산할 수 없어 평평한 지형을 생성합니다.")
+            elevation_grid = np.full(grid_size, 100.0, dtype=np.float32)
+            return elevation_grid
+        
+        # 고도 포인트를 서버에서 격자 셀별 평균으로 집계하고 (셀 인덱스, 평균, 포인트 수)만
+        # COPY BINARY로 받아 NumPy 배열로 해석 (연료 격자와 같은 배치: Y축 반전)
+        cell_width = max(extent['max_x'] - extent['min_x'], 1e-12) / grid_size[1]
+        cell_height = max(extent['max_y'] - extent['min_y'], 1e-12) / grid_size[0]
+        cells = self.db.copy_query_to_array(
+            sql.SQL("""
+            WITH points AS (
+                SELECT 
+                    ST_PointOnSurface({geom}) as point,
+                    {elevation}::float8 as elevation
+                FROM {table}
+                WHERE {geom} IS NOT NULL AND {elevation} IS NOT NULL
+            )
+            SELECT 
+                (LEAST(GREATEST(floor((%(max_y)s - ST_Y(point)) / %(cell_height)s)::int, 0), %(rows)s - 1)
+                 * %(cols)s
+                 + LEAST(GREATEST(floor((ST_X(point) - %(min_x)s) / %(cell_width)s)::int, 0), %(cols)s - 1)
+                )::int4 as cell_index,
+                avg(elevation)::float4 as elevation,
+                count(*)::int4 as point_count
+            FROM points
+            GROUP BY 1
+            """).format(geom=sql.Identifier(geom_column), elevation=sql.Identifier(elevation_column),
+                        table=sql.Identifier(table_name)),
+            [('cell_index', 'i4'), ('elevation', 'f4'), ('point_count', 'i4')],
+            params={
+                'min_x': extent['min_x'], 'max_y': extent['max_y'],
+                'cell_width': cell_width, 'cell_height': cell_height,
+                'rows': grid_size[0], 'cols': grid_size[1],
+            }
+        )
+        if len(cells) == 0:
+            print("   ⚠️  고도 값이 없어 평평한 지형을 생성합니다.")
+            elevation_grid = np.full(grid_size, 100.0, dtype=np.float32)
+            return elevation_grid
+        
+        # 포인트가 없는 셀은 전체 평균 고도로 채움
+        n_cells = grid_size[0] * grid_size[1]
+        elevation_grid = np.empty(n_cells, dtype=np.float32)
+        elevation_grid.fill(np.average(cells['elevation'], weights=cells['point_count']))
+        elevation_grid[cells['cell_index']] = cells['elevation']
+        elevation_grid = elevation_grid.reshape(grid_size)
+        
+        print(f"   고도 포인트: {int(cells['point_count'].sum())}개, "
+              f"값이 있는 셀: {len(cells)}/{n_cells}")
         print(f"   ✅ 지형 데이터 추출 완료")
         return elevation_grid
     
+    def find_ignition_points(self, table_name: str, geom_column: str = 'geom',
+                             grid_size: Tuple[int, int] = (100, 100),
+                             n_points: int = 2) -> List[Tuple[int, int]]:
+        """
+        공간 데이터 분포를 기준으로 점화점 선택
+        
+        PostGIS의 ST_ClusterKMeans로 피처를 n_points개 군집으로 나누고
+        각 군집 중심을 테이블 공간 범위 기준 격자 인덱스 (행, 열)로 변환합니다.
+        (extract_fuel_data_from_postgis와 같은 격자 배치: Y축 반전)
+        
+        OUTPUT 예시:
+        - [(42, 17), (63, 71)]
+        - 조회 실패 시 빈 리스트 (테이블/컬럼이 없으면 ValueError)
+        """
+        self._validate_identifiers(table_name, geom_column)
+        
+        query = sql.SQL("""
+        WITH clusters AS (
+            SELECT 
+                ST_ClusterKMeans({geom}, %s) OVER () as cluster_id,
+                {geom} as geom
+            FROM {table}
+            WHERE {geom} IS NOT NULL
+        ),
+        extent AS (
+            SELECT ST_Extent(geom) as box FROM clusters
+        ),
+        centers AS (
+            SELECT ST_Centroid(ST_Collect(geom)) as center
+            FROM clusters
+            GROUP BY cluster_id
+        )
+        SELECT 
+            ST_X(c.center) as x,
+            ST_Y(c.center) as y,
+            ST_XMin(e.box) as min_x,
+            ST_YMin(e.box) as min_y,
+            ST_XMax(e.box) as max_x,
+            ST_YMax(e.box) as max_y
+        FROM centers c
+        CROSS JOIN extent e
+        """).format(geom=sql.Identifier(geom_column), table=sql.Identifier(table_name))
+        rows = self.db.execute_query(query, (n_points,))
+        
+        ignition_points = []
+        for row in rows:
+            width = row['max_x'] - row['min_x']
+            height = row['max_y'] - row['min_y']
+            if width <= 0 or height <= 0:
+                continue
+            
+            grid_row = int((row['max_y'] - row['y']) / height * grid_size[0])
+            grid_col = int((row['x'] - row['min_x']) / width * grid_size[1])
+            point = (min(max(grid_row, 0), grid_size[0] - 1),
+                     min(max(grid_col, 0), grid_size[1] - 1))
+            if point not in ignition_points:
+                ignition_points.append(point)
+        
+        return ignition_points
+    
     def create_fire_simulation_from_postgis(self, spatial_table: str,
                                           grid_size: Tuple[int, int] = (100, 100),
                                           ignition_points: List[Tuple[int, int]] = None,
@@ -455,7 +1186,8 @@ class PostgreSQLModelIntegrator:
             'tree_density': 0.8,        # 수목 밀도 80%
             'base_spread_prob': 0.2,    # 기본 확산 확률 20%
             'wind_speed': 15.0,         # 풍속 15m/s
-            'humidity': 0.3             # 습도 30%
+            'humidity': 0.3,            # 습도 30%
+            'tile_size': 64             # 확산 커널 블록 크기 (기본값)
           }
         
         PROCESS:
@@ -467,11 +1199,11 @@ class PostgreSQLModelIntegrator:
            셀룰러 오토마타 기반 화재 시뮬레이터
         
         OUTPUT:
-        - AdvancedCAModel 인스턴스:
-          ├── fuel_map: 연료 타입 격자 (100x100)
-          ├── elevation_map: 고도 격자 (100x100)
-          ├── wind_field: 바람장 (100x100x2)
-          └── ignition_points: 점화점 좌표 리스트
+        - KernelFireModel 인스턴스 (numba 미설치 시 AdvancedCAModel):
+          ├── ca_model: 초기화된 AdvancedCAModel
+          ├── grid: 상태 격자 (100x100, np.uint8)
+          ├── fuel_codes: 연료 LUT 인덱스 격자 (100x100)
+          └── step(): JIT 커널 기반 확산 스텝
         
         Args:
             spatial_table: 공간 데이터 테이블명
@@ -502,14 +1234,9 @@ class PostgreSQLModelIntegrator:
             print(f"   기하 타입: {geom_info['geometry_type']}")
             print(f"   SRID: {geom_info['srid']}")
             
-            # 연료 데이터 추출
-            fuel_map = self.extract_fuel_data_from_postgis(
-                spatial_table, geom_column, grid_size=grid_size
-            )
-            
-            # 지형 데이터 추출 (선택적)
-            elevation_map = self.extract_terrain_data(
-                spatial_table, geom_column, grid_size=grid_size
+            # 연료 데이터 추출 (연료 코드 격자)
+            fuel_codes = self.extract_fuel_data_from_postgis(
+                spatial_table, geom_column, grid_size=grid_size, as_codes=True
             )
             
             # 고급 CA 모델 생성
@@ -519,15 +1246,25 @@ class PostgreSQLModelIntegrator:
                 seed=42
             )
             
-            # 연료맵 설정
-            ca_model.fuel_map = fuel_map
+            # 연료맵 설정: 커널은 정수 코드 격자를 그대로 사용하고,
+            # 연료 이름 격자는 AdvancedCAModel 자체 스텝(Numba 미설치 시)용으로만 유지
+            ca_model.fuel_codes = fuel_codes
+            ca_model.fuel_code_names = self.CODE_TO_FUEL
+            ca_model.fuel_map = self.CODE_TO_FUEL[fuel_codes]
+            
+            # 지형 데이터 추출 (모델이 고도 격자를 사용하는 경우에만)
+            if hasattr(ca_model, 'elevation_map'):
+                ca_model.elevation_map = self.extract_terrain_data(
+                    spatial_table, geom_column, grid_size=grid_size
+                )
             
             # 기본 설정
             default_config = {
                 'tree_density': 0.7,
                 'base_spread_prob': 0.15,
                 'ignition_prob': 0.001,
-                'extinguish_prob': 0.05
+                'extinguish_prob': 0.05,
+                'tile_size': TILE_SIZE  # 확산 커널 블록 크기
             }
             
             if simulation_config:
@@ -556,6 +1293,10 @@ class PostgreSQLModelIntegrator:
                 print(f"   기본 점화점: ({center_x}, {center_y})")
             
             print("✅ 화재 시뮬레이션 모델 생성 완료!")
+            
+            # numba가 있으면 JIT 커널 모델로 스텝 실행 (없으면 기존 모델 사용)
+            if NUMBA_AVAILABLE:
+                return KernelFireModel(ca_model, tile_size=default_config['tile_size'])
             return ca_model
             
         except Exception as e:
@@ -564,7 +1305,10 @@ class PostgreSQLModelIntegrator:
     
     def run_integrated_simulation(self, spatial_table: str,
                                 steps: int = 50,
-                                save_results: bool = True) -> Dict[str, Any]:
+                                save_results: bool = True,
+                                grid_size: Tuple[int, int] = (100, 100),
+                                ignition_points: List[Tuple[int, int]] = None,
+                                simulation_config: Dict = None) -> Dict[str, Any]:
         """
         통합 화재 시뮬레이션 실행
         
@@ -572,6 +1316,9 @@ class PostgreSQLModelIntegrator:
         - spatial_table: 'forest_parcels_2024'
         - steps: 50 (시뮬레이션 스텝 수)
         - save_results: True (결과 자동 저장)
+        - grid_size: (100, 100) (시뮬레이션 격자 크기)
+        - ignition_points: None → [(50, 50), (30, 70)] (다중 점화점)
+        - simulation_config: create_fire_simulation_from_postgis 설정
         
         SIMULATION PROCESS:
         Step 0: 점화 시작
@@ -602,12 +1349,9 @@ class PostgreSQLModelIntegrator:
         {
           'success': True,
           'results': {
-            'steps': [0, 1, 2, ..., 50],
-            'statistics': [
-              {'step': 0, 'burning_cells': 1, 'burned_cells': 0, 'burn_ratio': 0.0001},
-              {'step': 25, 'burning_cells': 12, 'burned_cells': 45, 'burn_ratio': 0.0057},
-              {'step': 50, 'burning_cells': 0, 'burned_cells': 156, 'burn_ratio': 0.0156}
-            ],
+            'steps': numpy_array([0, 1, 2, ..., 50]),
+            'stats_array': numpy_array([[1, 0, 4, 1], ...]),  # (스텝, STATS_COLUMNS) int32
+            'burn_ratio': numpy_array([0.0, 0.0001, ..., 0.0156]),  # 스텝별 연소율
             'final_state': numpy_array([[0, 0, 0, ...], [0, 2, 2, ...], ...]),
             'final_stats': {
               'total_cells': 10000,
@@ -616,7 +1360,7 @@ class PostgreSQLModelIntegrator:
               'simulation_time': 50
             }
           },
-          'model': AdvancedCAModel_instance
+          'model': KernelFireModel_instance  # 또는 AdvancedCAModel
         }
         
         저장되는 파일:
@@ -627,10 +1371,14 @@ class PostgreSQLModelIntegrator:
         print(f"   시뮬레이션 스텝: {steps}")
         
         # 시뮬레이션 모델 생성
+        if ignition_points is None:
+            ignition_points = [(50, 50), (30, 70)]  # 다중 점화점
+        
         fire_model = self.create_fire_simulation_from_postgis(
             spatial_table,
-            grid_size=(100, 100),
-            ignition_points=[(50, 50), (30, 70)]  # 다중 점화점
+            grid_size=grid_size,
+            ignition_points=ignition_points,
+            simulation_config=simulation_config
         )
         
         if not fire_model:
@@ -638,32 +1386,50 @@ class PostgreSQLModelIntegrator:
         
         # 시뮬레이션 실행
         simulation_results = {
-            'steps': [],
-            'statistics': [],
+            'steps': None,
             'final_state': None
         }
         
+        # 스텝 통계는 미리 할당한 (steps, 4) 버퍼에 기록 (STATS_COLUMNS 순서)
+        kernel_model = isinstance(fire_model, KernelFireModel)
+        if kernel_model:
+            stats_buf = fire_model.stats_buf = np.zeros((steps, len(STATS_COLUMNS)), dtype=np.int32)
+        else:
+            stats_buf = np.zeros((steps, len(STATS_COLUMNS)), dtype=np.int32)
+            previous_trees = int(np.sum(fire_model.grid == fire_model.TREE))
+        total_cells = fire_model.grid.size
+        
         print("\n📊 시뮬레이션 진행:")
+        completed_steps = 0
         for step in range(steps):
             # 한 스텝 실행
-            stats = fire_model.step()
-            
-            # 통계 기록
-            simulation_results['steps'].append(step)
-            simulation_results['statistics'].append(stats)
+            if kernel_model:
+                fire_model.advance(step)
+            else:
+                stats = fire_model.step()
+                stats_buf[step] = (stats['burning_cells'], stats['burned_cells'],
+                                   stats['fire_perimeter'],
+                                   max(previous_trees - stats['tree_cells'], 0))
+                previous_trees = stats['tree_cells']
+            completed_steps = step + 1
+            burning_cells, burned_cells = stats_buf[step, 0], stats_buf[step, 1]
             
             # 진행 상황 출력
             if step % 10 == 0 or step == steps - 1:
-                burning_cells = stats.get('burning_cells', 0)
-                burned_cells = stats.get('burned_cells', 0)
                 print(f"   Step {step:3d}: 연소중 {burning_cells:3d}, "
-                      f"연소완료 {burned_cells:4d}, 화재진행률 {stats.get('burn_ratio', 0):.3f}")
+                      f"연소완료 {burned_cells:4d}, 화재진행률 {burned_cells / total_cells:.3f}")
             
             # 화재가 모두 꺼졌으면 종료
-            if fire_model.is_simulation_complete():
+            if burning_cells == 0:
                 print(f"   🔥 화재가 완전히 진압되었습니다! (Step {step})")
                 break
         
+        # 통계 기록 (열 단위 배열 그대로 보관, dict 목록은 저장 시에만 생성)
+        stats_array = stats_buf[:completed_steps].copy()
+        simulation_results['steps'] = np.arange(completed_steps)
+        simulation_results['stats_array'] = stats_array
+        simulation_results['burn_ratio'] = stats_array[:, 1] / total_cells
+        
         # 최종 상태 저장
         simulation_results['final_state'] = fire_model.grid.copy()
         simulation_results['final_stats'] = fire_model.calculate_statistics()
@@ -694,6 +1460,40 @@ class PostgreSQLModelIntegrator:
         else:
             return obj
 
+    @staticmethod
+    def _stats_to_records(stats_array: np.ndarray, burn_ratio: np.ndarray) -> List[Dict[str, Any]]:
+        """스텝 통계 배열을 스텝별 dict 목록으로 변환 (결과 파일 저장용)"""
+        return [
+            {'step': step + 1, **dict(zip(STATS_COLUMNS, row)), 'burn_ratio': ratio}
+            for step, (row, ratio) in enumerate(zip(stats_array.tolist(), burn_ratio.tolist()))
+        ]
+    
+    @staticmethod
+    def _decode_grid(encoded: Optional[Dict[str, Any]], base_dir: str = '') -> Optional[np.ndarray]:
+        """
+        저장된 final_state 복원
+        
+        .npy 파일 참조({'npy': 파일명}, 결과 JSON과 같은 디렉토리)를 읽고,
+        이전 형식(base64 원시 바이트, 중첩 리스트)도 허용합니다.
+        """
+        if encoded is None:
+            return None
+        if isinstance(encoded, list):
+            return np.asarray(encoded)
+        if 'npy' in encoded:
+            return np.load(os.path.join(base_dir, encoded['npy']))
+        return np.frombuffer(base64.b64decode(encoded['b64']),
+                             dtype=encoded['dtype']).reshape(encoded['shape'])
+    
+    @classmethod
+    def load_simulation_results(cls, results_file: str) -> Dict[str, Any]:
+        """_save_simulation_results로 저장한 결과 파일 읽기 (final_state는 NumPy 배열로 복원)"""
+        with open(results_file, 'rb') as f:
+            saved = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
+        saved['final_state'] = cls._decode_grid(saved.get('final_state'),
+                                                os.path.dirname(results_file))
+        return saved
+    
     def _save_simulation_results(self, table_name: str, results: Dict):
         """
         시뮬레이션 결과 저장
@@ -735,37 +1535,62 @@ class PostgreSQLModelIntegrator:
             "total_area_hectares": 23.4,
             "simulation_duration_minutes": 125
           },
-          "final_state": [
-            [0, 0, 0, 1, 1, 2, 2, 0, 0, 0],
-            [0, 0, 1, 1, 2, 2, 2, 1, 0, 0],
-            ...
-          ]
+          "final_state": {
+            "dtype": "uint8",
+            "shape": [100, 100],
+            "npy": "fire_final_forest_sector_A_20250601_143022.npy"   // 같은 디렉토리의 격자 파일
+          }
         }
         
+        최종 격자는 JSON에 넣지 않고 .npy 바이너리 파일로 따로 저장합니다.
+        final_state는 load_simulation_results()로 읽으면 NumPy 배열로 복원됩니다.
+        orjson이 설치되어 있으면 orjson으로 직렬화합니다.
+        (파일은 들여쓰기 없는 압축 JSON으로 저장되며, 위 예시는 보기 좋게 정리한 것)
+        
         상태 코드:
         - 0: 미연소 (Unburned)
         - 1: 연소중 (Burning) 
         - 2: 연소완료 (Burned)
         """
-        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # JSON 결과 저장
         results_file = f"exports/fire_simulation_{table_name}_{timestamp}.json"
         
-        # NumPy 타입들을 Python 기본 타입으로 변환
-        save_results = self._convert_numpy_types({
+        # 최종 격자는 원시 바이너리(.npy)로 한 번에 기록하고 JSON에는 파일명만 남김
+        final_state = None
+        if results['final_state'] is not None:
+            state_file = f"fire_final_{table_name}_{timestamp}.npy"
+            np.save(os.path.join(os.path.dirname(results_file), state_file), results['final_state'])
+            final_state = {
+                'dtype': str(results['final_state'].dtype),
+                'shape': list(results['final_state'].shape),
+                'npy': state_file
+            }
+        
+        save_results = {
             'source_table': table_name,
             'timestamp': timestamp,
             'steps': results['steps'],
-            'statistics': results['statistics'],
+            'statistics': self._stats_to_records(results['stats_array'], results['burn_ratio']),
             'final_stats': results['final_stats'],
-            'final_state': results['final_state'] if results['final_state'] is not None else None
-        })
+            'final_state': final_state
+        }
         
-        with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump(save_results, f, ensure_ascii=False, indent=2)
+        # 들여쓰기 없이 압축 형식으로, 1 MiB 버퍼를 통해 기록
+        if ORJSON_AVAILABLE:
+            # orjson은 NumPy 스칼라/배열을 직접 직렬화
+            with open(results_file, 'wb', buffering=1 << 20) as f:
+                f.write(orjson.dumps(save_results, option=orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            # NumPy 타입들을 Python 기본 타입으로 변환
+            with open(results_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                json.dump(self._convert_numpy_types(save_results), f, ensure_ascii=False,
+                          separators=(',', ':'))
         
         print(f"💾 결과 저장: {results_file}")
+        if final_state is not None:
+            print(f"💾 최종 격자 저장: exports/{final_state['npy']}")
     
     def interactive_menu(self):
         """대화형 메뉴"""
@@ -906,18 +1731,4 @@ def main():
 
 
 if __name__ == "__main__":
-    # pandas import (결과 저장용)
-    try:
-        import pandas as pd
-    except ImportError:
-        print("⚠️  pandas가 설치되지 않았습니다. 결과 저장 기능이 제한됩니다.")
-        class pd:
-            class Timestamp:
-                @staticmethod
-                def now():
-                    from datetime import datetime
-                    return datetime.now()
-                def strftime(self, fmt):
-                    return self.strftime(fmt)
-    
     main()
@@ -5,46 +5,39 @@ PostgreSQL 테이블 분석 전용 스크립트
 """
 
 from db_connection import PostgreSQLConnection
+import psycopg2.extras
+from psycopg2 import sql
+import io
 import json
+import sys
 from datetime import datetime
+from typing import Optional, TextIO
+
+# 제약조건 종류 → 보고서 표시 이름
+_CONSTRAINT_LABELS = {
+    'PRIMARY KEY': '🔑 기본키',
+    'FOREIGN KEY': '🔗 외래키',
+    'UNIQUE': '🚫 유니크',
+    'CHECK': '✅ 체크',
+    'NOT NULL': '❗ NOT NULL'
+}
+
+def _format_data_type(column):
+    """컬럼 데이터 타입 표시 문자열 (길이/정밀도 포함, 예: character varying(50), numeric(10,2))"""
+    data_type = column['data_type']
+    if column['character_maximum_length']:
+        return f"{data_type}({column['character_maximum_length']})"
+    if column['numeric_precision']:
+        if column['numeric_scale']:
+            return f"{data_type}({column['numeric_precision']},{column['numeric_scale']})"
+        return f"{data_type}({column['numeric_precision']})"
+    return data_type
 
 class PostgreSQLTableAnalyzer:
     """PostgreSQL 테이블 분석 전용 클래스"""
     
-    def __init__(self):
-        self.db = PostgreSQLConnection()
-        
-    def connect(self):
-        """데이터베이스 연결"""
-        return self.db.connect()
-    
-    def disconnect(self):
-        """데이터베이스 연결 해제"""
-        self.db.disconnect()
-    
-    def get_all_tables(self):
-        """모든 테이블 목록과 기본 정보 조회"""
-        query = """
-        SELECT 
-            t.tablename,
-            t.schemaname,
-            t.tableowner,
-            t.hasindexes,
-            t.hasrules,
-            t.hastriggers,
-            pg_size_pretty(pg_total_relation_size(quote_ident(t.schemaname)||'.'||quote_ident(t.tablename))) as total_size,
-            pg_size_pretty(pg_relation_size(quote_ident(t.schemaname)||'.'||quote_ident(t.tablename))) as table_size,
-            c.reltuples::bigint as estimated_rows
-        FROM pg_tables t
-        LEFT JOIN pg_class c ON c.relname = t.tablename
-        WHERE t.schemaname = 'public'
-        ORDER BY pg_total_relation_size(quote_ident(t.schemaname)||'.'||quote_ident(t.tablename)) DESC
-        """
-        return self.db.execute_query(query)
-    
-    def get_table_columns_detailed(self, table_name):
-        """테이블 컬럼 상세 정보 조회"""
-        query = """
+    # 테이블별 메타데이터 조회 쿼리 (%(table_name)s: 테이블명)
+    COLUMNS_QUERY = """
         SELECT 
             c.column_name,
             c.data_type,
@@ -54,116 +47,344 @@ class PostgreSQLTableAnalyzer:
             c.is_nullable,
             c.column_default,
             c.ordinal_position,
-            CASE 
-                WHEN pk.column_name IS NOT NULL THEN 'PRIMARY KEY'
-                WHEN fk.column_name IS NOT NULL THEN 'FOREIGN KEY'
-                WHEN uk.column_name IS NOT NULL THEN 'UNIQUE'
-                ELSE NULL
+            CASE kc.constraint_rank
+                WHEN 3 THEN 'PRIMARY KEY'
+                WHEN 2 THEN 'FOREIGN KEY'
+                WHEN 1 THEN 'UNIQUE'
             END as constraint_type,
             pgd.description as column_comment
         FROM information_schema.columns c
         LEFT JOIN (
-            SELECT ku.column_name
-            FROM information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage ku
-                ON tc.constraint_name = ku.constraint_name
-            WHERE tc.table_name = %s AND tc.constraint_type = 'PRIMARY KEY'
-        ) pk ON c.column_name = pk.column_name
-        LEFT JOIN (
-            SELECT ku.column_name
+            -- 컬럼별 대표 제약조건 (기본키 > 외래키 > 유니크), 제약조건 뷰는 한 번만 조회
+            SELECT 
+                ku.column_name,
+                MAX(CASE tc.constraint_type
+                        WHEN 'PRIMARY KEY' THEN 3
+                        WHEN 'FOREIGN KEY' THEN 2
+                        WHEN 'UNIQUE' THEN 1
+                    END) as constraint_rank
             FROM information_schema.table_constraints tc
             JOIN information_schema.key_column_usage ku
                 ON tc.constraint_name = ku.constraint_name
-            WHERE tc.table_name = %s AND tc.constraint_type = 'FOREIGN KEY'
-        ) fk ON c.column_name = fk.column_name
-        LEFT JOIN (
-            SELECT ku.column_name
-            FROM information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage ku
-                ON tc.constraint_name = ku.constraint_name
-            WHERE tc.table_name = %s AND tc.constraint_type = 'UNIQUE'
-        ) uk ON c.column_name = uk.column_name
+            WHERE tc.table_name = %(table_name)s
+              AND tc.constraint_type IN ('PRIMARY KEY', 'FOREIGN KEY', 'UNIQUE')
+            GROUP BY ku.column_name
+        ) kc ON c.column_name = kc.column_name
         LEFT JOIN pg_catalog.pg_description pgd
-            ON pgd.objoid = (SELECT oid FROM pg_class WHERE relname = %s)
+            ON pgd.objoid = to_regclass(quote_ident(%(table_name)s))
             AND pgd.objsubid = c.ordinal_position
-        WHERE c.table_name = %s
+        WHERE c.table_name = %(table_name)s
         ORDER BY c.ordinal_position
         """
-        return self.db.execute_query(query, (table_name, table_name, table_name, table_name, table_name))
     
-    def get_table_indexes(self, table_name):
-        """테이블 인덱스 정보 조회"""
-        query = """
+    INDEXES_QUERY = """
         SELECT 
-            indexname,
-            indexdef,
-            pg_size_pretty(pg_relation_size(indexname::regclass)) as index_size,
-            idx_scan as scan_count,
-            idx_tup_read as tuples_read,
-            idx_tup_fetch as tuples_fetched
-        FROM pg_indexes 
-        LEFT JOIN pg_stat_user_indexes ON pg_stat_user_indexes.indexrelname = pg_indexes.indexname
-        WHERE tablename = %s
-        ORDER BY pg_relation_size(indexname::regclass) DESC
+            i.relname as indexname,
+            pg_get_indexdef(ix.indexrelid) as indexdef,
+            pg_size_pretty(sz.index_bytes) as index_size,
+            pg_stat_get_numscans(ix.indexrelid) as scan_count,
+            pg_stat_get_tuples_returned(ix.indexrelid) as tuples_read,
+            pg_stat_get_tuples_fetched(ix.indexrelid) as tuples_fetched
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        CROSS JOIN LATERAL (SELECT pg_relation_size(ix.indexrelid) as index_bytes) sz
+        WHERE ix.indrelid = to_regclass(quote_ident(%(table_name)s))
+        ORDER BY sz.index_bytes DESC
         """
-        return self.db.execute_query(query, (table_name,))
     
-    def get_table_constraints(self, table_name):
-        """테이블 제약조건 정보 조회"""
-        query = """
+    CONSTRAINTS_QUERY = """
         SELECT 
-            tc.constraint_name,
-            tc.constraint_type,
-            kcu.column_name,
-            tc.is_deferrable,
-            tc.initially_deferred,
-            rc.match_option,
-            rc.update_rule,
-            rc.delete_rule,
-            ccu.table_name AS foreign_table_name,
-            ccu.column_name AS foreign_column_name
-        FROM information_schema.table_constraints tc
-        LEFT JOIN information_schema.key_column_usage kcu
-            ON tc.constraint_name = kcu.constraint_name
-        LEFT JOIN information_schema.referential_constraints rc
-            ON tc.constraint_name = rc.constraint_name
-        LEFT JOIN information_schema.constraint_column_usage ccu
-            ON rc.unique_constraint_name = ccu.constraint_name
-        WHERE tc.table_name = %s
-        ORDER BY tc.constraint_type, tc.constraint_name
+            con.conname as constraint_name,
+            CASE con.contype
+                WHEN 'p' THEN 'PRIMARY KEY'
+                WHEN 'f' THEN 'FOREIGN KEY'
+                WHEN 'u' THEN 'UNIQUE'
+                WHEN 'c' THEN 'CHECK'
+                WHEN 'x' THEN 'EXCLUDE'
+            END as constraint_type,
+            a.attname as column_name,
+            CASE WHEN con.condeferrable THEN 'YES' ELSE 'NO' END as is_deferrable,
+            CASE WHEN con.condeferred THEN 'YES' ELSE 'NO' END as initially_deferred,
+            CASE con.confmatchtype
+                WHEN 'f' THEN 'FULL' WHEN 'p' THEN 'PARTIAL' WHEN 's' THEN 'NONE'
+            END as match_option,
+            CASE con.confupdtype
+                WHEN 'a' THEN 'NO ACTION' WHEN 'r' THEN 'RESTRICT' WHEN 'c' THEN 'CASCADE'
+                WHEN 'n' THEN 'SET NULL' WHEN 'd' THEN 'SET DEFAULT'
+            END as update_rule,
+            CASE con.confdeltype
+                WHEN 'a' THEN 'NO ACTION' WHEN 'r' THEN 'RESTRICT' WHEN 'c' THEN 'CASCADE'
+                WHEN 'n' THEN 'SET NULL' WHEN 'd' THEN 'SET DEFAULT'
+            END as delete_rule,
+            ft.relname AS foreign_table_name,
+            fa.attname AS foreign_column_name
+        FROM pg_constraint con
+        LEFT JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, foreign_attnum) ON true
+        LEFT JOIN pg_attribute a
+            ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+        LEFT JOIN pg_class ft ON ft.oid = NULLIF(con.confrelid, 0)
+        LEFT JOIN pg_attribute fa
+            ON fa.attrelid = con.confrelid AND fa.attnum = k.foreign_attnum
+        WHERE con.conrelid = to_regclass(quote_ident(%(table_name)s))
+        ORDER BY constraint_type, constraint_name
         """
-        return self.db.execute_query(query, (table_name,))
     
-    def get_spatial_info(self, table_name):
-        """공간 데이터 정보 조회"""
-        query = """
+    SPATIAL_INFO_QUERY = """
         SELECT 
             f_geometry_column as geom_column,
             coord_dimension as dimensions,
             srid,
             type as geometry_type
         FROM geometry_columns 
-        WHERE f_table_name = %s
+        WHERE f_table_name = %(table_name)s
+          -- 기하 타입 컬럼이 없는 테이블은 geometry_columns 뷰를 스캔하지 않음
+          -- (상관 없는 EXISTS라 실행 시작 시 한 번만 평가되는 조건으로 처리됨)
+          AND EXISTS (
+              SELECT 1
+              FROM pg_attribute a
+              JOIN pg_type t ON t.oid = a.atttypid
+              WHERE a.attrelid = to_regclass(quote_ident(%(table_name)s))
+                AND a.attnum > 0
+                AND NOT a.attisdropped
+                AND t.typname = 'geometry'
+          )
         """
-        return self.db.execute_query(query, (table_name,))
+    
+    ACTIVITY_QUERY = """
+        SELECT 
+            pg_stat_get_numscans(c.oid) as seq_scan,
+            pg_stat_get_tuples_returned(c.oid) as seq_tup_read,
+            idx.idx_scan,
+            pg_stat_get_tuples_fetched(c.oid) + idx.idx_tup_fetch as idx_tup_fetch,
+            pg_stat_get_tuples_inserted(c.oid) as n_tup_ins,
+            pg_stat_get_tuples_updated(c.oid) as n_tup_upd,
+            pg_stat_get_tuples_deleted(c.oid) as n_tup_del,
+            pg_stat_get_tuples_hot_updated(c.oid) as n_tup_hot_upd,
+            pg_stat_get_live_tuples(c.oid) as n_live_tup,
+            pg_stat_get_dead_tuples(c.oid) as n_dead_tup,
+            pg_stat_get_last_vacuum_time(c.oid) as last_vacuum,
+            pg_stat_get_last_autovacuum_time(c.oid) as last_autovacuum,
+            pg_stat_get_last_analyze_time(c.oid) as last_analyze,
+            pg_stat_get_last_autoanalyze_time(c.oid) as last_autoanalyze
+        FROM pg_class c
+        CROSS JOIN LATERAL (
+            SELECT 
+                sum(pg_stat_get_numscans(i.indexrelid))::bigint as idx_scan,
+                coalesce(sum(pg_stat_get_tuples_fetched(i.indexrelid)), 0)::bigint as idx_tup_fetch
+            FROM pg_index i
+            WHERE i.indrelid = c.oid
+        ) idx
+        WHERE c.oid = to_regclass(quote_ident(%(table_name)s))
+        """
+    
+    # get_table_metadata()가 한 번에 조회하는 항목 (결과 키 → 쿼리)
+    METADATA_QUERIES = {
+        'columns': COLUMNS_QUERY,
+        'indexes': INDEXES_QUERY,
+        'constraints': CONSTRAINTS_QUERY,
+        'spatial_info': SPATIAL_INFO_QUERY,
+        'activity': ACTIVITY_QUERY,
+    }
+    
+    # 위 항목을 json_agg 스칼라 서브쿼리로 묶은 단일 조회 쿼리
+    METADATA_QUERY = "SELECT " + ",\n".join(
+        f"(SELECT coalesce(json_agg(q), '[]'::json) FROM ({section_query}) q) AS {name}"
+        for name, section_query in METADATA_QUERIES.items()
+    )
+    
+    TABLE_VERSION_QUERY = """
+        SELECT 
+            c.relfilenode,
+            c.xmin::text as xmin,
+            pg_stat_get_tuples_inserted(c.oid) as n_tup_ins,
+            pg_stat_get_tuples_updated(c.oid) as n_tup_upd,
+            pg_stat_get_tuples_deleted(c.oid) as n_tup_del
+        FROM pg_class c
+        WHERE c.oid = to_regclass(quote_ident(%(table_name)s))
+        """
+    
+    # 기하 컬럼 하나의 공간 범위 집계식 ({geom}: 기하 컬럼, 나머지: 컬럼 순번이 붙은 별칭)
+    SPATIAL_EXTENT_COLUMNS = sql.SQL("""
+            ST_XMin(ST_Extent({geom})) as {min_x},
+            ST_YMin(ST_Extent({geom})) as {min_y},
+            ST_XMax(ST_Extent({geom})) as {max_x},
+            ST_YMax(ST_Extent({geom})) as {max_y},
+            COUNT({geom}) as {valid_geom_count}""")
+    EXTENT_ALIASES = ('min_x', 'min_y', 'max_x', 'max_y', 'valid_geom_count')
+    
+    # 샘플 데이터 문자열 값 표시 폭 (초과 시 '...'로 생략, 서버에서 처리)
+    SAMPLE_TEXT_WIDTH = 50
+    SAMPLE_TEXT_TYPES = ('text', 'character varying', 'character', 'name', 'xml', 'USER-DEFINED')
+    SAMPLE_TRUNCATE_SQL = sql.SQL(
+        "CASE WHEN length({value}) > {width} THEN left({value}, {cut}) || '...' ELSE {value} END AS {name}"
+    )
+    
+    # 테이블마다 반복 실행되는 문장은 세션마다 한 번 PREPARE (이름 → 쿼리, $1: 테이블명)
+    # (여러 번 참조되는 파라미터의 타입 추론이 엇갈리지 않도록 text로 명시)
+    PREPARED_QUERIES = {
+        'analyzer_metadata_q': METADATA_QUERY.replace('%(table_name)s', '$1::text'),
+        'analyzer_version_q': TABLE_VERSION_QUERY.replace('%(table_name)s', '$1::text'),
+    }
+    
+    def __init__(self):
+        self.db = PostgreSQLConnection()
+        # 공간 범위 캐시: (테이블명, 기하 컬럼) → (테이블 버전, 결과)
+        self._extent_cache = {}
+        # 테이블 목록 캐시: 테이블명 → get_all_tables() 행 (크기 내림차순 유지)
+        self._tables_by_name = None
+        
+    def connect(self):
+        """데이터베이스 연결 (분석에 반복 사용하는 문장을 한 번의 왕복으로 PREPARE)"""
+        connected = self.db.connect()
+        if connected:
+            self.db.prepare_statements(self.PREPARED_QUERIES)
+        return connected
+    
+    def disconnect(self):
+        """데이터베이스 연결 해제"""
+        self.db.disconnect()
+        self._tables_by_name = None
+    
+    def get_all_tables(self, refresh=False):
+        """
+        모든 테이블 목록과 기본 정보 조회
+        
+        결과는 인스턴스에 캐시되며, refresh=True이면 다시 조회합니다.
+        (대화형 분석 중 반복 호출 시 카탈로그 조회 생략)
+        """
+        if self._tables_by_name is not None and not refresh:
+            return list(self._tables_by_name.values())
+        
+        # 크기는 서브쿼리에서 테이블당 한 번만 계산하고, 정렬은 바이트 값으로
+        # (크기 함수는 volatile이라 서브쿼리가 펼쳐지지 않아 재계산되지 않음)
+        query = """
+        SELECT 
+            tablename,
+            schemaname,
+            tableowner,
+            hasindexes,
+            hasrules,
+            hastriggers,
+            pg_size_pretty(total_bytes) as total_size,
+            pg_size_pretty(table_bytes) as table_size,
+            estimated_rows
+        FROM (
+            SELECT 
+                c.relname as tablename,
+                n.nspname as schemaname,
+                pg_get_userbyid(c.relowner) as tableowner,
+                c.relhasindex as hasindexes,
+                c.relhasrules as hasrules,
+                c.relhastriggers as hastriggers,
+                pg_total_relation_size(c.oid) as total_bytes,
+                pg_relation_size(c.oid) as table_bytes,
+                c.reltuples::bigint as estimated_rows
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public'
+              AND c.relkind IN ('r', 'p')
+        ) t
+        ORDER BY total_bytes DESC
+        """
+        tables = self.db.execute_query(query)
+        if tables:
+            self._tables_by_name = {table['tablename']: table for table in tables}
+        return tables
+    
+    def _execute_prepared(self, name, fallback_query, table_name):
+        """
+        PREPARED_QUERIES의 문장을 EXECUTE (파싱/계획 단계 생략)
+        
+        현재 세션에 PREPARE 할 수 없으면 원래 쿼리(fallback_query)를 그대로 실행합니다.
+        """
+        if self.db.prepare_statement(name, self.PREPARED_QUERIES[name]):
+            return self.db.execute_query(f"EXECUTE {name} (%s)", (table_name,))
+        return self.db.execute_query(fallback_query, {'table_name': table_name})
+    
+    def get_table_columns_detailed(self, table_name):
+        """테이블 컬럼 상세 정보 조회"""
+        return self.db.execute_query(self.COLUMNS_QUERY, {'table_name': table_name})
+    
+    def get_table_indexes(self, table_name):
+        """테이블 인덱스 정보 조회"""
+        return self.db.execute_query(self.INDEXES_QUERY, {'table_name': table_name})
+    
+    def get_table_constraints(self, table_name):
+        """테이블 제약조건 정보 조회"""
+        return self.db.execute_query(self.CONSTRAINTS_QUERY, {'table_name': table_name})
+    
+    def get_spatial_info(self, table_name):
+        """공간 데이터 정보 조회"""
+        return self.db.execute_query(self.SPATIAL_INFO_QUERY, {'table_name': table_name})
+    
+    def get_table_version(self, table_name):
+        """
+        테이블 변경 여부 판단용 버전 정보 조회
+        
+        relfilenode/xmin(DDL, TRUNCATE, VACUUM FULL)과 누적 삽입/수정/삭제 튜플 수로 구성되며,
+        값이 같으면 테이블 내용이 바뀌지 않은 것으로 간주합니다.
+        (통계 수집기 반영 지연으로 방금 커밋된 변경은 잠시 늦게 반영될 수 있음)
+        """
+        result = self._execute_prepared('analyzer_version_q', self.TABLE_VERSION_QUERY, table_name)
+        return tuple(result[0].values()) if result else None
     
     def get_spatial_extent(self, table_name, geom_column):
         """공간 데이터 범위 조회"""
-        query = f"""
-        SELECT 
-            ST_XMin(ST_Extent({geom_column})) as min_x,
-            ST_YMin(ST_Extent({geom_column})) as min_y,
-            ST_XMax(ST_Extent({geom_column})) as max_x,
-            ST_YMax(ST_Extent({geom_column})) as max_y,
-            COUNT(*) as geom_count,
-            COUNT(*) FILTER (WHERE {geom_column} IS NOT NULL) as valid_geom_count
-        FROM "{table_name}"
+        return self.get_spatial_extents(table_name, [geom_column]).get(geom_column, [])
+    
+    def get_spatial_extents(self, table_name, geom_columns):
+        """
+        여러 기하 컬럼의 공간 범위를 한 번의 테이블 스캔으로 조회
+        
+        ST_Extent는 테이블 전체를 스캔하므로 기하 컬럼별로 따로 조회하지 않고 한 문장에서
+        모두 집계하며, 테이블 버전이 바뀌지 않은 컬럼은 이전 결과를 재사용합니다.
+        반환값은 기하 컬럼명 → 공간 범위 행 목록 (조회 실패한 컬럼은 제외)
         """
-        return self.db.execute_query(query)
+        version = self.get_table_version(table_name)
+        extents = {}
+        pending = []
+        for geom_column in geom_columns:
+            cached = self._extent_cache.get((table_name, geom_column))
+            if version is not None and cached and cached[0] == version:
+                extents[geom_column] = cached[1]
+            elif geom_column not in pending:
+                pending.append(geom_column)
+        if not pending:
+            return extents
+        
+        select_list = [
+            self.SPATIAL_EXTENT_COLUMNS.format(
+                geom=sql.Identifier(geom_column),
+                **{alias: sql.Identifier(f"{alias}_{i}") for alias in self.EXTENT_ALIASES}
+            )
+            for i, geom_column in enumerate(pending)
+        ]
+        query = sql.SQL("SELECT COUNT(*) as geom_count, {columns} FROM {table}").format(
+            columns=sql.SQL(",").join(select_list),
+            table=sql.Identifier(table_name),
+        )
+        result = self.db.execute_query(query)
+        if not result:
+            return extents
+        
+        row = result[0]
+        for i, geom_column in enumerate(pending):
+            extent = [{
+                'min_x': row[f"min_x_{i}"],
+                'min_y': row[f"min_y_{i}"],
+                'max_x': row[f"max_x_{i}"],
+                'max_y': row[f"max_y_{i}"],
+                'geom_count': row['geom_count'],
+                'valid_geom_count': row[f"valid_geom_count_{i}"],
+            }]
+            extents[geom_column] = extent
+            if version is not None:
+                self._extent_cache[(table_name, geom_column)] = (version, extent)
+        return extents
     
     def get_table_statistics(self, table_name):
         """테이블 통계 정보 조회"""
-        query = f"""
+        query = """
         SELECT 
             schemaname,
             tablename,
@@ -181,189 +402,215 @@ class PostgreSQLTableAnalyzer:
     
     def get_table_activity(self, table_name):
         """테이블 활동 통계 조회"""
-        query = """
-        SELECT 
-            seq_scan,
-            seq_tup_read,
-            idx_scan,
-            idx_tup_fetch,
-            n_tup_ins,
-            n_tup_upd,
-            n_tup_del,
-            n_tup_hot_upd,
-            n_live_tup,
-            n_dead_tup,
-            last_vacuum,
-            last_autovacuum,
-            last_analyze,
-            last_autoanalyze
-        FROM pg_stat_user_tables 
-        WHERE relname = %s
+        return self.db.execute_query(self.ACTIVITY_QUERY, {'table_name': table_name})
+    
+    def get_table_metadata(self, table_name):
         """
-        return self.db.execute_query(query, (table_name,))
+        컬럼/인덱스/제약조건/공간 정보/활동 통계를 한 번의 왕복으로 조회
+        
+        각 쿼리를 json_agg 스칼라 서브쿼리로 감싸 한 문장으로 실행하므로
+        항목 수만큼 네트워크 왕복을 기다리지 않습니다.
+        반환값은 METADATA_QUERIES의 키 → 행(dict) 목록이며, 조회 실패 시 모두 빈 목록입니다.
+        (JSON을 거치므로 날짜/시간 값은 ISO 형식 문자열로 반환됨)
+        """
+        result = self._execute_prepared('analyzer_metadata_q', self.METADATA_QUERY, table_name)
+        row = result[0] if result else {}
+        return {name: row.get(name) or [] for name in self.METADATA_QUERIES}
     
-    def analyze_table_comprehensive(self, table_name):
-        """테이블 종합 분석"""
-        print(f"\n{'='*60}")
-        print(f"🔍 테이블 '{table_name}' 종합 분석 보고서")
-        print(f"{'='*60}")
-        print(f"📅 분석 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    def _sample_query(self, table_name, metadata, limit=5):
+        """
+        샘플 레코드 조회 쿼리 생성
+        
+        기하 컬럼은 원본 geometry 대신 경계 상자(ST_Envelope)의 WKT로 바꿔 조회하므로,
+        대용량 MultiPolygon이 있어도 레코드당 수십 바이트만 전송됩니다.
+        문자열 컬럼은 서버에서 SAMPLE_TEXT_WIDTH자로 잘라 보내므로 출력 시 따로 자르지 않습니다.
+        """
+        geom_columns = {info['geom_column'] for info in metadata['spatial_info']}
+        select_list = []
+        for column in metadata['columns']:
+            name = sql.Identifier(column['column_name'])
+            if column['column_name'] in geom_columns:
+                value = sql.SQL("ST_AsText(ST_Envelope({}))").format(name)
+            elif column['data_type'] in self.SAMPLE_TEXT_TYPES:
+                value = sql.SQL("{}::text").format(name)
+            else:
+                select_list.append(name)
+                continue
+            select_list.append(self.SAMPLE_TRUNCATE_SQL.format(
+                value=value, name=name,
+                width=sql.Literal(self.SAMPLE_TEXT_WIDTH),
+                cut=sql.Literal(self.SAMPLE_TEXT_WIDTH - 3),
+            ))
+        
+        return sql.SQL("SELECT {columns} FROM {table} LIMIT {limit}").format(
+            columns=sql.SQL(", ").join(select_list) if select_list else sql.SQL("*"),
+            table=sql.Identifier(table_name),
+            limit=sql.Literal(int(limit)),
+        )
+    
+    def analyze_table_comprehensive(self, table_name, out: Optional[TextIO] = None):
+        """
+        테이블 종합 분석
+        
+        보고서 출력은 메모리 버퍼에 모았다가 out(기본값: 표준 출력)에 한 번에 기록하므로
+        수십 번의 print마다 터미널에 쓰고 flush 하지 않습니다.
+        """
+        report = io.StringIO()
+        try:
+            self._print_analysis_report(table_name, report)
+        finally:
+            out = out or sys.stdout
+            out.write(report.getvalue())
+            out.flush()
+    
+    def _print_analysis_report(self, table_name, out: TextIO):
+        """테이블 종합 분석 보고서를 out에 출력"""
+        print(f"\n{'='*60}", file=out)
+        print(f"🔍 테이블 '{table_name}' 종합 분석 보고서", file=out)
+        print(f"{'='*60}", file=out)
+        print(f"📅 분석 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", file=out)
         
         try:
             # 1. 기본 정보
-            print(f"\n📊 1. 기본 정보")
-            print("─" * 30)
+            print(f"\n📊 1. 기본 정보", file=out)
+            print("─" * 30, file=out)
             
-            tables_info = self.get_all_tables()
-            table_info = next((t for t in tables_info if t['tablename'] == table_name), None)
+            # 컬럼/인덱스/제약조건/공간/활동 정보는 한 번의 왕복으로 미리 조회
+            metadata = self.get_table_metadata(table_name)
+            
+            if self._tables_by_name is None:
+                self.get_all_tables()
+            table_info = (self._tables_by_name or {}).get(table_name)
             
             if table_info:
-                print(f"   테이블명: {table_info['tablename']}")
-                print(f"   스키마: {table_info['schemaname']}")
-                print(f"   소유자: {table_info['tableowner']}")
-                print(f"   전체 크기: {table_info['total_size']}")
-                print(f"   테이블 크기: {table_info['table_size']}")
-                print(f"   예상 레코드 수: {table_info['estimated_rows']:,}")
-                print(f"   인덱스 보유: {'예' if table_info['hasindexes'] else '아니오'}")
-                print(f"   규칙 보유: {'예' if table_info['hasrules'] else '아니오'}")
-                print(f"   트리거 보유: {'예' if table_info['hastriggers'] else '아니오'}")
+                print(f"   테이블명: {table_info['tablename']}", file=out)
+                print(f"   스키마: {table_info['schemaname']}", file=out)
+                print(f"   소유자: {table_info['tableowner']}", file=out)
+                print(f"   전체 크기: {table_info['total_size']}", file=out)
+                print(f"   테이블 크기: {table_info['table_size']}", file=out)
+                print(f"   예상 레코드 수: {table_info['estimated_rows']:,}", file=out)
+                print(f"   인덱스 보유: {'예' if table_info['hasindexes'] else '아니오'}", file=out)
+                print(f"   규칙 보유: {'예' if table_info['hasrules'] else '아니오'}", file=out)
+                print(f"   트리거 보유: {'예' if table_info['hastriggers'] else '아니오'}", file=out)
             
             # 2. 컬럼 정보
-            print(f"\n📋 2. 컬럼 정보")
-            print("─" * 30)
+            print(f"\n📋 2. 컬럼 정보", file=out)
+            print("─" * 30, file=out)
             
-            columns = self.get_table_columns_detailed(table_name)
-            print(f"   총 컬럼 수: {len(columns)}")
-            print(f"\n   {'순번':<4} {'컬럼명':<25} {'데이터타입':<20} {'NULL허용':<8} {'제약조건':<15}")
-            print("   " + "─" * 80)
+            columns = metadata['columns']
+            print(f"   총 컬럼 수: {len(columns)}", file=out)
+            print(f"\n   {'순번':<4} {'컬럼명':<25} {'데이터타입':<20} {'NULL허용':<8} {'제약조건':<15}", file=out)
+            print("   " + "─" * 80, file=out)
             
-            for col in columns:
-                data_type = col['data_type']
-                if col['character_maximum_length']:
-                    data_type += f"({col['character_maximum_length']})"
-                elif col['numeric_precision']:
-                    if col['numeric_scale']:
-                        data_type += f"({col['numeric_precision']},{col['numeric_scale']})"
-                    else:
-                        data_type += f"({col['numeric_precision']})"
-                
-                nullable = "예" if col['is_nullable'] == 'YES' else "아니오"
-                constraint = col['constraint_type'] if col['constraint_type'] else ""
-                
-                print(f"   {col['ordinal_position']:<4} {col['column_name']:<25} {data_type:<20} {nullable:<8} {constraint:<15}")
+            # 컬럼 행을 모두 만든 뒤 한 번에 출력 (컬럼 수가 많아도 print 호출은 한 번)
+            column_lines = [
+                f"   {col['ordinal_position']:<4} {col['column_name']:<25} {_format_data_type(col):<20} "
+                f"{'예' if col['is_nullable'] == 'YES' else '아니오':<8} {col['constraint_type'] or '':<15}"
+                for col in columns
+            ]
+            if column_lines:
+                print("\n".join(column_lines), file=out)
             
             # 3. 인덱스 정보
-            print(f"\n🔍 3. 인덱스 정보")
-            print("─" * 30)
+            print(f"\n🔍 3. 인덱스 정보", file=out)
+            print("─" * 30, file=out)
             
-            indexes = self.get_table_indexes(table_name)
+            indexes = metadata['indexes']
             if indexes:
                 for idx in indexes:
-                    print(f"   📌 {idx['indexname']}")
-                    print(f"      크기: {idx['index_size']}")
-                    print(f"      스캔 횟수: {idx['scan_count'] if idx['scan_count'] else 0:,}")
-                    print(f"      읽은 튜플: {idx['tuples_read'] if idx['tuples_read'] else 0:,}")
-                    print(f"      가져온 튜플: {idx['tuples_fetched'] if idx['tuples_fetched'] else 0:,}")
-                    print(f"      정의: {idx['indexdef']}")
-                    print()
+                    print(f"   📌 {idx['indexname']}", file=out)
+                    print(f"      크기: {idx['index_size']}", file=out)
+                    print(f"      스캔 횟수: {idx['scan_count'] if idx['scan_count'] else 0:,}", file=out)
+                    print(f"      읽은 튜플: {idx['tuples_read'] if idx['tuples_read'] else 0:,}", file=out)
+                    print(f"      가져온 튜플: {idx['tuples_fetched'] if idx['tuples_fetched'] else 0:,}", file=out)
+                    print(f"      정의: {idx['indexdef']}", file=out)
+                    print(file=out)
             else:
-                print("   인덱스가 없습니다.")
+                print("   인덱스가 없습니다.", file=out)
             
             # 4. 제약조건 정보
-            print(f"\n🔒 4. 제약조건 정보")
-            print("─" * 30)
+            print(f"\n🔒 4. 제약조건 정보", file=out)
+            print("─" * 30, file=out)
             
-            constraints = self.get_table_constraints(table_name)
+            constraints = metadata['constraints']
             if constraints:
-                constraint_types = {
-                    'PRIMARY KEY': '🔑 기본키',
-                    'FOREIGN KEY': '🔗 외래키',
-                    'UNIQUE': '🚫 유니크',
-                    'CHECK': '✅ 체크',
-                    'NOT NULL': '❗ NOT NULL'
-                }
-                
                 for constraint in constraints:
-                    ctype = constraint_types.get(constraint['constraint_type'], constraint['constraint_type'])
-                    print(f"   {ctype}: {constraint['constraint_name']}")
-                    print(f"      컬럼: {constraint['column_name']}")
+                    ctype = _CONSTRAINT_LABELS.get(constraint['constraint_type'], constraint['constraint_type'])
+                    print(f"   {ctype}: {constraint['constraint_name']}", file=out)
+                    print(f"      컬럼: {constraint['column_name']}", file=out)
                     
                     if constraint['foreign_table_name']:
-                        print(f"      참조 테이블: {constraint['foreign_table_name']}.{constraint['foreign_column_name']}")
-                        print(f"      업데이트 규칙: {constraint['update_rule']}")
-                        print(f"      삭제 규칙: {constraint['delete_rule']}")
-                    print()
+                        print(f"      참조 테이블: {constraint['foreign_table_name']}.{constraint['foreign_column_name']}", file=out)
+                        print(f"      업데이트 규칙: {constraint['update_rule']}", file=out)
+                        print(f"      삭제 규칙: {constraint['delete_rule']}", file=out)
+                    print(file=out)
             else:
-                print("   제약조건이 없습니다.")
+                print("   제약조건이 없습니다.", file=out)
             
             # 5. 공간 데이터 정보
-            print(f"\n🌍 5. 공간 데이터 정보")
-            print("─" * 30)
+            print(f"\n🌍 5. 공간 데이터 정보", file=out)
+            print("─" * 30, file=out)
             
-            spatial_info = self.get_spatial_info(table_name)
+            spatial_info = metadata['spatial_info']
             if spatial_info:
+                # 모든 기하 컬럼의 공간 범위를 한 번의 스캔으로 조회
+                extents = self.get_spatial_extents(table_name, [geom['geom_column'] for geom in spatial_info])
                 for geom in spatial_info:
-                    print(f"   지오메트리 컬럼: {geom['geom_column']}")
-                    print(f"   지오메트리 타입: {geom['geometry_type']}")
-                    print(f"   차원: {geom['dimensions']}D")
-                    print(f"   SRID: {geom['srid']}")
+                    print(f"   지오메트리 컬럼: {geom['geom_column']}", file=out)
+                    print(f"   지오메트리 타입: {geom['geometry_type']}", file=out)
+                    print(f"   차원: {geom['dimensions']}D", file=out)
+                    print(f"   SRID: {geom['srid']}", file=out)
                     
-                    # 공간 범위 조회
-                    extent = self.get_spatial_extent(table_name, geom['geom_column'])
+                    extent = extents.get(geom['geom_column'])
                     if extent and extent[0]['min_x']:
                         ext = extent[0]
-                        print(f"   공간 범위:")
-                        print(f"      X: {ext['min_x']:.6f} ~ {ext['max_x']:.6f}")
-                        print(f"      Y: {ext['min_y']:.6f} ~ {ext['max_y']:.6f}")
-                        print(f"      총 피처 수: {ext['geom_count']:,}")
-                        print(f"      유효 지오메트리 수: {ext['valid_geom_count']:,}")
-                    print()
+                        print(f"   공간 범위:", file=out)
+                        print(f"      X: {ext['min_x']:.6f} ~ {ext['max_x']:.6f}", file=out)
+                        print(f"      Y: {ext['min_y']:.6f} ~ {ext['max_y']:.6f}", file=out)
+                        print(f"      총 피처 수: {ext['geom_count']:,}", file=out)
+                        print(f"      유효 지오메트리 수: {ext['valid_geom_count']:,}", file=out)
+                    print(file=out)
             else:
-                print("   공간 데이터가 없습니다.")
+                print("   공간 데이터가 없습니다.", file=out)
             
             # 6. 테이블 활동 통계
-            print(f"\n📈 6. 테이블 활동 통계")
-            print("─" * 30)
+            print(f"\n📈 6. 테이블 활동 통계", file=out)
+            print("─" * 30, file=out)
             
-            activity = self.get_table_activity(table_name)
+            activity = metadata['activity']
             if activity:
                 act = activity[0]
-                print(f"   순차 스캔: {act['seq_scan'] if act['seq_scan'] else 0:,}")
-                print(f"   순차 스캔으로 읽은 튜플: {act['seq_tup_read'] if act['seq_tup_read'] else 0:,}")
-                print(f"   인덱스 스캔: {act['idx_scan'] if act['idx_scan'] else 0:,}")
-                print(f"   인덱스로 가져온 튜플: {act['idx_tup_fetch'] if act['idx_tup_fetch'] else 0:,}")
-                print(f"   삽입된 튜플: {act['n_tup_ins'] if act['n_tup_ins'] else 0:,}")
-                print(f"   업데이트된 튜플: {act['n_tup_upd'] if act['n_tup_upd'] else 0:,}")
-                print(f"   삭제된 튜플: {act['n_tup_del'] if act['n_tup_del'] else 0:,}")
-                print(f"   활성 튜플: {act['n_live_tup'] if act['n_live_tup'] else 0:,}")
-                print(f"   죽은 튜플: {act['n_dead_tup'] if act['n_dead_tup'] else 0:,}")
-                print(f"   마지막 VACUUM: {act['last_vacuum'] if act['last_vacuum'] else '없음'}")
-                print(f"   마지막 분석: {act['last_analyze'] if act['last_analyze'] else '없음'}")
+                print(f"   순차 스캔: {act['seq_scan'] if act['seq_scan'] else 0:,}", file=out)
+                print(f"   순차 스캔으로 읽은 튜플: {act['seq_tup_read'] if act['seq_tup_read'] else 0:,}", file=out)
+                print(f"   인덱스 스캔: {act['idx_scan'] if act['idx_scan'] else 0:,}", file=out)
+                print(f"   인덱스로 가져온 튜플: {act['idx_tup_fetch'] if act['idx_tup_fetch'] else 0:,}", file=out)
+                print(f"   삽입된 튜플: {act['n_tup_ins'] if act['n_tup_ins'] else 0:,}", file=out)
+                print(f"   업데이트된 튜플: {act['n_tup_upd'] if act['n_tup_upd'] else 0:,}", file=out)
+                print(f"   삭제된 튜플: {act['n_tup_del'] if act['n_tup_del'] else 0:,}", file=out)
+                print(f"   활성 튜플: {act['n_live_tup'] if act['n_live_tup'] else 0:,}", file=out)
+                print(f"   죽은 튜플: {act['n_dead_tup'] if act['n_dead_tup'] else 0:,}", file=out)
+                print(f"   마지막 VACUUM: {act['last_vacuum'] if act['last_vacuum'] else '없음'}", file=out)
+                print(f"   마지막 분석: {act['last_analyze'] if act['last_analyze'] else '없음'}", file=out)
             
             # 7. 샘플 데이터
-            print(f"\n📄 7. 샘플 데이터 (상위 5개)")
-            print("─" * 30)
-            
-            sample_query = f'SELECT * FROM "{table_name}" LIMIT 5'
-            sample_data = self.db.execute_query(sample_query)
+            print(f"\n📄 7. 샘플 데이터 (상위 5개)", file=out)
+            print("─" * 30, file=out)
             
-            if sample_data:
-                for i, row in enumerate(sample_data, 1):
-                    print(f"   레코드 {i}:")
-                    for key, value in row.items():
-                        if isinstance(value, str) and len(str(value)) > 50:
-                            display_value = str(value)[:47] + "..."
-                        else:
-                            display_value = value
-                        print(f"      {key}: {display_value}")
-                    print()
+            # 서버 측 커서로 한 번에 5행만 받아 바로 출력 (결과 목록을 따로 만들지 않음)
+            sample_rows = self.db.stream_query(self._sample_query(table_name, metadata), itersize=5,
+                                               cursor_factory=psycopg2.extras.RealDictCursor)
+            for i, row in enumerate(sample_rows, 1):
+                print(f"   레코드 {i}:", file=out)
+                for key, value in row.items():
+                    print(f"      {key}: {value}", file=out)
+                print(file=out)
             
-            print(f"\n{'='*60}")
-            print("✅ 분석 완료")
-            print(f"{'='*60}")
+            print(f"\n{'='*60}", file=out)
+            print("✅ 분석 완료", file=out)
+            print(f"{'='*60}", file=out)
             
         except Exception as e:
-            print(f"❌ 분석 중 오류 발생: {e}")
+            print(f"❌ 분석 중 오류 발생: {e}", file=out)
 
 def main():
     """메인 함수"""
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+🧪 데이터 내보내기 모듈 테스트 (데이터베이스 없이 실행)
+========================================
+
+내보내기 쿼리가 식별자를 인용하고 필터 값을 파라미터로 전달하는지 확인
+"""
+
+import sys
+from pathlib import Path
+
+from psycopg2 import sql
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+from data_exporter import PostgreSQLDataExporter
+
+
+def render(query):
+    """연결 없이 sql.Composable을 문자열로 변환 (식별자는 큰따옴표 인용)"""
+    if isinstance(query, sql.Composed):
+        return ''.join(render(part) for part in query.seq)
+    if isinstance(query, sql.Identifier):
+        return '.'.join('"{}"'.format(name.replace('"', '""')) for name in query.strings)
+    if isinstance(query, sql.Literal):
+        return repr(query.wrapped)
+    return query.string
+
+
+class FakeDB:
+    """COPY/스트리밍 호출 인자만 기록하는 연결"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.calls = []
+
+    def copy_query_to_file(self, query, file, options="CSV HEADER", params=None):
+        self.calls.append((render(query), params))
+        file.write("id\n1\n")
+        return 1
+
+    def stream_query(self, query, params=None, itersize=10000, cursor_factory=None):
+        self.calls.append((render(query), params))
+        return iter(self.rows)
+
+
+def make_exporter(tmp_path, db):
+    exporter = PostgreSQLDataExporter.__new__(PostgreSQLDataExporter)
+    exporter.export_dir = str(tmp_path)
+    exporter.db = db
+    return exporter
+
+
+def test_select_query_quotes_table_and_parameterizes_filters(tmp_path):
+    """테이블/컬럼명은 인용되고 필터 값은 SQL 문자열이 아닌 파라미터로 전달되는지 확인"""
+    exporter = make_exporter(tmp_path, FakeDB())
+    query, params = exporter._select_query('forest "plots"', limit=10,
+                                           filters={'region': "강원' OR 1=1 --", 'year': 2024})
+
+    assert render(query) == ('SELECT * FROM "forest ""plots""" '
+                             'WHERE "region" = %s AND "year" = %s LIMIT 10')
+    assert params == ("강원' OR 1=1 --", 2024)
+    assert exporter._select_query('t')[1] is None
+
+
+def test_csv_export_passes_filter_params_to_copy(tmp_path):
+    """CSV 내보내기가 COPY 쿼리와 필터 파라미터를 함께 넘기는지 확인"""
+    db = FakeDB()
+    filepath = make_exporter(tmp_path, db).export_table_to_csv('plots', filters={'region': '강원'})
+
+    assert Path(filepath).read_text(encoding='utf-8') == "id\n1\n"
+    assert db.calls == [('SELECT * FROM "plots" WHERE "region" = %s', ('강원',))]
+
+
+
+def test_geojson_query_quotes_identifiers(tmp_path):
+    """GeoJSON 스트리밍 쿼리가 테이블/기하 컬럼명을 인용하고 피처를 기록하는지 확인"""
+    db = FakeDB(rows=[('{"type": "Point", "coordinates": [1, 2]}', '{"id": 1}')])
+    filepath = make_exporter(tmp_path, db).export_spatial_data_to_geojson('my"table', 'the geom', limit=5)
+
+    query, params = db.calls[0]
+    assert 'FROM "my""table"' in query
+    assert 't."the geom" IS NOT NULL' in query and 'ST_AsGeoJSON(t."the geom")' in query
+    assert 'LIMIT 5' in query
+    assert params == ('the geom',)
+    assert '"properties": {"id": 1}' in Path(filepath).read_text(encoding='utf-8')
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+🧪 데이터 품질 검사 모듈 테스트 (데이터베이스 없이 실행)
+========================================
+
+중복 값 검사의 컬럼 선택/제외 컬럼 보고와 검사별 컬럼 묶음 조회 확인
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+from data_quality_checker import PostgreSQLDataQualityChecker
+
+TABLE_COLUMNS = [
+    {'column_name': 'id', 'data_type': 'integer'},
+    {'column_name': 'name', 'data_type': 'text'},
+    {'column_name': 'props', 'data_type': 'json'},
+]
+
+
+# 전체 12행, 컬럼마다 값 10개(고유값 10개), 사분위 1/2/3, 이상치 1개
+AGGREGATE_VALUES = {
+    'total': 12, 'non_null': 10, 'unique': 10, 'non_null_count': 10,
+    'min_value': 0, 'max_value': 9, 'avg_value': 2, 'std_dev': 1,
+    'q1': 1, 'median': 2, 'q3': 3, 'outlier_count': 1,
+}
+
+
+class FakeDB:
+    """information_schema 조회에는 TABLE_COLUMNS, 집계 쿼리에는 고정 값을 돌려주는 연결"""
+
+    def __init__(self, table_columns):
+        self.table_columns = table_columns
+        self.queries = []
+
+    def execute_query(self, query, params=None):
+        self.queries.append(query)
+        if 'information_schema.columns' in query:
+            return self.table_columns
+        if 'COUNT(' in query:
+            # 집계 별칭(이름_컬럼 순번)마다 AGGREGATE_VALUES의 고정 값
+            return [{alias: AGGREGATE_VALUES[alias.rsplit('_', 1)[0]]
+                     for alias in re.findall(r'as (\w+)', query)}]
+        return []
+
+
+def make_checker(table_columns=TABLE_COLUMNS):
+    checker = PostgreSQLDataQualityChecker.__new__(PostgreSQLDataQualityChecker)
+    checker.db = FakeDB(table_columns)
+    return checker
+
+
+def test_all_columns_skip_non_comparable_types():
+    """컬럼을 지정하지 않으면 비교할 수 없는 타입 컬럼만 제외되고 보고되는지 확인"""
+    result = make_checker().check_duplicate_values('t')
+
+    assert [col['column_name'] for col in result['columns']] == ['id', 'name']
+    assert [col['column_name'] for col in result['skipped_columns']] == ['props']
+    assert result['summary']['columns_skipped'] == 1
+
+
+def test_requested_unknown_and_non_comparable_columns_are_reported():
+    """지정한 컬럼 중 없는 컬럼과 비교할 수 없는 컬럼이 사유와 함께 보고되는지 확인"""
+    result = make_checker().check_duplicate_values('t', ['name', 'missing', 'props'])
+
+    assert [col['column_name'] for col in result['columns']] == ['name']
+    skipped = {col['column_name']: col['reason'] for col in result['skipped_columns']}
+    assert set(skipped) == {'missing', 'props'}
+    assert 'json' in skipped['props']
+
+
+def test_all_requested_columns_skipped_runs_no_table_scan():
+    """검사할 컬럼이 하나도 없으면 테이블 집계 쿼리를 실행하지 않는지 확인"""
+    checker = make_checker()
+    result = checker.check_duplicate_values('t', ['missing', 'props'])
+
+    assert result['columns'] == []
+    assert result['summary']['columns_skipped'] == 2
+    assert len(checker.db.queries) == 1  # information_schema 조회만 실행
+
+
+def test_missing_table_returns_error():
+    """테이블이 없으면 오류 결과를 반환하는지 확인"""
+    assert 'error' in make_checker([]).check_duplicate_values('missing_table', ['id'])
+
+
+def wide_table(n_columns=120):
+    return [{'column_name': f'c{i}', 'data_type': 'integer', 'is_nullable': 'YES'}
+            for i in range(n_columns)]
+
+
+def aggregate_queries(checker, marker):
+    return [query for query in checker.db.queries if marker in query]
+
+
+def test_wide_table_is_counted_in_column_batches():
+    """넓은 테이블은 COLUMN_BATCH_SIZE개 컬럼씩 나눠 집계하고 결과를 합치는지 확인"""
+    checker = make_checker(wide_table())
+    result = checker.check_duplicate_values('wide')
+
+    count_queries = aggregate_queries(checker, 'COUNT(DISTINCT')
+    assert len(count_queries) == 3
+    assert all(query.count('COUNT(DISTINCT') <= checker.COLUMN_BATCH_SIZE for query in count_queries)
+    assert [col['column_name'] for col in result['columns']] == [f'c{i}' for i in range(120)]
+    assert result['summary']['total_columns_checked'] == 120
+
+
+def test_null_check_batches_columns():
+    """NULL 검사가 컬럼 묶음마다 조회하고 전체 행 수는 첫 묶음에서만 세는지 확인"""
+    checker = make_checker(wide_table())
+    result = checker.check_null_values('wide')
+
+    count_queries = aggregate_queries(checker, 'non_null_')
+    assert len(count_queries) == 3
+    assert sum('COUNT(*) as total_rows' in query for query in count_queries) == 1
+    assert len(result['columns']) == 120
+    assert all(col['null_count'] == 2 for col in result['columns'])
+
+
+def test_consistency_check_batches_statistics_and_outliers():
+    """일관성 검사의 통계/이상치 집계가 모두 컬럼 묶음으로 나뉘는지 확인"""
+    checker = make_checker(wide_table())
+    result = checker.check_data_consistency('wide')
+
+    assert len(aggregate_queries(checker, 'PERCENTILE_CONT(0.5)')) == 3
+    assert len(aggregate_queries(checker, 'FILTER (WHERE')) == 3
+    assert len(result['numeric_columns']) == 120
+    assert all(col['outlier_count'] == 1 for col in result['numeric_columns'])
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+🧪 PostgreSQL 연결 모듈 테스트 (데이터베이스 없이 실행)
+========================================
+
+copy_query_to_array가 COPY BINARY 결과를 구조화 배열로 해석하는지 확인
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+import db_connection
+from db_connection import PostgreSQLConnection, _PGCOPY_SIGNATURE
+
+
+class FakeCursor:
+    """copy_expert 호출 시 준비한 COPY 결과를 기록하는 커서"""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.copy_sql = None
+
+    def mogrify(self, query, params):
+        return (query % {key: repr(value) for key, value in params.items()}).encode()
+
+    def copy_expert(self, sql, file):
+        self.copy_sql = sql
+        file.write(self.payload)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    autocommit = False
+
+    def __init__(self, payload):
+        self.last_cursor = FakeCursor(payload)
+
+    def cursor(self, cursor_factory=None):
+        return self.last_cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def copy_binary(rows, header_extension=b''):
+    """(값 바이트 또는 None) 튜플 목록 → COPY BINARY 출력"""
+    data = _PGCOPY_SIGNATURE + struct.pack('>ii', 0, len(header_extension)) + header_extension
+    for row in rows:
+        data += struct.pack('>h', len(row))
+        for value in row:
+            data += struct.pack('>i', -1) if value is None else struct.pack('>i', len(value)) + value
+    return data + struct.pack('>h', -1)
+
+
+def make_db(payload):
+    db = PostgreSQLConnection(password='unused')
+    db.connection = FakeConnection(payload)
+    return db
+
+
+def test_copy_query_to_array_parses_rows():
+    """헤더 확장 영역을 건너뛰고 빅엔디언 값을 각 필드로 해석하는지 확인"""
+    rows = [
+        (struct.pack('>i', 3), struct.pack('>d', 1.5), struct.pack('>f', -2.25)),
+        (struct.pack('>i', -7), struct.pack('>d', 1e10), struct.pack('>f', 0.5)),
+    ]
+    db = make_db(copy_binary(rows, header_extension=b'\x00' * 6))
+
+    result = db.copy_query_to_array("SELECT id, x, z FROM t WHERE a = %(a)s",
+                                    [('id', 'i4'), ('x', 'f8'), ('z', 'f4')], params={'a': 1})
+
+    assert result.dtype.names == ('id', 'x', 'z')
+    assert result['id'].tolist() == [3, -7]
+    assert result['x'].tolist() == [1.5, 1e10]
+    assert result['z'].tolist() == [-2.25, 0.5]
+    assert db.connection.last_cursor.copy_sql == \
+        "COPY (SELECT id, x, z FROM t WHERE a = 1) TO STDOUT WITH (FORMAT BINARY)"
+
+
+def test_copy_query_to_array_empty_result():
+    """결과 행이 없으면 빈 배열을 반환하는지 확인"""
+    db = make_db(copy_binary([]))
+    result = db.copy_query_to_array("SELECT 1", [('id', 'i4')])
+    assert len(result) == 0 and result.dtype == np.dtype([('id', 'i4')])
+
+
+def test_copy_query_to_array_rejects_null():
+    """NULL 값(길이 -1)은 오류로 처리하는지 확인"""
+    rows = [(struct.pack('>i', 1), struct.pack('>h', 2)), (struct.pack('>i', 2), None)]
+    payload = copy_binary(rows)
+    # NULL 필드는 값 바이트가 없어 행 길이가 달라지므로, 같은 길이가 되도록 2바이트를 채움
+    payload = payload[:-2] + b'\x00\x00' + payload[-2:]
+    db = make_db(payload)
+
+    with pytest.raises(ValueError):
+        db.copy_query_to_array("SELECT 1", [('id', 'i4'), ('v', 'i2')])
+
+
+def test_copy_query_to_array_rejects_bad_header_and_length():
+    """시그니처가 다르거나 행 길이가 컬럼 정의와 맞지 않으면 오류로 처리하는지 확인"""
+    with pytest.raises(ValueError):
+        make_db(b'NOTCOPY' + b'\x00' * 20).copy_query_to_array("SELECT 1", [('id', 'i4')])
+
+    payload = copy_binary([(struct.pack('>i', 1),)])
+    with pytest.raises(ValueError):
+        make_db(payload).copy_query_to_array("SELECT 1", [('id', 'i8')])
+
+
+class FakePool:
+    """빌려준 연결과 반환받은 연결의 autocommit 상태를 기록하는 풀"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.returned = []
+
+    def getconn(self):
+        return self.connection
+
+    def putconn(self, connection, close=False):
+        self.returned.append((connection.autocommit, close))
+
+
+def test_disconnect_restores_autocommit_before_returning_to_pool(monkeypatch):
+    """빌린 뒤 autocommit을 켠 연결은 원래 값으로 되돌려 풀에 반환하는지 확인"""
+    connection = FakeConnection(b'')
+    connection.autocommit = False
+    pool = FakePool(connection)
+    db = PostgreSQLConnection(password='unused', use_pool=True)
+    monkeypatch.setitem(db_connection._POOLS, db._pool_key, pool)
+
+    assert db.connect()
+    db.connection.autocommit = True
+    db.disconnect()
+
+    assert pool.returned == [(False, False)]
+    assert db.connection is None
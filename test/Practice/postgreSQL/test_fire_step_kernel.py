@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+🧪 화재 스텝 커널 테스트
+========================================
+
+KernelFireModel의 확산 규칙/열 효과/경계 계산이
+AdvancedCAModel과 같은 결과를 내는지 확인
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy import ndimage
+
+# 현재 디렉토리와 AdvancedCAModel이 있는 ljh/model을 Python 경로에 추가
+current_dir = Path(__file__).parent
+sys.path.append(str(current_dir))
+sys.path.append(str(current_dir.parent.parent.parent / "ljh" / "model"))
+
+from fire_step_kernel import (KernelFireModel, EMPTY, TREE, BURNING, BURNED,
+                              HEAT_COOLING, HEAT_DIFFUSION_SIGMA,
+                              _diffuse_heat, _fire_perimeter, gaussian_weights)
+
+FUEL_PROPERTIES = {
+    'TL1': {'spread_prob': 0.10, 'burn_time': 2, 'heat_output': 1.0},
+    'TU5': {'spread_prob': 0.25, 'burn_time': 5, 'heat_output': 1.8},
+}
+
+
+def make_ca_model(grid, fuel_map=None, heat_map=None, seed=0, **params):
+    """KernelFireModel이 읽는 AdvancedCAModel 속성만 가진 모델"""
+    model_params = {
+        'base_spread_prob': 0.15,
+        'ignition_prob': 0.001,
+        'extinguish_prob': 0.05,
+        'fuel_consumption_time': 3,
+    }
+    model_params.update(params)
+    grid = np.asarray(grid)
+    return SimpleNamespace(
+        params=model_params,
+        rng=np.random.default_rng(seed),
+        grid_shape=grid.shape,
+        step_count=0,
+        fuel_properties=FUEL_PROPERTIES,
+        fuel_map=fuel_map,
+        grid=grid.astype(int),
+        burn_timer=np.zeros(grid.shape, dtype=int),
+        heat_map=np.zeros(grid.shape) if heat_map is None else heat_map,
+    )
+
+
+def test_fire_perimeter_matches_binary_erosion():
+    """경계 셀 수가 ndimage.binary_erosion 기반 계산과 같은지 확인"""
+    rng = np.random.default_rng(1)
+    for shape in [(1, 1), (1, 5), (4, 4), (30, 17)]:
+        for burning_ratio in (0.2, 0.6, 1.0):
+            state = np.where(rng.random(shape) < burning_ratio, BURNING, TREE).astype(np.uint8)
+            burning = state == BURNING
+            expected = np.sum(burning.astype(int) - ndimage.binary_erosion(burning).astype(int))
+            assert _fire_perimeter(state) == expected
+
+
+def test_heat_diffusion_matches_gaussian_filter():
+    """열 확산/냉각이 ndimage.gaussian_filter(sigma=0.5) * 0.9와 같은지 확인"""
+    rng = np.random.default_rng(2)
+    weights = gaussian_weights(HEAT_DIFFUSION_SIGMA)
+    for shape in [(1, 5), (2, 2), (3, 7), (40, 40)]:
+        heat = rng.random(shape)
+        tmp = np.empty_like(heat)
+        out = np.empty_like(heat)
+        _diffuse_heat(heat, tmp, out, weights, HEAT_COOLING)
+        expected = ndimage.gaussian_filter(heat, sigma=HEAT_DIFFUSION_SIGMA) * HEAT_COOLING
+        np.testing.assert_allclose(out, expected, atol=1e-12)
+
+
+def test_spread_probability_includes_neighbour_heat():
+    """연소 중인 이웃의 열만큼 확산 확률이 커지는지 확인 (p * (1 + 0.1 * heat))"""
+    # 3행마다: BURNING(열 5.0) - TREE - EMPTY 반복 → TREE마다 연소 중인 직교 이웃 하나
+    grid = np.full((60, 60), EMPTY)
+    heat = np.zeros(grid.shape)
+    grid[1::3, 0::3] = BURNING
+    grid[1::3, 1::3] = TREE
+    heat[1::3, 0::3] = 5.0
+    fuel_map = np.full(grid.shape, 'TU5', dtype=object)
+
+    ignited = 0
+    trees = 0
+    for seed in range(20):
+        model = KernelFireModel(make_ca_model(grid, fuel_map, heat.copy(), seed=seed,
+                                              ignition_prob=0.0, extinguish_prob=0.0))
+        model.advance()
+        ignited += np.sum(model.grid[1::3, 1::3] == BURNING)
+        trees += grid[1::3, 1::3].size
+
+    expected = FUEL_PROPERTIES['TU5']['spread_prob'] * (1 + 0.1 * 5.0)
+    assert ignited / trees == pytest.approx(expected, abs=0.02)
+
+
+def test_spread_sets_fuel_heat_output_and_burned_cells_cool():
+    """확산으로 착화한 셀은 연료 열 출력, 연소 완료 셀은 열 0에서 확산/냉각되는지 확인"""
+    grid = np.array([[BURNING, TREE]])
+    model = KernelFireModel(make_ca_model(grid, np.full(grid.shape, 'TU5', dtype=object),
+                                          np.array([[50.0, 0.0]]),
+                                          ignition_prob=0.0, extinguish_prob=0.0))
+    model.advance()
+
+    # 열 50 → 확산 확률 min(0.25 * 6, 1) = 1, 연소 시간 5 스텝이므로 원래 셀은 계속 연소
+    assert model.grid.tolist() == [[BURNING, BURNING]]
+    expected = ndimage.gaussian_filter(np.array([[50.0, 1.8]]), sigma=HEAT_DIFFUSION_SIGMA) * HEAT_COOLING
+    np.testing.assert_allclose(model.heat, expected, atol=1e-12)
+
+
+def test_advance_records_step_statistics():
+    """advance()의 통계 행이 격자 상태와 일치하는지 확인"""
+    rng = np.random.default_rng(3)
+    grid = np.where(rng.random((50, 50)) < 0.7, TREE, EMPTY)
+    grid[25, 25] = BURNING
+    model = KernelFireModel(make_ca_model(grid, seed=3), max_steps=2)
+
+    previous_trees = np.sum(model.grid == TREE)
+    for i in range(5):
+        row = model.advance(i)
+        assert row[0] == np.sum(model.grid == BURNING)
+        assert row[1] == np.sum(model.grid == BURNED)
+        assert row[2] == _fire_perimeter(model.grid)
+        assert row[3] == previous_trees - np.sum(model.grid == TREE)
+        previous_trees = np.sum(model.grid == TREE)
+    assert len(model.stats_buf) >= 5
+
+
+def test_remap_fuel_codes_uses_fuel_names():
+    """외부 연료 코드 격자가 fuel_properties 순서의 LUT 인덱스로 바뀌는지 확인"""
+    grid = np.full((2, 2), TREE)
+    ca_model = make_ca_model(grid)
+    ca_model.fuel_codes = np.array([[0, 1], [2, 1]], dtype=np.uint8)
+    ca_model.fuel_code_names = np.array(['TU5', 'TL1', 'XX9'], dtype=object)
+
+    model = KernelFireModel(ca_model)
+    # TU5 → 1, TL1 → 0, 알 수 없는 연료 → 기본 코드(연료 수)
+    assert model.fuel_codes.tolist() == [[1, 0], [len(FUEL_PROPERTIES), 0]]
+
+
+def test_matches_advanced_ca_model_burned_cells():
+    """같은 조건에서 AdvancedCAModel과 연소 셀 수 평균이 같은지 확인 (열 효과 포함)"""
+    advanced_ca_model = pytest.importorskip("advanced_ca_model")
+
+    def make_model(seed):
+        model = advanced_ca_model.AdvancedCAModel((60, 60), seed=seed)
+        model.initialize(tree_density=0.8)
+        model.params['ignition_prob'] = 0.0
+        model.fuel_map = np.full((60, 60), 'TU5', dtype=object)
+        model.add_ignition_point(30, 30, intensity=1.0)
+        return model
+
+    reference = []
+    kernel = []
+    for seed in range(40):
+        model = make_model(seed)
+        for _ in range(40):
+            model.step()
+        reference.append(np.sum(model.grid >= BURNING))
+
+        kernel_model = KernelFireModel(make_model(seed))
+        for _ in range(40):
+            kernel_model.advance()
+        kernel.append(np.sum(kernel_model.grid >= BURNING))
+
+    # 열 효과가 빠지면 약 18% 적게 연소 (표준오차 약 2%)
+    assert np.mean(kernel) == pytest.approx(np.mean(reference), rel=0.06)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+🧪 연료 폴리곤 스캔라인 래스터화 테스트
+========================================
+
+scanline_fill이 셀 중심 포함 기준(짝홀 규칙)으로 격자를 채우는지 확인
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+from fuel_rasterizer import scanline_fill, polygon_y_bounds
+
+
+def ring_edges(points):
+    """닫힌 링 좌표 목록 → 수평이 아닌 선분 [x1, y1, x2, y2] 목록"""
+    edges = []
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        if y1 != y2:
+            edges.append([x1, y1, x2, y2])
+    return edges
+
+
+def rasterize(polygons, nrows, ncols, x0=0.0, y0=None, dx=1.0, dy=1.0):
+    """폴리곤 목록 [(값, [링, ...]), ...]을 scanline_fill 입력으로 바꿔 래스터화"""
+    edges = []
+    offsets = [0]
+    values = []
+    for value, rings in polygons:
+        for ring in rings:
+            edges += ring_edges(ring)
+        offsets.append(len(edges))
+        values.append(value)
+
+    edges = np.array(edges, dtype=np.float64)
+    offsets = np.array(offsets, dtype=np.int64)
+    y0 = float(nrows * dy) if y0 is None else y0
+    return scanline_fill(edges, offsets, np.array(values, dtype=np.int32),
+                         polygon_y_bounds(edges, offsets), nrows, ncols, x0, y0, dx, dy)
+
+
+def brute_force(polygons, nrows, ncols):
+    """셀 중심마다 짝홀 규칙으로 포함 여부 판정 (나중 폴리곤 우선)"""
+    grid = np.full((nrows, ncols), -1, dtype=np.int32)
+    for value, rings in polygons:
+        for i in range(nrows):
+            for j in range(ncols):
+                x, y = j + 0.5, nrows - (i + 0.5)
+                inside = False
+                for ring in rings:
+                    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                        if (y1 <= y < y2) or (y2 <= y < y1):
+                            if x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                                inside = not inside
+                if inside:
+                    grid[i, j] = value
+    return grid
+
+
+def test_square_fills_cell_centres_inside():
+    """정사각형 내부에 중심이 있는 셀만 채워지는지 확인"""
+    square = [(1.0, 1.0), (4.0, 1.0), (4.0, 4.0), (1.0, 4.0)]
+    grid = rasterize([(7, [square])], 5, 5)
+
+    expected = np.full((5, 5), -1)
+    expected[1:4, 1:4] = 7
+    assert grid.tolist() == expected.tolist()
+
+
+def test_hole_is_left_empty():
+    """내부 링(구멍) 안의 셀은 채워지지 않는지 확인 (짝홀 규칙)"""
+    outer = [(0.0, 0.0), (6.0, 0.0), (6.0, 6.0), (0.0, 6.0)]
+    hole = [(2.0, 2.0), (4.0, 2.0), (4.0, 4.0), (2.0, 4.0)]
+    grid = rasterize([(1, [outer, hole])], 6, 6)
+
+    expected = np.ones((6, 6), dtype=int)
+    expected[2:4, 2:4] = -1
+    assert grid.tolist() == expected.tolist()
+
+
+def test_self_overlapping_ring_uses_even_odd():
+    """같은 폴리곤의 링이 겹치는 부분은 짝홀 규칙으로 비워지는지 확인"""
+    first = [(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0)]
+    second = [(2.0, 2.0), (6.0, 2.0), (6.0, 6.0), (2.0, 6.0)]
+    polygons = [(3, [first, second])]
+    grid = rasterize(polygons, 6, 6)
+
+    assert (grid[2:4, 2:4] == -1).all()
+    assert grid.tolist() == brute_force(polygons, 6, 6).tolist()
+
+
+def test_later_polygon_wins_on_overlap():
+    """겹치는 폴리곤은 나중 폴리곤의 값이 남는지 확인"""
+    left = [(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0)]
+    right = [(2.0, 0.0), (6.0, 0.0), (6.0, 4.0), (2.0, 4.0)]
+    grid = rasterize([(1, [left]), (2, [right])], 4, 6)
+
+    assert grid[0].tolist() == [1, 1, 2, 2, 2, 2]
+
+
+def test_random_polygons_match_brute_force():
+    """오목/기울어진 폴리곤과 Y 범위 밖 폴리곤이 전수 판정과 같은지 확인"""
+    rng = np.random.default_rng(0)
+    polygons = []
+    for value in range(8):
+        cx, cy = rng.uniform(0, 20, size=2)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, size=7))
+        radii = rng.uniform(1, 6, size=7)
+        ring = [(float(cx + r * np.cos(a)), float(cy + r * np.sin(a))) for a, r in zip(angles, radii)]
+        polygons.append((value, [ring]))
+    # 격자 위쪽 바깥의 폴리곤 (Y 범위 선필터로 건너뜀)
+    polygons.append((99, [[(0.0, 30.0), (5.0, 30.0), (5.0, 35.0)]]))
+
+    assert rasterize(polygons, 20, 20).tolist() == brute_force(polygons, 20, 20).tolist()
+
+
+def test_polygon_y_bounds():
+    """폴리곤별 Y 범위 계산 확인"""
+    edges = np.array([[0, 1, 0, 5], [1, 5, 1, 1], [0, -2, 0, 3]], dtype=np.float64)
+    offsets = np.array([0, 2, 3], dtype=np.int64)
+    assert polygon_y_bounds(edges, offsets).tolist() == [[1.0, 5.0], [-2.0, 3.0]]
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+🧪 통합 예제 테스트 (데이터베이스 없이 실행)
+========================================
+
+사용자 정의 연료 매핑(map_fuel_array) 규칙과 예제 출력 스트림 전달 확인
+"""
+
+import io
+import sys
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+from integration_examples import map_fuel_array, example_custom_fuel_mapping, _run_captured
+
+
+def test_map_fuel_array_applies_rules_in_order():
+    """값 없음 → NB1, 먼저 일치하는 규칙의 연료, 일치 없음 → TL1 인지 확인"""
+    values = ['PINE_FOREST', '소나무림', 'oak_forest', 'MIXED_FOREST', '혼효림',
+              '대나무', None, 'UNKNOWN', 'PINE_OAK_MIXED', float('nan'), 3]
+
+    assert map_fuel_array(values).tolist() == [
+        'TL2', 'TL2', 'TU2', 'TU3', 'TU3', 'GR1', 'NB1', 'TL1', 'TL2', 'NB1', 'TL1',
+    ]
+
+
+def test_map_fuel_array_empty():
+    """빈 입력은 빈 배열을 반환하는지 확인"""
+    assert len(map_fuel_array([])) == 0
+
+
+def test_run_captured_writes_example_output_to_target(capsys):
+    """예제 출력은 전달한 버퍼를 거쳐 target에만 기록되고 sys.stdout은 바뀌지 않는지 확인"""
+    stdout = sys.stdout
+    target = io.StringIO()
+
+    def failing_example(out=None):
+        print("진행 중", file=out)
+        raise RuntimeError("연결 실패")
+
+    _run_captured(example_custom_fuel_mapping, target)
+    _run_captured(failing_example, target)
+
+    assert sys.stdout is stdout
+    assert capsys.readouterr().out == ""
+    output = target.getvalue()
+    assert "'소나무림' → 'TL2'" in output
+    assert output.endswith("진행 중\n❌ 'failing_example' 실행 실패: 연결 실패\n")
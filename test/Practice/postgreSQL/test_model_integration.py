@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+🧪 모델 통합 모듈 테스트 (데이터베이스 없이 실행)
+========================================
+
+래스터 WKB 해석, 연료 코드 변환/서버 측 매핑 조건, 공간 범위 캐시 저장,
+행 띠 병렬 조회의 풀 연결 사용 확인
+"""
+
+import importlib.util
+import json
+import logging
+import struct
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import psycopg2.pool
+import pytest
+from psycopg2 import sql
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+import db_connection
+from db_connection import PostgreSQLConnection
+from model_integration import PostgreSQLModelIntegrator
+
+
+def raster_wkb(values, byteorder='<'):
+    """16BUI 단일 밴드 래스터 WKB (헤더 61바이트 + 밴드 플래그/NODATA + 화소 데이터)"""
+    height, width = values.shape
+    endian = 1 if byteorder == '<' else 0
+    header = struct.pack(byteorder + 'BHH6diHH', endian, 0, 1,
+                         1.0, -1.0, 100.0, 200.0, 0.0, 0.0, 5186, width, height)
+    band = struct.pack(byteorder + 'BH', 4, 0)
+    return header + band + values.astype(byteorder + 'u2').tobytes()
+
+
+@pytest.mark.parametrize('byteorder', ['<', '>'])
+def test_decode_raster_band_reads_pixels(byteorder):
+    """엔디언에 맞춰 너비/높이(오프셋 57)와 화소 데이터(오프셋 64)를 읽는지 확인"""
+    values = np.arange(1, 13, dtype=np.uint16).reshape(3, 4) * 1000
+    wkb = raster_wkb(values, byteorder)
+    assert len(wkb) == 64 + values.size * 2
+
+    decoded = PostgreSQLModelIntegrator._decode_raster_band(wkb, (3, 4))
+    assert decoded.tolist() == values.tolist()
+
+
+def test_decode_raster_band_rejects_size_mismatch():
+    """래스터 크기가 격자 크기와 다르면 오류로 처리하는지 확인"""
+    wkb = raster_wkb(np.zeros((3, 4), dtype=np.uint16))
+    with pytest.raises(ValueError):
+        PostgreSQLModelIntegrator._decode_raster_band(wkb, (4, 3))
+
+
+def test_fuel_to_codes_maps_known_and_unknown_fuels():
+    """알려진 연료는 CODE_TO_FUEL 인덱스로, 알 수 없는 연료는 TL1 코드로 변환되는지 확인"""
+    integrator = PostgreSQLModelIntegrator.__new__(PostgreSQLModelIntegrator)
+    names = np.array(['TU5', 'NB1', 'SH1', 'ZZZ', 'TL1', 'AAA'])
+
+    codes = integrator._fuel_to_codes(names)
+
+    assert codes.dtype == np.uint8
+    assert integrator.CODE_TO_FUEL[codes].tolist() == ['TU5', 'NB1', 'SH1', 'TL1', 'TL1', 'TL1']
+    assert codes[3] == codes[5] == PostgreSQLModelIntegrator.DEFAULT_FUEL_CODE
+
+
+def test_save_extent_cache_is_atomic_under_concurrency(tmp_path, monkeypatch):
+    """여러 스레드가 동시에 저장해도 캐시 파일이 온전한 JSON이고 임시 파일이 남지 않는지 확인"""
+    cache_file = tmp_path / "cache" / ".extent_cache.json"
+    monkeypatch.setattr(PostgreSQLModelIntegrator, 'EXTENT_CACHE_FILE', str(cache_file))
+    integrator = PostgreSQLModelIntegrator.__new__(PostgreSQLModelIntegrator)
+    integrator._extent_cache = {}
+    integrator._extent_cache_lock = threading.Lock()
+
+    def save(i):
+        with integrator._extent_cache_lock:
+            integrator._extent_cache[f"t{i}.geom"] = {'version': [i], 'extent': {'min_x': float(i)}}
+        integrator._save_extent_cache()
+        json.loads(cache_file.read_text(encoding='utf-8'))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(save, range(64)))
+
+    assert len(json.loads(cache_file.read_text(encoding='utf-8'))) == 64
+    assert [path.name for path in cache_file.parent.iterdir()] == [cache_file.name]
+    assert integrator._load_extent_cache() == integrator._extent_cache
+
+
+def test_fuel_code_case_sql_skipped_when_mapping_replaced():
+    """_map_fuel_type을 하위 클래스나 인스턴스에서 교체하면 서버 측 CASE 매핑을 쓰지 않는지 확인"""
+    value_expr = sql.SQL("fuel")
+    integrator = PostgreSQLModelIntegrator.__new__(PostgreSQLModelIntegrator)
+    assert integrator._fuel_code_case_sql(value_expr) is not None
+
+    integrator._map_fuel_type = lambda fuel_value: 'GR1'
+    assert integrator._fuel_code_case_sql(value_expr) is None
+
+    class CustomIntegrator(PostgreSQLModelIntegrator):
+        def _map_fuel_type(self, fuel_value):
+            return 'GR1'
+
+    assert CustomIntegrator.__new__(CustomIntegrator)._fuel_code_case_sql(value_expr) is None
+
+
+class FakePooledConnection:
+    autocommit = False
+
+
+class FakePool:
+    """maxconn개까지만 빌려주고 초과하면 PoolError를 내는 풀"""
+
+    def __init__(self, maxconn, in_use):
+        self.maxconn = maxconn
+        self.in_use = in_use
+
+    def getconn(self):
+        if self.in_use >= self.maxconn:
+            raise psycopg2.pool.PoolError("connection pool exhausted")
+        self.in_use += 1
+        return FakePooledConnection()
+
+    def putconn(self, connection, close=False):
+        self.in_use -= 1
+
+
+def make_pooled_integrator(monkeypatch, pool):
+    integrator = PostgreSQLModelIntegrator.__new__(PostgreSQLModelIntegrator)
+    integrator.db = PostgreSQLConnection(password='unused', use_pool=True)
+    integrator.db.connection = object()
+    monkeypatch.setitem(db_connection._POOLS, integrator.db._pool_key, pool)
+    return integrator
+
+
+def run_fuel_bands(integrator, n_rows=9, n_cols=4):
+    """띠마다 행 하나씩의 첫 셀을 결과로 돌려주는 run_band로 조회 (사용한 연결 기록)"""
+    used = []
+
+    def run_band(db, row_start, row_stop):
+        used.append(db)
+        rows = np.arange(row_start, row_stop)
+        return rows * n_cols, np.full(len(rows), 3, dtype=np.uint8)
+
+    cell_indices, fuel_values = integrator._run_row_bands(n_rows, run_band)
+    return cell_indices, fuel_values, used
+
+
+def test_row_bands_use_current_connection_when_pool_is_full(monkeypatch, caplog):
+    """다른 작업이 풀을 모두 쓰고 있으면 오류 기록 없이 현재 연결 하나로 조회하는지 확인"""
+    pool = FakePool(maxconn=4, in_use=4)
+    integrator = make_pooled_integrator(monkeypatch, pool)
+
+    with caplog.at_level(logging.INFO):
+        cell_indices, fuel_values, used = run_fuel_bands(integrator)
+
+    assert sorted(cell_indices.tolist()) == [row * 4 for row in range(9)]
+    assert fuel_values.tolist() == [3] * 9
+    assert used == [integrator.db]
+    assert pool.in_use == 4
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_row_bands_sized_by_available_connections(monkeypatch, caplog):
+    """풀에 남은 연결 수만큼만 띠를 늘리고, 빌린 연결은 모두 반환하는지 확인"""
+    pool = FakePool(maxconn=4, in_use=3)
+    integrator = make_pooled_integrator(monkeypatch, pool)
+
+    with caplog.at_level(logging.INFO):
+        cell_indices, _, used = run_fuel_bands(integrator)
+
+    assert sorted(cell_indices.tolist()) == [row * 4 for row in range(9)]
+    assert len(used) == 2 and integrator.db in used
+    assert pool.in_use == 3
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_shapely_1x_is_reported_unavailable(monkeypatch):
+    """Shapely 1.x(최상위에 from_wkb/points 없음)이면 method='shapely'를 사용 불가로 처리하는지 확인"""
+    shapely_1x = types.ModuleType('shapely')
+    shapely_1x.__version__ = '1.8.5'
+    monkeypatch.setitem(sys.modules, 'shapely', shapely_1x)
+
+    spec = importlib.util.spec_from_file_location(
+        'model_integration_shapely_1x', Path(__file__).parent / 'model_integration.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    assert module.SHAPELY_AVAILABLE is False
+    integrator = module.PostgreSQLModelIntegrator.__new__(module.PostgreSQLModelIntegrator)
+    with pytest.raises(ValueError, match='shapely 2.0'):
+        integrator.extract_fuel_data_from_postgis('t', method='shapely')
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+🧪 테이블 분석 모듈 테스트 (데이터베이스 없이 실행)
+========================================
+
+종합 분석 보고서가 지정한 출력 스트림에 기록되는지 확인
+"""
+
+import io
+import sys
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent))
+
+from table_analyzer import PostgreSQLTableAnalyzer
+
+
+def test_report_is_written_to_given_stream(capsys):
+    """보고서가 out에만 한 번에 기록되고 sys.stdout은 바뀌지 않는지 확인"""
+    analyzer = PostgreSQLTableAnalyzer.__new__(PostgreSQLTableAnalyzer)
+
+    def failing_metadata(table_name):
+        assert sys.stdout is stdout  # 보고서 작성 중에도 표준 출력을 바꾸지 않음
+        raise RuntimeError("연결 끊김")
+
+    analyzer.get_table_metadata = failing_metadata
+    stdout = sys.stdout
+    out = io.StringIO()
+
+    analyzer.analyze_table_comprehensive('forest', out=out)
+
+    assert capsys.readouterr().out == ""
+    report = out.getvalue()
+    assert "🔍 테이블 'forest' 종합 분석 보고서" in report
+    assert report.rstrip().endswith("❌ 분석 중 오류 발생: 연결 끊김")